@@ -29,12 +29,13 @@ __all__ = ['EpicsAttribute']
 
 
 import numpy
-from taurus.external.pint import Quantity
+from taurus.external.pint import Quantity, UR
 
 from taurus.core.taurusbasetypes import (TaurusEventType, TaurusAttrValue,
                                          TaurusTimeVal, AttrQuality, DataType,
                                          DataFormat)
 from taurus.core.taurusattribute import TaurusAttribute
+from epicsdispatcher import EpicsEventDispatcher
 
 import epics
 from epics.ca import ChannelAccessException
@@ -68,6 +69,19 @@ Dbr2TaurusType = {dbr.STRING: DataType.String,
                   dbr.CTRL_DOUBLE: DataType.Float,
                   }
 
+# names of the limits provided by the CTRL updates of the PVs
+_LimitNames = ('lower_ctrl_limit', 'upper_ctrl_limit',
+               'lower_alarm_limit', 'upper_alarm_limit',
+               'lower_warning_limit', 'upper_warning_limit')
+
+
+def _limitKey(l):
+    """returns the limit normalised for the metadata key (unset limits may be
+    None or NaN, and NaN never compares equal)"""
+    if l is None or numpy.isnan(l):
+        return None
+    return l
+
 
 class EpicsAttribute(TaurusAttribute):
     """
@@ -92,6 +106,8 @@ class EpicsAttribute(TaurusAttribute):
         self._range = [None, None]
         self._alarm = [None, None]
         self._warning = [None, None]
+        self._metadata_key = None
+        self._units = None
 
         self.__pv = epics.PV(self.getNormalName(), callback=self.onEpicsEvent,
                              form='ctrl',
@@ -105,19 +121,39 @@ class EpicsAttribute(TaurusAttribute):
 
     def onEpicsEvent(self, **kwargs):
         """callback for PV changes"""
-        # this is called from the ca thread.
-        # TODO: Consider doing the following on a different thread
-        self._value = self.decode(self.__pv)
-        self.fireEvent(TaurusEventType.Change, self._value)
+        # this is called from the ca thread: just pass the raw values to the
+        # dispatcher, which decodes them (see :meth:`processEpicsEvent`)
+        EpicsEventDispatcher().post(self, 'value', kwargs)
 
     def onEpicsConnectionEvent(self, **kwargs):
         """callback for PV connection changes"""
+        # (also dispatched, to keep the order with respect to value events)
+        EpicsEventDispatcher().post(self, 'conn', kwargs)
+
+    def processEpicsEvent(self, kind, kwargs):
+        """processes the arguments of a PV callback and fires the
+        corresponding taurus event. It is called from the thread of the
+        :class:`EpicsEventDispatcher`
+
+        :param kind: (str) 'value' for PV changes or 'conn' for connection
+                     changes
+        :param kwargs: (dict) arguments passed to the callback
+        """
+        if kind == 'conn':
+            self._processConnectionEvent(kwargs)
+        else:
+            self._value = self._decodeArgs(kwargs)
+            self.fireEvent(TaurusEventType.Change, self._value)
+
+    def _processConnectionEvent(self, kwargs):
         if kwargs['conn']:
             self.debug('(re)connected to epics PV')
             if self._value is not None:
                 self._value.error = None
         else:
             self.warning('Connection to epics PV lost')
+            if self._value is None:
+                self._value = TaurusAttrValue()
             self._value.error = ChannelAccessException('PV "%s" not connected' %
                                                        kwargs['pvname'])
         self.fireEvent(TaurusEventType.Change, self._value)
@@ -144,62 +180,85 @@ class EpicsAttribute(TaurusAttribute):
         """Decodes an epics PV object into a TaurusValue, and also updates other
          properties of the Attribute object
         """
-        attr_value = TaurusAttrValue()
         if not pv.connected:
+            attr_value = TaurusAttrValue()
             attr_value.error = ChannelAccessException('PV "%s" not connected' %
                                                       pv.pvname)
             return attr_value
-        v = pv.value
-        # type
-        try:
-            self.type = Dbr2TaurusType[pv.ftype]
-        except KeyError:
-            raise ValueError('Unsupported epics type "%s"' % pv.type)
+        args = dict(value=pv.value, ftype=pv.ftype, units=pv.units,
+                    timestamp=pv.timestamp, severity=pv.severity,
+                    write_access=pv.write_access)
+        for name in _LimitNames:
+            args[name] = getattr(pv, name, None)
+        return self._decodeArgs(args)
+
+    def _decodeArgs(self, kwargs):
+        """Decodes the arguments of a PV callback (or the equivalent ones
+        obtained from the PV object) into a TaurusValue.
+
+        The type, units and limits are only decoded when they change (i.e.,
+        on the first update and whenever the CTRL information of the PV
+        changes). Otherwise the cached ones are reused.
+        """
+        attr_value = TaurusAttrValue()
+        v = kwargs['value']
+        # type, units and limits
+        key = (kwargs.get('ftype'), kwargs.get('units')) + tuple(
+            _limitKey(kwargs.get(name)) for name in _LimitNames)
+        if key != self._metadata_key:
+            self._updateMetadata(key)
         # writable
-        self.writable = pv.write_access
+        write_access = kwargs.get('write_access')
+        if write_access is None:
+            write_access = self.__pv.write_access
+        self.writable = write_access
         # data_format
         if numpy.isscalar(v):
             self.data_format = DataFormat._0D
         else:
             self.data_format = DataFormat(len(numpy.shape(v)))
-        # units and limits support
-        if self.type in (DataType.Integer, DataType.Float):
-            v = Quantity(v, pv.units)
-            self._range = self.__decode_limit(pv.lower_ctrl_limit,
-                                              pv.upper_ctrl_limit)
-            self._alarm = self.__decode_limit(pv.lower_alarm_limit,
-                                              pv.upper_alarm_limit)
-            self._warning = self.__decode_limit(pv.lower_warning_limit,
-                                                pv.upper_warning_limit)
-
+        # units support
+        if self._units is not None:
+            v = Quantity(v, self._units)
         # rvalue
         attr_value.rvalue = v
         # wvalue
-        if pv.write_access:
+        if write_access:
             attr_value.wvalue = v
         # time
-        if pv.timestamp is None:
+        timestamp = kwargs.get('timestamp')
+        if timestamp is None:
             attr_value.time = TaurusTimeVal.now()
         else:
-            attr_value.time = TaurusTimeVal.fromtimestamp(pv.timestamp)
+            attr_value.time = TaurusTimeVal.fromtimestamp(timestamp)
         # quality
-        if pv.severity > 0:
+        if kwargs.get('severity') > 0:
             attr_value.quality = AttrQuality.ATTR_ALARM
         else:
             attr_value.quality = AttrQuality.ATTR_VALID
         return attr_value
 
-    def __decode_limit(self, l, h):
-        units = self.__pv.units
-        if l is None or numpy.isnan(l):
-            l = None
-        else:
-            l = Quantity(l, units)
-        if l is None or numpy.isnan(h):
-            h = None
+    def _updateMetadata(self, key):
+        """decodes the type, units and limits from the given metadata key"""
+        ftype, units = key[:2]
+        try:
+            self.type = Dbr2TaurusType[ftype]
+        except KeyError:
+            raise ValueError('Unsupported epics type "%s"' % ftype)
+        if self.type in (DataType.Integer, DataType.Float):
+            self._units = UR.parse_units(units or '')
+            limits = [self.__decode_limit(l) for l in key[2:]]
+            self._range = limits[0:2]
+            self._alarm = limits[2:4]
+            self._warning = limits[4:6]
         else:
-            h = Quantity(h, units)
-        return [l, h]
+            self._units = None
+        self._metadata_key = key
+
+    def __decode_limit(self, l):
+        if l is None or numpy.isnan(l):
+            return None
+        return Quantity(l, self._units)
 
     def write(self, value, with_read=True):
         value = self.encode(value)
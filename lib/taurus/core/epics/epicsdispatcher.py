@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+'''
+Epics module. See __init__.py for more detailed documentation
+'''
+__all__ = ['EpicsEventDispatcher']
+
+import threading
+from collections import OrderedDict
+
+from taurus.core.util.log import Logger
+from taurus.core.util.singleton import Singleton
+
+
+class EpicsEventDispatcher(Singleton, Logger):
+    """
+    Processes the Channel Access callbacks of the epics attributes out of the
+    CA thread.
+
+    The callbacks just post their arguments (see :meth:`post`), and a worker
+    thread calls the `processEpicsEvent(kind, kwargs)` method of the
+    attributes. The events of each kind posted for an attribute while it is
+    waiting to be processed are coalesced: only the latest one is processed.
+    Events are processed in the order in which they were (last) posted.
+    """
+
+    def __init__(self):
+        """ Initialization. Nothing to be done here for now."""
+        pass
+
+    def init(self, *args, **kwargs):
+        """Singleton instance initialization."""
+        name = self.__class__.__name__
+        self.call__init__(Logger, name)
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()
+        self._posted = 0
+        self._processed = 0
+        self._thread = None
+
+    def post(self, attr, kind, kwargs):
+        """posts an event to be processed by the worker thread. This method is
+        meant to be called from the CA callbacks and does not block.
+
+        :param attr: (EpicsAttribute) the attribute
+        :param kind: (str) the kind of event (e.g., 'value', 'conn')
+        :param kwargs: (dict) the arguments of the callback
+        """
+        with self._cond:
+            key = attr, kind
+            # (re)insert at the end, to keep the order of the events
+            self._pending.pop(key, None)
+            self._pending[key] = kwargs
+            self._posted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(name=self.log_name,
+                                                target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+
+    def getCounters(self):
+        """returns the number of events posted and processed (the difference
+        being the number of coalesced or pending events)
+
+        :return: (tuple<int,int>)
+        """
+        with self._cond:
+            return self._posted, self._processed
+
+    def flush(self):
+        """processes the pending events in the calling thread"""
+        with self._cond:
+            pending, self._pending = self._pending, OrderedDict()
+        self._process(pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                pending, self._pending = self._pending, OrderedDict()
+            self._process(pending)
+
+    def _process(self, pending):
+        for (attr, kind), kwargs in pending.iteritems():
+            try:
+                attr.processEpicsEvent(kind, kwargs)
+            except Exception:
+                self.warning('Error processing %s event of %r', kind, attr,
+                             exc_info=1)
+        with self._cond:
+            self._processed += len(pending)
@@ -31,7 +31,8 @@ __all__ = ['EpicsAuthorityNameValidator', 'EpicsDeviceNameValidator',
 import re
 from taurus.core.taurusvalidator import (TaurusAttributeNameValidator,
                                          TaurusDeviceNameValidator,
-                                         TaurusAuthorityNameValidator)
+                                         TaurusAuthorityNameValidator,
+                                         cachedGetNames)
 
 # legal chars on PV names: a-z A-Z 0-9 _ - : . [ ] < > ;
 # ... but "[" "]" and "." are discouraged:
@@ -49,6 +50,7 @@ class EpicsAuthorityNameValidator(TaurusAuthorityNameValidator):
     query = '(?!)'
     fragment = '(?!)'
 
+    @cachedGetNames
     def getNames(self, fullname, factory=None):
         if self.isValid(fullname):
             return 'ca://', '//', ''
@@ -73,6 +75,7 @@ class EpicsDeviceNameValidator(TaurusDeviceNameValidator):
     query = '(?!)'
     fragment = '(?!)'
 
+    @cachedGetNames
     def getNames(self, fullname, factory=None):
         if self.isValid(fullname):
             return 'ca:', '', ''
@@ -95,6 +98,7 @@ class EpicsAttributeNameValidator(TaurusAttributeNameValidator):
     query = '(?!)'
     fragment = '[^# ]*'
 
+    @cachedGetNames
     def getNames(self, fullname, factory=None, fragment=False):
         """reimplemented from :class:`TaurusDeviceNameValidator`"""
 
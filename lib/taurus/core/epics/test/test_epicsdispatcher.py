@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.core.epics.epicsdispatcher"""
+
+__docformat__ = 'restructuredtext'
+
+import threading
+from taurus.external import unittest
+from taurus.core.epics.epicsdispatcher import EpicsEventDispatcher
+
+
+class _FakeAttribute(object):
+
+    def __init__(self, name, block=None):
+        self.name = name
+        self.block = block
+        self.events = []
+
+    def processEpicsEvent(self, kind, kwargs):
+        if self.block is not None:
+            self.block.wait()
+        self.events.append((kind, kwargs['value']))
+
+
+class EpicsEventDispatcherTestCase(unittest.TestCase):
+    '''Test case for the EpicsEventDispatcher class'''
+
+    def setUp(self):
+        self.dispatcher = EpicsEventDispatcher()
+        self.dispatcher.flush()
+
+    def test_coalescing(self):
+        '''check that only the latest pending event of each kind is kept'''
+        a, b = _FakeAttribute('a'), _FakeAttribute('b')
+        d = self.dispatcher
+        with d._cond:
+            # (hold the lock so that the worker does not process the events)
+            for i in xrange(10):
+                d.post(a, 'value', dict(value=i))
+                d.post(b, 'value', dict(value=i))
+            d.post(a, 'conn', dict(value=True))
+            pending, d._pending = d._pending, type(d._pending)()
+        d._process(pending)
+        self.assertEqual(a.events, [('value', 9), ('conn', True)])
+        self.assertEqual(b.events, [('value', 9)])
+
+    def test_order(self):
+        '''check that events are processed in the order of posting'''
+        a = _FakeAttribute('a')
+        d = self.dispatcher
+        with d._cond:
+            d.post(a, 'conn', dict(value=False))
+            d.post(a, 'value', dict(value=1))
+            d.post(a, 'conn', dict(value=True))
+            pending, d._pending = d._pending, type(d._pending)()
+        d._process(pending)
+        self.assertEqual(a.events, [('value', 1), ('conn', True)])
+
+    def test_worker(self):
+        '''check that the events are processed by the worker thread'''
+        done = threading.Event()
+        a = _FakeAttribute('a', block=done)
+        posted0, processed0 = self.dispatcher.getCounters()
+        for i in xrange(100):
+            self.dispatcher.post(a, 'value', dict(value=i))
+        done.set()
+        for _ in xrange(100):
+            posted, processed = self.dispatcher.getCounters()
+            if a.events and a.events[-1] == ('value', 99):
+                break
+            threading.Event().wait(0.05)
+        self.assertEqual(a.events[-1], ('value', 99))
+        self.assertEqual(posted - posted0, 100)
+        self.assertTrue(len(a.events) < 100)
+
+
+if __name__ == '__main__':
+    pass
@@ -130,3 +130,4 @@ from evalfactory import EvaluationFactory
 from evalattribute import EvaluationAttribute
 from evalauthority import EvaluationAuthority
 from evaldevice import EvaluationDevice
+from evalgraph import EvaluationGraph
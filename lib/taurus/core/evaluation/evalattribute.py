@@ -38,6 +38,7 @@ from taurus.core import DataFormat
 from taurus.core.util.log import debug, tep14_deprecation
 
 from taurus.core.evaluation.evalvalidator import QUOTED_TEXT_RE, PY_VAR_RE
+from taurus.core.evaluation.evalgraph import EvaluationGraph
 
 
 class EvaluationAttrValue(TaurusAttrValue):
@@ -176,6 +177,7 @@ class EvaluationAttribute(TaurusAttribute):
         self._label = self.getSimpleName()
         self.writable = False
         self._references = []
+        self._depth = 1
         self._validator = self.getNameValidator()
         self._transformation = None
         self.__subscription_state = SubscriptionState.Unsubscribed
@@ -217,8 +219,9 @@ class EvaluationAttribute(TaurusAttribute):
                  if ok==True, the string is ready to be evaluated
         """
         # disconnect previously referenced attributes and clean the list
+        graph = EvaluationGraph()
         for ref in self._references:
-            ref.removeListener(self)
+            graph.removeDependent(ref, self)
         self._references = []
 
         # get symbols
@@ -232,6 +235,12 @@ class EvaluationAttribute(TaurusAttribute):
             symbol = self.__ref2Id(r)
             trstring = v.replaceUnquotedRef(trstring, '{%s}' % r, symbol)
 
+        # the depth in the dependency graph is used to re-evaluate the
+        # attributes in topological order
+        depths = [ref._depth for ref in self._references
+                  if isinstance(ref, EvaluationAttribute)]
+        self._depth = max(depths or [0]) + 1
+
         # validate the expression (look for missing symbols)
         safesymbols = evaluator.getSafe().keys()
         # remove literal text strings from the validation
@@ -287,15 +296,17 @@ class EvaluationAttribute(TaurusAttribute):
         return refobj
 
     def eventReceived(self, evt_src, evt_type, evt_value):
-        try:
-            v = evt_value.rvalue
-        except AttributeError:
-            self.trace('Ignoring event from %s' % repr(evt_src))
-            return
-        # update the corresponding value
+        EvaluationGraph().sourceChanged(evt_src, evt_type, evt_value, (self,))
+
+    def _updateReference(self, ref, rvalue):
+        '''updates the symbol corresponding to a referenced attribute'''
         evaluator = self.getParentObj()
-        evaluator.addSafe({self.getId(evt_src): v})
-        # re-evaluate
+        evaluator.addSafe({self.getId(ref): rvalue})
+
+    def _reevaluate(self, evt_type):
+        '''re-evaluates the transformation and notifies the listeners. It is
+        called by the :class:`EvaluationGraph` when any referenced attribute
+        changes'''
         self.applyTransformation()
         # notify listeners that the value changed
         if self.isUsingEvents():
@@ -435,9 +446,10 @@ class EvaluationAttribute(TaurusAttribute):
             return ret
 
         if self.__subscription_state == SubscriptionState.Unsubscribed:
+            graph = EvaluationGraph()
             for refobj in self._references:
                 # subscribe to the referenced attributes
-                refobj.addListener(self)
+                graph.addDependent(refobj, self)
             self.__subscription_state = SubscriptionState.Subscribed
 
         assert len(self._listeners) >= 1
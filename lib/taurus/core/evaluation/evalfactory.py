@@ -76,7 +76,7 @@ class EvaluationFactory(Singleton, TaurusFactory, Logger):
         elif EvaluationAttribute.isValid(absolute_name):
             return EvaluationAttribute
         else:
-            self.debug("Not able to find Object class for %s" % absolute_name)
+            self.debug("Not able to find Object class for %s", absolute_name)
             self.traceback()
             return None
 
@@ -184,7 +184,7 @@ class EvaluationFactory(Singleton, TaurusFactory, Logger):
         exists = self.eval_devs.get(name)
         if exists is not None:
             if exists == dev:
-                self.debug("%s has already been registered before" % name)
+                self.debug("%s has already been registered before", name)
                 raise DoubleRegistration
             else:
                 self.debug(
@@ -197,7 +197,7 @@ class EvaluationFactory(Singleton, TaurusFactory, Logger):
         exists = self.eval_attrs.get(name)
         if exists is not None:
             if exists == attr:
-                self.debug("%s has already been registered before" % name)
+                self.debug("%s has already been registered before", name)
                 raise DoubleRegistration
             else:
                 self.debug(
@@ -211,7 +211,7 @@ class EvaluationFactory(Singleton, TaurusFactory, Logger):
         exists = self.eval_configs.get(name)
         if exists is not None:
             if exists == config:
-                self.debug("%s has already been registered before" % name)
+                self.debug("%s has already been registered before", name)
                 raise DoubleRegistration
             else:
                 self.debug(
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+__all__ = ['EvaluationGraph']
+
+import heapq
+import threading
+import weakref
+
+from taurus.core.util.log import Logger
+from taurus.core.util.singleton import Singleton
+from taurus.core.util.timer import Timer
+from taurus.core.taurusbasetypes import TaurusEventType
+
+
+class _SourceNode(object):
+    '''The listener of an attribute referenced by evaluation attributes. It
+    keeps (weak) references to the evaluation attributes that depend on it
+    and forwards the events of the attribute to the graph'''
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._dependents = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def addDependent(self, attr):
+        with self._lock:
+            self._dependents.add(attr)
+
+    def removeDependent(self, attr):
+        with self._lock:
+            self._dependents.discard(attr)
+
+    def getDependents(self):
+        with self._lock:
+            return list(self._dependents)
+
+    def eventReceived(self, evt_src, evt_type, evt_value):
+        self._graph.sourceChanged(evt_src, evt_type, evt_value,
+                                  self.getDependents())
+
+
+class EvaluationGraph(Singleton, Logger):
+    '''
+    The dependency graph of all evaluation attributes.
+
+    Each attribute referenced by evaluation attributes is listened to only
+    once (by the graph). When it changes, its dependent evaluation attributes
+    are re-evaluated exactly once each, in topological order (i.e., an
+    evaluation attribute is only re-evaluated after all the evaluation
+    attributes it references), even if the change propagates through several
+    paths.
+
+    Optionally, the re-evaluations can be throttled (see
+    :meth:`setThrottlePeriod`), so that the changes of all the referenced
+    attributes received within a period result in a single re-evaluation of
+    each dependent.
+    '''
+
+    def __init__(self):
+        """ Initialization. Nothing to be done here for now."""
+        pass
+
+    def init(self, *args, **kwargs):
+        """Singleton instance initialization."""
+        name = self.__class__.__name__
+        self.call__init__(Logger, name)
+        self._nodes = weakref.WeakKeyDictionary()
+        self._nodes_lock = threading.Lock()
+        self._local = threading.local()
+        self._throttle_period = 0
+        self._throttle_timer = None
+        self._dirty = {}
+        self._dirty_lock = threading.Lock()
+        self._seq = 0
+
+    def addDependent(self, source, attr):
+        """Makes the given evaluation attribute be re-evaluated whenever the
+        source attribute changes
+
+        :param source: (TaurusAttribute) the referenced attribute
+        :param attr: (EvaluationAttribute) the dependent attribute
+        """
+        with self._nodes_lock:
+            node = self._nodes.get(source)
+            if node is None:
+                self._nodes[source] = node = _SourceNode(self)
+        node.addDependent(attr)
+        if not source.addListener(node):
+            # the source was already listened: it does not send the initial
+            # event, so its current value is passed to the new dependent
+            try:
+                v = source.read().rvalue
+            except Exception:
+                self.debug('Cannot read %s', source, exc_info=1)
+                return
+            attr._updateReference(source, v)
+            self.markDirty((attr,), TaurusEventType.Change)
+
+    def removeDependent(self, source, attr):
+        """Stops re-evaluating the given evaluation attribute when the source
+        attribute changes
+
+        :param source: (TaurusAttribute) the referenced attribute
+        :param attr: (EvaluationAttribute) the dependent attribute
+        """
+        with self._nodes_lock:
+            node = self._nodes.get(source)
+        if node is None:
+            return
+        node.removeDependent(attr)
+        if not node.getDependents():
+            source.removeListener(node)
+
+    def getThrottlePeriod(self):
+        """Returns the throttle period
+
+        :return: (float) period (in s). 0 means no throttling.
+        """
+        return self._throttle_period
+
+    def setThrottlePeriod(self, period):
+        """Sets the minimum period between re-evaluations. If period is 0,
+        throttling is disabled (i.e., the dependents of an attribute are
+        re-evaluated as soon as it changes)
+
+        :param period: (float) period (in s)
+        """
+        self._throttle_period = period
+        if self._throttle_timer is not None:
+            self._throttle_timer.stop()
+            self._throttle_timer = None
+        if period:
+            self._throttle_timer = Timer(period, self.flush, self)
+            self._throttle_timer.start()
+        else:
+            self.flush()
+
+    def sourceChanged(self, source, evt_type, evt_value, dependents):
+        """Updates the symbols of the dependents of the given source attribute
+        with its new value and schedules their re-evaluation"""
+        try:
+            v = evt_value.rvalue
+        except AttributeError:
+            self.trace('Ignoring event from %r', source)
+            return
+        for attr in dependents:
+            attr._updateReference(source, v)
+        self.markDirty(dependents, evt_type)
+
+    def markDirty(self, attrs, evt_type):
+        """Schedules the re-evaluation of the given evaluation attributes"""
+        pending = getattr(self._local, 'pending', None)
+        if pending is not None:
+            # we are already re-evaluating (in this thread): the attributes
+            # will be processed later on in this same pass
+            self._push(pending, attrs, evt_type)
+        elif self._throttle_period:
+            with self._dirty_lock:
+                for attr in attrs:
+                    self._dirty[attr] = evt_type
+        else:
+            pending = {}, []
+            self._push(pending, attrs, evt_type)
+            self._process(pending)
+
+    def flush(self):
+        """Re-evaluates the attributes whose re-evaluation was delayed by the
+        throttling"""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, {}
+        pending = {}, []
+        for attr, evt_type in dirty.iteritems():
+            self._push(pending, (attr,), evt_type)
+        self._process(pending)
+
+    def _push(self, pending, attrs, evt_type):
+        evt_types, heap = pending
+        for attr in attrs:
+            if attr not in evt_types:
+                self._seq += 1
+                heapq.heappush(heap, (attr._depth, self._seq, attr))
+            evt_types[attr] = evt_type
+
+    def _process(self, pending):
+        evt_types, heap = pending
+        if not heap:
+            return
+        self._local.pending = pending
+        try:
+            while heap:
+                _, _, attr = heapq.heappop(heap)
+                evt_type = evt_types.pop(attr)
+                try:
+                    attr._reevaluate(evt_type)
+                except Exception:
+                    self.warning('Error re-evaluating %s', attr.getFullName())
+                    self.debug('Details:', exc_info=1)
+        finally:
+            self._local.pending = None
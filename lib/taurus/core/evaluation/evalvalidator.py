@@ -34,7 +34,8 @@ from taurus.core import TaurusElementType
 
 from taurus.core.taurusvalidator import (TaurusAttributeNameValidator,
                                          TaurusDeviceNameValidator,
-                                         TaurusAuthorityNameValidator)
+                                         TaurusAuthorityNameValidator,
+                                         cachedGetNames)
 
 # Pattern for python variables
 PY_VAR = r'(?<![\.a-zA-Z0-9_])[a-zA-Z_][a-zA-Z0-9_]*'
@@ -170,6 +171,7 @@ class EvaluationDeviceNameValidator(TaurusDeviceNameValidator):
                 groups['_evalclass'] = None
         return groups
 
+    @cachedGetNames
     def getNames(self, fullname, factory=None):
         '''reimplemented from :class:`TaurusDeviceNameValidator`'''
         from evalfactory import EvaluationFactory
@@ -414,6 +416,7 @@ class EvaluationAttributeNameValidator(TaurusAttributeNameValidator):
                                            '{%s}' % full_name)
         return name
 
+    @cachedGetNames
     def getNames(self, fullname, factory=None, fragment=False):
         '''reimplemented from :class:`TaurusDeviceNameValidator`'''
         from evalfactory import EvaluationFactory
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+"""Test for taurus.core.evaluation.evalgraph"""
+
+# __all__ = []
+
+from taurus.external import unittest
+import taurus
+from taurus.core.taurusbasetypes import TaurusEventType
+from taurus.core.evaluation.evalgraph import EvaluationGraph
+
+
+class _FakeValue(object):
+
+    def __init__(self, rvalue):
+        self.rvalue = rvalue
+
+
+class _Listener(object):
+
+    def eventReceived(self, evt_src, evt_type, evt_value):
+        pass
+
+
+class _FakeAttribute(object):
+    '''Mimics the interface used by the graph for both the referenced and the
+    evaluation attributes. It records its re-evaluations in a shared log'''
+
+    def __init__(self, name, depth, log):
+        self.name = name
+        self._depth = depth
+        self._log = log
+        self.listeners = []
+        self.value = 0
+        self.references = {}
+
+    def getFullName(self):
+        return self.name
+
+    def addListener(self, listener):
+        if listener in self.listeners:
+            return False
+        self.listeners.append(listener)
+        return True
+
+    def removeListener(self, listener):
+        self.listeners.remove(listener)
+        return True
+
+    def read(self):
+        return _FakeValue(self.value)
+
+    def fire(self, value):
+        self.value = value
+        for l in self.listeners:
+            l.eventReceived(self, TaurusEventType.Change, _FakeValue(value))
+
+    def _updateReference(self, ref, rvalue):
+        self.references[ref.name] = rvalue
+
+    def _reevaluate(self, evt_type):
+        self._log.append(self.name)
+        self.fire(len(self._log))
+
+
+class EvaluationGraphTestCase(unittest.TestCase):
+    '''Test the re-evaluation order and deduplication of the graph'''
+
+    def setUp(self):
+        self.graph = EvaluationGraph()
+        self.log = []
+        # a diamond: s -> (a, b) -> t
+        self.s = _FakeAttribute('s', 0, self.log)
+        self.a = _FakeAttribute('a', 1, self.log)
+        self.b = _FakeAttribute('b', 1, self.log)
+        self.t = _FakeAttribute('t', 2, self.log)
+        self.graph.addDependent(self.s, self.a)
+        self.graph.addDependent(self.s, self.b)
+        self.graph.addDependent(self.a, self.t)
+        self.graph.addDependent(self.b, self.t)
+        del self.log[:]
+
+    def tearDown(self):
+        self.graph.setThrottlePeriod(0)
+        for src, attr in ((self.s, self.a), (self.s, self.b),
+                          (self.a, self.t), (self.b, self.t)):
+            self.graph.removeDependent(src, attr)
+
+    def test_singleListener(self):
+        '''Check that a source is listened only once by the graph'''
+        self.assertEqual(len(self.s.listeners), 1)
+
+    def test_topologicalOrder(self):
+        '''Check that each dependent is re-evaluated once and in order'''
+        self.s.fire(1)
+        self.assertEqual(sorted(self.log[:2]), ['a', 'b'])
+        self.assertEqual(self.log[2:], ['t'])
+
+    def test_throttling(self):
+        '''Check that throttled changes are coalesced'''
+        self.graph.setThrottlePeriod(10)
+        for i in range(5):
+            self.s.fire(i)
+        self.assertEqual(self.log, [])
+        self.graph.flush()
+        self.assertEqual(sorted(self.log[:2]), ['a', 'b'])
+        self.assertEqual(self.log[2:], ['t'])
+
+    def test_removeDependent(self):
+        '''Check that removing the last dependent stops listening'''
+        self.graph.removeDependent(self.s, self.a)
+        self.s.fire(1)
+        self.assertEqual(self.log, ['b', 't'])
+        self.graph.removeDependent(self.s, self.b)
+        self.assertEqual(self.s.listeners, [])
+        self.graph.addDependent(self.s, self.a)
+        self.graph.addDependent(self.s, self.b)
+
+    def test_lateDependent(self):
+        '''Check that a dependent added to an already listened source gets
+        its current value'''
+        self.s.fire(5)
+        c = _FakeAttribute('c', 1, self.log)
+        del self.log[:]
+        self.graph.addDependent(self.s, c)
+        try:
+            self.assertEqual(c.references, {'s': 5})
+            self.assertEqual(self.log, ['c'])
+        finally:
+            self.graph.removeDependent(self.s, c)
+
+
+class EvaluationAttributeSharedSourceTestCase(unittest.TestCase):
+    '''Test evaluation attributes sharing a reference'''
+
+    def test_subscribedAtDifferentTimes(self):
+        '''Check that an evaluation attribute subscribed after another one
+        referencing the same attribute gets its current value'''
+        source = taurus.Attribute('eval:rand()+0')
+        a1 = taurus.Attribute('eval:{eval:rand()+0}*1')
+        a2 = taurus.Attribute('eval:{eval:rand()+0}*2')
+        l1, l2 = _Listener(), _Listener()
+        a1.addListener(l1)
+        try:
+            # the source changes without firing events
+            source.read(cache=False)
+            a2.addListener(l2)
+            try:
+                expected = 2 * source.read().rvalue.magnitude
+                got = a2.read().rvalue.magnitude
+                self.assertAlmostEqual(got, expected)
+            finally:
+                a2.removeListener(l2)
+        finally:
+            a1.removeListener(l1)
+
+
+if __name__ == '__main__':
+    pass
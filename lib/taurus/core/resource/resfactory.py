@@ -37,6 +37,7 @@ from taurus.core.util.singleton import Singleton
 from taurus.core.util.log import Logger
 from taurus.core.taurusfactory import TaurusFactory
 from taurus.core.taurusexception import TaurusException
+from taurus.core.taurusvalidator import clearValidatorCache
 
 
 class ResourcesFactory(Singleton, TaurusFactory, Logger):
@@ -69,6 +70,12 @@ class ResourcesFactory(Singleton, TaurusFactory, Logger):
         self._resource_priority = {}
         self._resource_priority_keys = []
         self._resource_count = 0
+        # flat index of the values (resolved by priority) and name of the
+        # resource providing each of them
+        self._resource_index = {}
+        self._resource_owner = {}
+        self._resource_rank = {}
+        self.resetValueStats()
 
     def reloadResource(self, obj=None, priority=1, name=None):
         """(Re)Loads the given resource.
@@ -81,6 +88,10 @@ class ResourcesFactory(Singleton, TaurusFactory, Logger):
            :param name: (str) an optional name to give to the resource
 
            :return: (dict) a dictionary version of the given resource object
+
+           .. note:: the values of the resources are indexed when they are
+                     loaded. If a dictionary is modified after being loaded,
+                     it has to be reloaded for the changes to take effect
         """
         if priority < 1:
             raise ValueError('priority must be >=1')
@@ -95,23 +106,111 @@ class ResourcesFactory(Singleton, TaurusFactory, Logger):
         else:
             raise TypeError
 
-        if self._resource_map.get(name) is None:
+        old = self._resource_map.get(name)
+        if old is None:
             self._resource_count += 1
+        elif self._getResourcePriority(name) != priority:
+            self._removeFromPriority(name)
         self._resource_map[name] = obj
-        if self._resource_count == 1:
-            self._first_resource = obj
 
         pl = self._resource_priority.get(priority)
         if pl is None:
             self._resource_priority[priority] = pl = []
-        pl.append(name)
+        if name not in pl:
+            pl.append(name)
         self._resource_priority_keys = self._resource_priority.keys()
         self._resource_priority_keys.sort()
+        self._updateRanks()
+        if old is not None:
+            self._unindexResource(name, old)
+        self._indexResource(name)
+        # names referring to resources may have been cached by the validators
+        clearValidatorCache()
         return obj
 
     loadResource = reloadResource
     loadResource.__doc__ = reloadResource.__doc__
 
+    def removeResource(self, name):
+        """Removes the given resource.
+
+           :param name: (str) the name of the resource (as given to
+                        :meth:`reloadResource` or, for resource files, their
+                        absolute path)
+
+           :return: (dict or None) the removed resource or None if there was
+                    no resource with the given name
+        """
+        obj = self._resource_map.pop(name, None)
+        if obj is None:
+            return None
+        self._resource_count -= 1
+        self._removeFromPriority(name)
+        self._resource_priority_keys = self._resource_priority.keys()
+        self._resource_priority_keys.sort()
+        self._unindexResource(name, obj)
+        self._updateRanks()
+        clearValidatorCache()
+        return obj
+
+    def _getResourcePriority(self, name):
+        for p, pl in self._resource_priority.iteritems():
+            if name in pl:
+                return p
+        return None
+
+    def _removeFromPriority(self, name):
+        p = self._getResourcePriority(name)
+        if p is None:
+            return
+        pl = self._resource_priority[p]
+        pl.remove(name)
+        if not pl:
+            del self._resource_priority[p]
+
+    def _getResourceOrder(self):
+        """returns the names of the resources, from higher to lower priority
+        """
+        return [n for p in self._resource_priority_keys
+                for n in self._resource_priority[p]]
+
+    def _updateRanks(self):
+        self._resource_rank = dict((n, i) for i, n in
+                                   enumerate(self._getResourceOrder()))
+
+    def _indexResource(self, name):
+        """adds the keys of the given resource to the index, except those
+        provided by resources with higher priority"""
+        index, owner = self._resource_index, self._resource_owner
+        ranks = self._resource_rank
+        rank = ranks[name]
+        for key, value in self._resource_map[name].iteritems():
+            o = owner.get(key)
+            if o is None or rank <= ranks[o]:
+                index[key] = value
+                owner[key] = name
+
+    def _unindexResource(self, name, obj):
+        """removes the keys provided by the given resource from the index,
+        resolving them again from the rest of resources"""
+        index, owner = self._resource_index, self._resource_owner
+        keys = [k for k in obj if owner.get(k) == name]
+        for key in keys:
+            del index[key]
+            del owner[key]
+        for n in self._getResourceOrder():
+            if n == name or not keys:
+                continue
+            resource = self._resource_map[n]
+            pending = []
+            for key in keys:
+                if key in resource:
+                    index[key] = resource[key]
+                    owner[key] = n
+                else:
+                    pending.append(key)
+            keys = pending
+
     def __reloadResource(self, name=None):
         path = os.path.curdir
         if name is None:
@@ -160,18 +259,25 @@ class ResourcesFactory(Singleton, TaurusFactory, Logger):
             except:
                 return None
 
-        # optimization: many applications contain only one resource: in that
-        # case avoid the loop
-        if self._resource_count == 1:
-            return self._first_resource.get(key, None)
-
-        for p in self._resource_priority_keys:
-            for resource_name in self._resource_priority[p]:
-                resource = self._resource_map[resource_name]
-                try:
-                    return resource[key]
-                except:
-                    pass
+        value = self._resource_index.get(key)
+        if value is None:
+            self._resource_misses += 1
+        else:
+            self._resource_hits += 1
+        return value
+
+    def getValueStats(self):
+        """Returns the number of keys found and not found by :meth:`getValue`
+        (since the last call to :meth:`resetValueStats`)
+
+           :return: (tuple<int,int>) number of hits and misses
+        """
+        return self._resource_hits, self._resource_misses
+
+    def resetValueStats(self):
+        """Resets the counters of hits and misses of :meth:`getValue`"""
+        self._resource_hits = 0
+        self._resource_misses = 0
 
     def findObjectClass(self, absolute_name):
         """
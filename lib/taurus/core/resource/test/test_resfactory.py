@@ -218,5 +218,47 @@ class ResourceFactoryTestCase(unittest.TestCase):
                                                                   res_auth)
         self.assertIs(expected_auth, res_auth, msg)
 
+    def test_removeResource(self):
+        """check that removing a resource exposes the values of the resources
+        with lower priority"""
+        f = self.resfactory
+        f.loadResource(attr_dict1, 1, name='first')
+        f.loadResource(attr_dict3, 2, name='second')
+        f.loadResource(attr_dict2, 3, name='third')
+        self.assertEqual(f.getValue('attr_3'), 'eval:3')
+        self.assertEqual(f.getValue('attr_4'), 'tango:motor1/position')
+        f.removeResource('first')
+        self.assertEqual(f.getValue('attr_1'), None)
+        self.assertEqual(f.getValue('attr_3'), 'tango://foo:10000/a/b/c/d')
+        f.removeResource('second')
+        self.assertEqual(f.getValue('attr_3'), 'eval:4')
+        self.assertEqual(f.getValue('attr_4'), 'eval:5')
+
+    def test_reloadPriority(self):
+        """check that reloading a resource with another priority updates the
+        resolved values"""
+        f = self.resfactory
+        f.loadResource(attr_dict1, 1, name='first')
+        f.loadResource(attr_dict2, 2, name='second')
+        self.assertEqual(f.getValue('attr_3'), 'eval:3')
+        f.loadResource(attr_dict1, 3, name='first')
+        self.assertEqual(f.getValue('attr_3'), 'eval:4')
+        self.assertEqual(f.getValue('attr_1'), 'eval:1')
+        f.loadResource({'attr_4': 'eval:9'}, 2, name='second')
+        self.assertEqual(f.getValue('attr_3'), 'eval:3')
+        self.assertEqual(f.getValue('attr_4'), 'eval:9')
+        self.assertEqual(f.getValue('attr_5'), None)
+
+    def test_valueStats(self):
+        """check the counters of hits and misses of getValue"""
+        f = self.resfactory
+        f.loadResource(attr_dict1, 1)
+        f.getValue('attr_1')
+        f.getValue('attr_2')
+        f.getValue('attr_10')
+        self.assertEqual(f.getValueStats(), (2, 1))
+        f.resetValueStats()
+        self.assertEqual(f.getValueStats(), (0, 0))
+
     def tearDown(self):
         self.resfactory.clear()
@@ -64,7 +64,13 @@ from .util.tango_taurus import (description_from_tango,
 
 class TangoAttrValue(TaurusAttrValue):
     '''A TaurusAttrValue specialization to decode PyTango.DeviceAttribute
-    objects'''
+    objects.
+
+    The rvalue and wvalue members are decoded lazily (i.e., when they are
+    accessed for the first time) from the wrapped PyTango.DeviceAttribute'''
+
+    # marker for a member which has not been decoded yet
+    _NotDecoded = object()
 
     def __init__(self, attr=None, pytango_dev_attr=None, config=None):
         # config parameter is kept for backwards compatibility only
@@ -87,17 +93,18 @@ class TangoAttrValue(TaurusAttrValue):
         if self._attrRef is None:
             return
 
-        numerical = PyTango.is_numerical_type(self._attrRef._tango_data_type,
-                                              inc_array=True)
+        # take the decoding info now: the attribute configuration may change
+        # (or the attribute may be gone) by the time the values are decoded
+        self._decode_info = numerical, _, data_format, tango_type = \
+            attr._decode_info
         if p.has_failed:
             self.error = PyTango.DevFailed(*p.get_err_stack())
         else:
             if p.is_empty:  # spectra and images can be empty without failing
-                dtype = FROM_TANGO_TO_NUMPY_TYPE.get(
-                    self._attrRef._tango_data_type)
-                if self._attrRef.data_format == DataFormat._1D:
+                dtype = FROM_TANGO_TO_NUMPY_TYPE.get(tango_type)
+                if data_format == DataFormat._1D:
                     shape = (0,)
-                elif self._attrRef.data_format == DataFormat._2D:
+                elif data_format == DataFormat._2D:
                     shape = (0, 0)
                 p.value = numpy.empty(shape, dtype=dtype)
                 if not (numerical or self._attrRef.type == DataType.Boolean):
@@ -106,29 +113,49 @@ class TangoAttrValue(TaurusAttrValue):
                     for _ in xrange(len(shape) - 1):
                         p.value = [p.value]
 
-        rvalue = p.value
-        wvalue = p.w_value
-        if numerical:
-            units = self._attrRef._units
-            if rvalue is not None:
-                rvalue = Quantity(rvalue, units=units)
-            if wvalue is not None:
-                wvalue = Quantity(wvalue, units=units)
-        elif isinstance(rvalue, PyTango._PyTango.DevState):
-            rvalue = DevState[str(rvalue)]
-        elif p.type == PyTango.CmdArgType.DevUChar:
-            if self._attrRef.data_format == DataFormat._0D:
-                rvalue = chr(rvalue)
-                wvalue = chr(wvalue)
-            else:
-                rvalue = rvalue.view('S1')
-                wvalue = wvalue.view('S1')
-
-        self.rvalue = rvalue
-        self.wvalue = wvalue
+        self._rvalue = self._wvalue = self._NotDecoded
         self.time = p.time  # TODO: decode this into a TaurusTimeVal
         self.quality = quality_from_tango(p.quality)
 
+    def _decodeValue(self, value):
+        '''Decodes a read or write value from the PyTango.DeviceAttribute'''
+        if value is None:
+            return None
+        numerical, units, data_format, _ = self._decode_info
+        if numerical:
+            return Quantity(value, units=units)
+        elif isinstance(value, PyTango._PyTango.DevState):
+            return DevState[str(value)]
+        elif self._pytango_dev_attr.type == PyTango.CmdArgType.DevUChar:
+            if data_format == DataFormat._0D:
+                return chr(value)
+            return value.view('S1')
+        return value
+
+    def _getRValue(self):
+        rvalue = self._rvalue
+        if rvalue is self._NotDecoded:
+            self._rvalue = rvalue = \
+                self._decodeValue(self._pytango_dev_attr.value)
+        return rvalue
+
+    def _setRValue(self, rvalue):
+        self._rvalue = rvalue
+
+    rvalue = property(_getRValue, _setRValue)
+
+    def _getWValue(self):
+        wvalue = self._wvalue
+        if wvalue is self._NotDecoded:
+            self._wvalue = wvalue = \
+                self._decodeValue(self._pytango_dev_attr.w_value)
+        return wvalue
+
+    def _setWValue(self, wvalue):
+        self._wvalue = wvalue
+
+    wvalue = property(_getWValue, _setWValue)
+
     def __getattr__(self, name):
         try:
             ret = getattr(self._attrRef, name)
@@ -270,7 +297,7 @@ class TangoAttribute(TaurusAttribute):
         if parent:
             attr_name = self.getSimpleName()
             try:
-                attr_info = parent.attribute_query(attr_name)
+                attr_info = parent.getAttributeInfoEx(attr_name)
             except (AttributeError, PyTango.DevFailed):
                 # if PyTango could not connect to the dev
                 attr_info = None
@@ -292,6 +319,11 @@ class TangoAttribute(TaurusAttribute):
     def cleanUp(self):
         self.trace("[TangoAttribute] cleanUp")
         self._unsubscribeConfEvents()
+        # without configuration events, the cached configuration would not
+        # be updated anymore
+        dev = self.getParentObj()
+        if dev is not None:
+            dev.invalidateAttributeInfo(self.getSimpleName())
         TaurusAttribute.cleanUp(self)
         self.__dev_hw_obj = None
         self._pytango_attrinfoex = None
@@ -449,12 +481,12 @@ class TangoAttribute(TaurusAttribute):
                     raise self.__attr_err
         except PyTango.DevFailed, df:
             self.__subscription_event.set()
-            self.debug("Error polling: %s" % df[0].desc)
+            self.debug("Error polling: %s", df[0].desc)
             self.traceback()
             self.fireEvent(TaurusEventType.Error, self.__attr_err)
         except Exception, e:
             self.__subscription_event.set()
-            self.debug("Error polling: %s" % str(e))
+            self.debug("Error polling: %s", e)
             self.fireEvent(TaurusEventType.Error, self.__attr_err)
         else:
             self.__subscription_event.set()
@@ -568,7 +600,9 @@ class TangoAttribute(TaurusAttribute):
     #-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-
 
     def setConfigEx(self, config):
-        self.getParentObj().set_attribute_config([config])
+        dev = self.getParentObj()
+        dev.set_attribute_config([config])
+        dev.invalidateAttributeInfo(self.getSimpleName())
 
     #-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-
     # PyTango event handling (private)
@@ -627,7 +661,7 @@ class TangoAttribute(TaurusAttribute):
                     pass
                 else:
                     self.debug("Failed: %s", df[0].desc)
-                    self.trace(str(df))
+                    self.trace("%s", df)
         self._deactivatePolling()
         self.__subscription_state = SubscriptionState.Unsubscribed
 
@@ -677,7 +711,7 @@ class TangoAttribute(TaurusAttribute):
                 self.__cfg_evt_id = None
             except PyTango.DevFailed, e:
                 self.debug("Error trying to unsubscribe configuration events")
-                self.trace(str(e))
+                self.trace("%s", e)
 
     def push_event(self, event):
         """Method invoked by the PyTango layer when a change event occurs.
@@ -691,6 +725,9 @@ class TangoAttribute(TaurusAttribute):
             if isinstance(event, PyTango.AttrConfEventData):
                 event_type = TaurusEventType.Config
                 self._decodeAttrInfoEx(event.attr_conf)
+                dev = self.getParentObj()
+                if dev is not None:
+                    dev.updateAttributeInfo(event.attr_conf)
                 # make sure that there is a self.__attr_value
                 if self.__attr_value is None:
                     # TODO: maybe we can avoid this read?
@@ -705,13 +742,11 @@ class TangoAttribute(TaurusAttribute):
                 if not self.isPollingForced():
                     self._deactivatePolling()
             # notify the listeners
-            listeners = tuple(self._listeners)
             if sm == TaurusSerializationMode.Concurrent:
                 manager.addJob(self.fireEvent, None, event_type,
-                               self.__attr_value, listeners=listeners)
+                               self.__attr_value)
             else:
-                self.fireEvent(event_type, self.__attr_value,
-                               listeners=listeners)
+                self.fireEvent(event_type, self.__attr_value)
         elif event.errors[0].reason in EVENT_TO_POLLING_EXCEPTIONS:
             if self.isPollingActive():
                 return
@@ -724,13 +759,11 @@ class TangoAttribute(TaurusAttribute):
             self.__subscription_state = SubscriptionState.Subscribed
             self.__subscription_event.set()
             self._deactivatePolling()
-            listeners = tuple(self._listeners)
             if sm == TaurusSerializationMode.Concurrent:
                 manager.addJob(self.fireEvent, None, TaurusEventType.Error,
-                               self.__attr_err, listeners=listeners)
+                               self.__attr_err)
             else:
-                self.fireEvent(TaurusEventType.Error, self.__attr_err,
-                               listeners=listeners)
+                self.fireEvent(TaurusEventType.Error, self.__attr_err)
 
     def isWrite(self, cache=True):
         return self.getTangoWritable(cache) == PyTango.AttrWriteType.WRITE
@@ -882,6 +915,12 @@ class TangoAttribute(TaurusAttribute):
             # TangoAttrValue for performance reasons. Do not rely on it in other
             # code
             self._units = units
+        # self._decode_info is to be used by TangoAttrValue for performance
+        # reasons. Do not rely on it in other code
+        tango_type = self._pytango_attrinfoex.data_type
+        self._decode_info = (PyTango.is_numerical_type(tango_type,
+                                                       inc_array=True),
+                             self._units, self.data_format, tango_type)
 
     @property
     def _tango_data_type(self):
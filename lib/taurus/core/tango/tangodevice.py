@@ -30,11 +30,14 @@ __all__ = ["TangoDevice"]
 __docformat__ = "restructuredtext"
 
 import time
-from PyTango import (DeviceProxy, DevFailed, LockerInfo, DevState)
+import threading
+from PyTango import (DeviceProxy, DevFailed, LockerInfo, DevState,
+                     AsynReplyNotArrived)
 
 from taurus.core.taurusdevice import TaurusDevice
 from taurus.core.taurusbasetypes import (TaurusDevState, TaurusLockInfo,
                                          LockStatus, TaurusEventType)
+from taurus.core.util.containers import CaselessDict
 from taurus.core.util.log import tep14_deprecation
 
 
@@ -58,8 +61,17 @@ class TangoDevice(TaurusDevice):
     _scheme = 'tango'
     _description = "A Tango Device"
 
+    #: maximum age (in s) of the cached attribute configurations (see
+    #: :meth:`getAttributeInfoEx`)
+    AttributeInfoMaxAge = 60.
+
     def __init__(self, name, **kw):
         """Object initialization."""
+        # cache of attribute configurations: name -> (config, time) (see
+        # getAttributeInfoEx)
+        self._attr_infos = CaselessDict()
+        self._attr_infos_complete = False
+        self._attr_infos_lock = threading.RLock()
         self.call__init__(TaurusDevice, name, **kw)
         self._deviceObj = self._createHWObject()
         self._lock_info = TaurusLockInfo()
@@ -185,6 +197,7 @@ class TangoDevice(TaurusDevice):
             self._deviceStateObj.removeListener(self)
         self._deviceStateObj = None
         self._deviceObj = None
+        self.invalidateAttributeInfo()
         TaurusDevice.cleanUp(self)
 
     @tep14_deprecation(alt='.state().name')
@@ -207,6 +220,91 @@ class TangoDevice(TaurusDevice):
             self._deviceObj = self._createHWObject()
         return self._deviceObj
 
+    def fetchAttributeInfos(self, attr_names=None):
+        """Fetches the configurations of the given attributes in a single
+        call and stores them in the configuration cache of the device (see
+        :meth:`getAttributeInfoEx`)
+
+        :param attr_names: (seq<str> or None) attribute names. If None
+                           (default), the configurations of all the
+                           attributes of the device are fetched
+
+        :return: (seq<PyTango.AttributeInfoEx>) the fetched configurations
+        :raise: (PyTango.DevFailed) if the configurations cannot be fetched
+        """
+        proxy = self.getDeviceProxy()
+        if proxy is None:
+            return []
+        if attr_names is None:
+            attr_infos = proxy.attribute_list_query_ex()
+        else:
+            attr_infos = proxy.get_attribute_config_ex(list(attr_names))
+        now = time.time()
+        with self._attr_infos_lock:
+            for attr_info in attr_infos:
+                self._attr_infos[attr_info.name] = attr_info, now
+            if attr_names is None:
+                self._attr_infos_complete = True
+        return attr_infos
+
+    def getAttributeInfoEx(self, attr_name):
+        """Returns the configuration of the given attribute from the
+        configuration cache of the device. The first time that it is called,
+        the configurations of all the attributes of the device are fetched in
+        a single call. Configurations which are not in the cache (e.g. of
+        attributes created dynamically) or which are older than
+        :attr:`AttributeInfoMaxAge` are fetched individually. The cached
+        configurations of the attributes in use are kept up to date with
+        their configuration events (see :meth:`updateAttributeInfo`).
+
+        :param attr_name: (str) attribute name
+
+        :return: (PyTango.AttributeInfoEx) attribute configuration
+        :raise: (PyTango.DevFailed) if the configuration cannot be fetched
+        """
+        with self._attr_infos_lock:
+            attr_info, t = self._attr_infos.get(attr_name, (None, 0))
+            if time.time() - t < self.AttributeInfoMaxAge:
+                return attr_info
+            if not self._attr_infos_complete:
+                # do not retry on failure: the configurations will then be
+                # fetched individually
+                self._attr_infos_complete = True
+                try:
+                    self.fetchAttributeInfos()
+                except DevFailed:
+                    self.debug("Cannot fetch the attribute configurations")
+                attr_info, _ = self._attr_infos.get(attr_name, (None, 0))
+                if attr_info is not None:
+                    return attr_info
+        attr_info = self.attribute_query(attr_name)
+        self.updateAttributeInfo(attr_info)
+        return attr_info
+
+    def updateAttributeInfo(self, attr_info):
+        """Stores the given attribute configuration in the configuration cache
+        of the device (e.g. when a configuration event is received)
+
+        :param attr_info: (PyTango.AttributeInfoEx) attribute configuration
+        """
+        with self._attr_infos_lock:
+            self._attr_infos[attr_info.name] = attr_info, time.time()
+
+    def invalidateAttributeInfo(self, attr_name=None):
+        """Removes the configuration of the given attribute from the
+        configuration cache of the device, so that it gets fetched again
+        when needed
+
+        :param attr_name: (str or None) attribute name. If None, the whole
+                          cache is invalidated
+        """
+        with self._attr_infos_lock:
+            if attr_name is None:
+                self._attr_infos.clear()
+                self._attr_infos_complete = False
+            else:
+                self._attr_infos.pop(attr_name, None)
+
     @tep14_deprecation(alt='.getDeviceProxy() is not None')
     def isValidDev(self):
         '''see: :meth:`TaurusDevice.isValid`'''
@@ -337,18 +435,27 @@ class TangoDevice(TaurusDevice):
         ok, req_id, ts = req_id
         if not ok:
             self.__pollResult(attrs, ts, req_id, error=True)
-            return
+            return True
 
-        if timeout is None:
-            timeout = 0
-        timeout = int(timeout * 1000)
-        result = self.read_attributes_reply(req_id, timeout)
+        try:
+            if timeout is None:
+                # a timeout of 0 in read_attributes_reply means "wait forever"
+                result = self.read_attributes_reply(req_id, 0)
+            elif timeout <= 0:
+                # without timeout, read_attributes_reply does not wait at all
+                result = self.read_attributes_reply(req_id)
+            else:
+                result = self.read_attributes_reply(req_id,
+                                                    int(timeout * 1000))
+        except AsynReplyNotArrived:
+            return False
         self.__pollResult(attrs, ts, result)
+        return True
 
-    def poll(self, attrs, asynch=False, req_id=None):
+    def poll(self, attrs, asynch=False, req_id=None, timeout=None):
         '''optimized by reading of multiple attributes in one go'''
         if req_id is not None:
-            return self.__pollReply(attrs, req_id)
+            return self.__pollReply(attrs, req_id, timeout=timeout)
 
         if asynch:
             return self.__pollAsynch(attrs)
@@ -362,6 +469,16 @@ class TangoDevice(TaurusDevice):
             result = e
         self.__pollResult(attrs, ts, result, error=error)
 
+    def cancelPoll(self, req_id):
+        '''Discards a pending asynchronous polling request'''
+        ok, req_id, _ = req_id
+        if not ok:
+            return
+        try:
+            self.cancel_asynch_request(req_id)
+        except Exception:
+            self.debug("Could not cancel asynchronous request %r", req_id)
+
     def _repr_html_(self):
         try:
             info = self.getDeviceProxy().info()
@@ -25,7 +25,7 @@
 
 """This module contains all taurus tango attribute configuration"""
 
-__all__ = ["TangoFactory"]
+__all__ = ["TangoFactory", "TangoModelRequest"]
 
 __docformat__ = "restructuredtext"
 
@@ -39,14 +39,18 @@ except ImportError:
     debug(msg)
     raise
 
+import threading
+
 from taurus.core.taurusbasetypes import TaurusElementType
 from taurus.core.taurusfactory import TaurusFactory
 from taurus.core.taurusbasetypes import OperationMode
 from taurus.core.taurusexception import TaurusException, DoubleRegistration
 from taurus.core.tauruspollingtimer import TaurusPollingTimer
-from taurus.core.util.log import Logger, tep14_deprecation
+from taurus.core.taurusvalidator import clearValidatorCache
+from taurus.core.util.log import Logger, tep14_deprecation, debug
 from taurus.core.util.singleton import Singleton
 from taurus.core.util.containers import CaselessWeakValueDict, CaselessDict
+from taurus.core.util.threadpool import ThreadPool
 
 from .tangodatabase import TangoAuthority
 from .tangoattribute import TangoAttribute
@@ -57,6 +61,102 @@ _Attribute = TangoAttribute
 _Device = TangoDevice
 
 
+class TangoModelRequest(object):
+    """The result of an asynchronous model creation request (see
+    :meth:`TangoFactory.getAttributesAsync` and
+    :meth:`TangoFactory.getDevicesAsync`).
+
+    It works as a minimal future: :meth:`result` blocks until the model
+    object is available and :meth:`addDoneCallback` registers callables
+    to be called (with the request as argument) when it is. Note that the
+    callbacks are called from the thread that created the model object (i.e.,
+    *not* from the Qt main thread)
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def __repr__(self):
+        state = self.done() and "done" or "pending"
+        return "%s(%s, %s)" % (self.__class__.__name__, self._name, state)
+
+    def getName(self):
+        """returns the (full) name of the requested model
+
+        :return: (str)
+        """
+        return self._name
+
+    def done(self):
+        """returns True if the request has been completed (either
+        successfully or not)
+
+        :return: (bool)
+        """
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """returns the requested model object, waiting for it if needed
+
+        :param timeout: (float or None) maximum time to wait (in seconds).
+                        None (default) means waiting forever
+
+        :return: (TangoAttribute or TangoDevice) the model object
+        :raise: (TaurusException) if the timeout expires. If the model
+                could not be created, the exception raised by the creation
+                is raised.
+        """
+        exception = self.exception(timeout)
+        if exception is not None:
+            raise exception
+        return self._result
+
+    def exception(self, timeout=None):
+        """returns the exception raised when creating the model (or None if
+        it was successfully created), waiting for it if needed
+
+        :param timeout: (float or None) see :meth:`result`
+
+        :return: (Exception or None)
+        :raise: (TaurusException) if the timeout expires
+        """
+        if not self._event.wait(timeout):
+            raise TaurusException("Timeout waiting for %s" % self._name)
+        return self._exception
+
+    def addDoneCallback(self, callback):
+        """registers a callable to be called (with this request as argument)
+        when the request is completed. If it is already completed, the
+        callback is called immediately.
+
+        :param callback: (callable)
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        self._callCallback(callback)
+
+    def _setResult(self, result, exception=None):
+        with self._lock:
+            self._result, self._exception = result, exception
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._callCallback(callback)
+
+    def _callCallback(self, callback):
+        try:
+            callback(self)
+        except Exception:
+            debug("Error in callback for %s", self._name, exc_info=1)
+
+
 class TangoFactory(Singleton, TaurusFactory, Logger):
     """A :class:`TaurusFactory` singleton class to provide Tango-specific
     Taurus Element objects (TangoAuthority, TangoDevice, TangoAttribute,
@@ -92,6 +192,9 @@ class TangoFactory(Singleton, TaurusFactory, Logger):
                        TaurusElementType.Device: TangoDevice,
                        TaurusElementType.Attribute: TangoAttribute
                        }
+    #: number of threads used for the asynchronous creation of models
+    #: (see :meth:`getAttributesAsync` and :meth:`getDevicesAsync`)
+    AsyncCreationThreads = 10
 
     def __init__(self):
         """ Initialization. Nothing to be done here for now."""
@@ -104,6 +207,8 @@ class TangoFactory(Singleton, TaurusFactory, Logger):
         self.call__init__(Logger, name)
         self.call__init__(TaurusFactory)
         self._polling_enabled = True
+        self._creation_pool = None
+        self._requests_lock = threading.Lock()
         self.reInit()
         self.scheme = 'tango'
 
@@ -118,6 +223,7 @@ class TangoFactory(Singleton, TaurusFactory, Logger):
         self.tango_dev_queries = CaselessWeakValueDict()
         self.tango_alias_devs = CaselessWeakValueDict()
         self.polling_timers = {}
+        self.pending_requests = CaselessDict()
 
         # Plugin device classes
         self.tango_dev_klasses = {}
@@ -139,6 +245,9 @@ class TangoFactory(Singleton, TaurusFactory, Logger):
             v.cleanUp()
         for k, v in self.tango_db.items():
             v.cleanUp()
+        if self._creation_pool is not None:
+            self._creation_pool.join()
+            self._creation_pool = None
         self.reInit()
 
     def getExistingAttributes(self):
@@ -169,6 +278,8 @@ class TangoFactory(Singleton, TaurusFactory, Logger):
         """
         self._default_tango_host = tango_host
         self.dft_db = None
+        # the normal names depend on the default tango host
+        clearValidatorCache()
 
     def registerAttributeClass(self, attr_name, attr_klass):
         """Registers a new attribute class for the attribute name.
@@ -377,6 +488,155 @@ class TangoFactory(Singleton, TaurusFactory, Logger):
                 raise
         return attr
 
+    def getDevicesAsync(self, dev_names, callback=None):
+        """Requests the creation of the given devices without blocking.
+        The devices (and their DeviceProxy objects) are created in parallel
+        by a pool of threads.
+
+        Concurrent requests for the same device are merged (i.e., they get
+        the same :class:`TangoModelRequest`).
+
+        :param dev_names: (seq<str>) tango device names (see :meth:`getDevice`)
+        :param callback: (callable or None) if given, it is registered in all
+                         the requests (see
+                         :meth:`TangoModelRequest.addDoneCallback`)
+
+        :return: (list<TangoModelRequest>) the requests, in the same order
+                 as the given names
+        """
+        validator = _Device.getNameValidator()
+        pool = self._getCreationPool()
+        requests = []
+        for dev_name in dev_names:
+            full_dev_name = None
+            if validator.getUriGroups(dev_name) is not None:
+                full_dev_name, _, _ = validator.getNames(dev_name)
+            if full_dev_name is None:
+                req = TangoModelRequest(dev_name)
+                req._setResult(None, TaurusException(
+                    "Invalid Tango device name '%s'" % dev_name))
+            else:
+                req, is_new = self._getRequest(full_dev_name,
+                                               self.tango_devs)
+                if is_new:
+                    pool.add(self._createDevicesJob, None, req)
+            if callback is not None:
+                req.addDoneCallback(callback)
+            requests.append(req)
+        return requests
+
+    def getAttributesAsync(self, attr_names, callback=None, **kwargs):
+        """Requests the creation of the given attributes without blocking.
+
+        The attributes are grouped by device and each group is processed by
+        a pool of threads (so that the devices are created in parallel). The
+        configurations of all the requested attributes of a device are
+        fetched in a single call.
+
+        Concurrent requests for the same attribute are merged (i.e., they get
+        the same :class:`TangoModelRequest`).
+
+        :param attr_names: (seq<str>) attribute names (see :meth:`getAttribute`)
+        :param callback: (callable or None) if given, it is registered in all
+                         the requests (see
+                         :meth:`TangoModelRequest.addDoneCallback`)
+        :param kwargs: passed to the attribute constructor (see
+                       :meth:`getAttribute`)
+
+        :return: (list<TangoModelRequest>) the requests, in the same order
+                 as the given names
+        """
+        validator = _Attribute.getNameValidator()
+        requests = []
+        batches = {}
+        for attr_name in attr_names:
+            full_attr_name = None
+            if validator.getUriGroups(attr_name) is not None:
+                full_attr_name, _, _ = validator.getNames(attr_name)
+            if full_attr_name is None:
+                req = TangoModelRequest(attr_name)
+                req._setResult(None, TaurusException(
+                    "Invalid Tango attribute name '%s'" % attr_name))
+            else:
+                req, is_new = self._getRequest(full_attr_name,
+                                               self.tango_attrs)
+                if is_new:
+                    dev_name = full_attr_name.rsplit('/', 1)[0]
+                    batches.setdefault(dev_name, []).append(req)
+            if callback is not None:
+                req.addDoneCallback(callback)
+            requests.append(req)
+        if batches:
+            pool = self._getCreationPool()
+            for dev_name, reqs in batches.items():
+                pool.add(self._createAttributesJob, None, dev_name, reqs,
+                         kwargs)
+        return requests
+
+    def _getCreationPool(self):
+        if self._creation_pool is None:
+            self._creation_pool = ThreadPool(name="TangoFactoryTP",
+                                             parent=self,
+                                             Psize=self.AsyncCreationThreads,
+                                             Qsize=0)
+        return self._creation_pool
+
+    def _getRequest(self, full_name, existing):
+        """returns a tuple of (request, is_new) for the given model name. The
+        request is already completed if the model object exists in the given
+        dictionary, and it is the pending request for the same name if any.
+        """
+        with self._requests_lock:
+            req = self.pending_requests.get(full_name)
+            if req is not None:
+                return req, False
+            req = TangoModelRequest(full_name)
+            obj = existing.get(full_name)
+            if obj is not None:
+                req._setResult(obj)
+                return req, False
+            self.pending_requests[full_name] = req
+            return req, True
+
+    def _finishRequest(self, req, result=None, exception=None):
+        with self._requests_lock:
+            if self.pending_requests.get(req.getName()) is req:
+                del self.pending_requests[req.getName()]
+        req._setResult(result, exception)
+
+    def _createDevicesJob(self, req):
+        try:
+            dev = self.getDevice(req.getName())
+        except Exception, e:
+            self._finishRequest(req, exception=e)
+        else:
+            self._finishRequest(req, dev)
+
+    def _createAttributesJob(self, dev_name, requests, kwargs):
+        try:
+            dev = self.getDevice(dev_name)
+        except Exception, e:
+            for req in requests:
+                self._finishRequest(req, exception=e)
+            return
+        # fetch the configurations of all the attributes in one call (they
+        # are stored in the configuration cache of the device)
+        names = [req.getName().rsplit('/', 1)[1] for req in requests]
+        try:
+            dev.fetchAttributeInfos(names)
+        except PyTango.DevFailed:
+            # (e.g. if one of the attributes does not exist). The
+            # configurations will be fetched on attribute creation
+            self.debug("Cannot get the attribute configurations of %s",
+                       dev_name, exc_info=1)
+        for req in requests:
+            try:
+                attr = self.getAttribute(req.getName(), **kwargs)
+            except Exception, e:
+                self._finishRequest(req, exception=e)
+            else:
+                self._finishRequest(req, attr)
+
     def getAttributeInfo(self, full_attr_name):
         """Deprecated: Use :meth:`taurus.core.tango.TangoFactory.getConfiguration` instead.
 
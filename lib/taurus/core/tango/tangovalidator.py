@@ -33,7 +33,8 @@ __docformat__ = "restructuredtext"
 
 from taurus.core.taurusvalidator import (TaurusAttributeNameValidator,
                                          TaurusDeviceNameValidator,
-                                         TaurusAuthorityNameValidator)
+                                         TaurusAuthorityNameValidator,
+                                         cachedGetNames)
 
 
 # todo: I do not understand the behaviour of getNames for Auth, Dev and Attr in
@@ -80,6 +81,7 @@ class TangoDeviceNameValidator(TaurusDeviceNameValidator):
     query = '(?!)'
     fragment = '(?!)'
 
+    @cachedGetNames
     def getNames(self, fullname, factory=None, queryAuth=True):
         '''reimplemented from :class:`TaurusDeviceNameValidator`. It accepts an
         extra keyword arg `queryAuth` which, if set to False, will prevent the
@@ -175,6 +177,7 @@ class TangoAttributeNameValidator(TaurusAttributeNameValidator):
     query = '(?!)'
     fragment = '(?P<cfgkey>[^# ]*)'
 
+    @cachedGetNames
     def getNames(self, fullname, factory=None, queryAuth=True, fragment=False):
         """Returns the complete and short names"""
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.core.tango.tangofactory"""
+
+__docformat__ = 'restructuredtext'
+
+import taurus
+from taurus.external import unittest
+from taurus.core.taurusexception import TaurusException
+from taurus.core.tango.test import TangoSchemeTestLauncher
+from taurus.core.tango.tangoattribute import TangoAttribute
+
+
+class AsyncCreationTestCase(TangoSchemeTestLauncher, unittest.TestCase):
+    """TestCase for the asynchronous model creation of the TangoFactory"""
+
+    _ATTR_NAMES = ('float_scalar', 'short_spectrum', 'boolean_scalar')
+
+    def setUp(self):
+        self.factory = taurus.Factory('tango')
+        self.done = []
+
+    def _callback(self, req):
+        self.done.append(req)
+
+    def test_attributes(self):
+        '''check the creation of several attributes of a device'''
+        names = ['%s/%s' % (self.DEV_NAME, n) for n in self._ATTR_NAMES]
+        reqs = self.factory.getAttributesAsync(names, callback=self._callback)
+        self.assertEqual(len(reqs), len(names))
+        for name, req in zip(names, reqs):
+            attr = req.result(timeout=10)
+            self.assertTrue(isinstance(attr, TangoAttribute))
+            self.assertTrue(attr is taurus.Attribute(name))
+        self.assertEqual(len(self.done), len(names))
+
+    def test_deduplication(self):
+        '''check that concurrent requests for the same attribute are merged'''
+        name = '%s/double_scalar' % self.DEV_NAME
+        req1, req2 = self.factory.getAttributesAsync([name, name.upper()])
+        self.assertTrue(req1.result(timeout=10) is req2.result(timeout=10))
+
+    def test_invalid(self):
+        '''check that invalid names are reported through the request'''
+        req, = self.factory.getAttributesAsync(['tango:a/b'])
+        self.assertTrue(req.done())
+        self.assertTrue(isinstance(req.exception(), TaurusException))
+        self.assertRaises(TaurusException, req.result)
+
+    def test_devices(self):
+        '''check the asynchronous creation of a device'''
+        req, = self.factory.getDevicesAsync([self.DEV_NAME])
+        self.assertTrue(req.result(timeout=10) is taurus.Device(self.DEV_NAME))
+
+
+class AttributeInfoCacheTestCase(TangoSchemeTestLauncher, unittest.TestCase):
+    """TestCase for the attribute configuration cache of TangoDevice"""
+
+    def test_cache(self):
+        '''check that all the configurations are fetched at once'''
+        dev = taurus.Device(self.DEV_NAME)
+        dev.invalidateAttributeInfo()
+        attr = taurus.Attribute('%s/float_scalar' % self.DEV_NAME)
+        info = dev.getAttributeInfoEx('short_spectrum')
+        self.assertEqual(info.name.lower(), 'short_spectrum')
+        self.assertTrue(dev._attr_infos_complete)
+        self.assertTrue('float_scalar' in dev._attr_infos)
+        self.assertEqual(attr.getAttributeInfoEx().name.lower(),
+                         'float_scalar')
+
+    def test_invalidate(self):
+        '''check the invalidation of the configuration cache'''
+        dev = taurus.Device(self.DEV_NAME)
+        dev.getAttributeInfoEx('float_scalar')
+        dev.invalidateAttributeInfo('float_scalar')
+        self.assertFalse('float_scalar' in dev._attr_infos)
+        dev.invalidateAttributeInfo()
+        self.assertFalse(dev._attr_infos_complete)
+        self.assertEqual(len(dev._attr_infos), 0)
+
+    def test_maxAge(self):
+        '''check that old configurations are fetched again'''
+        dev = taurus.Device(self.DEV_NAME)
+        dev.getAttributeInfoEx('float_scalar')
+        _, t = dev._attr_infos['float_scalar']
+        dev.AttributeInfoMaxAge = 0
+        try:
+            info = dev.getAttributeInfoEx('float_scalar')
+        finally:
+            del dev.AttributeInfoMaxAge
+        self.assertEqual(info.name.lower(), 'float_scalar')
+        self.assertTrue(dev._attr_infos['float_scalar'][1] > t)
+
+
+if __name__ == '__main__':
+    pass
@@ -120,9 +120,15 @@ class TaurusDevice(TaurusModel):
         obj_name = "%s%s" % (self.getFullName(), child_name)
         return self.factory().findObject(obj_name)
 
-    def poll(self, attrs, asynch=False, req_id=None):
+    def poll(self, attrs, asynch=False, req_id=None, timeout=None):
         '''Polling certain attributes of the device. This default
-        implementation simply polls each attribute one by one'''
+        implementation simply polls each attribute one by one.
+
+        When collecting the reply of an asynchronous request (req_id given),
+        timeout is the maximum time (in seconds) to wait for it (None means
+        wait until it arrives). Implementations return False if the reply
+        did not arrive in time (in which case nothing is notified and the
+        reply may be collected later)'''
 
         # asynchronous requests are not supported. If asked to do it,
         # just return an ID of 1 and in the reply (req_id != None) we do a
@@ -131,6 +137,13 @@ class TaurusDevice(TaurusModel):
             return 1
         for attr in attrs.values():
             attr.poll()
+        return True
+
+    def cancelPoll(self, req_id):
+        '''Discards a pending asynchronous polling request (i.e., one whose
+        reply did not arrive in time). This default implementation does
+        nothing since asynchronous requests are not supported'''
+        pass
 
     @property
     def description(self):
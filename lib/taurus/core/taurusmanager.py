@@ -343,7 +343,7 @@ class TaurusManager(Singleton, Logger):
                     m = __import__(full_module_name,
                                    globals(), locals(), ['*'])
                 except:
-                    self.debug('Failed to inspect %s' % (full_module_name))
+                    self.debug('Failed to inspect %s', full_module_name)
                     self.debug('Details:', exc_info=1)
                     continue
             for s in m.__dict__.values():
@@ -363,7 +363,7 @@ class TaurusManager(Singleton, Logger):
                 except:
                     pass
                 if not plugin is None:
-                    self.debug('Found plugin %s' % plugin.__name__)
+                    self.debug('Found plugin %s', plugin.__name__)
                     plugins.append(plugin)
         return plugins
 
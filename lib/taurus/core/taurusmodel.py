@@ -32,17 +32,29 @@ __docformat__ = "restructuredtext"
 import weakref
 import operator
 import threading
+from collections import OrderedDict
 
 from .util.log import Logger
 from .util.event import CallableRef, BoundMethodWeakref
+from .util.timer import Timer
 from .taurusbasetypes import TaurusEventType, MatchLevel
 
 
+def _notifyEventReceived(listener, src, evt_type, evt_value):
+    listener.eventReceived(src, evt_type, evt_value)
+
+
+def _notifyCall(listener, src, evt_type, evt_value):
+    listener(src, evt_type, evt_value)
+
+
 class TaurusModel(Logger):
 
     RegularEvent = (TaurusEventType.Change,
                     TaurusEventType.Config, TaurusEventType.Periodic)
 
+    _eventBufferPeriod = 0
+
     def __init__(self, full_name, parent, serializationMode=None):
         v = self.getNameValidator()
         self._full_name, self._norm_name, self._simp_name = v.getNames(
@@ -66,6 +78,13 @@ class TaurusModel(Logger):
         except Exception:
             self._parentObj = None
         self._listeners = []
+        self._listenersLock = threading.RLock()
+        self._dispatchTable = None
+        self._bufferedEvents = OrderedDict()
+        self._bufferedEventsTimer = None
+        self._eventsBufferLock = threading.RLock()
+        if self._eventBufferPeriod:
+            self.setEventBufferPeriod(self._eventBufferPeriod)
 
     def __str__name__(self, name):
         return '{0}({1})'.format(self.__class__.__name__, name)
@@ -79,7 +98,11 @@ class TaurusModel(Logger):
     def cleanUp(self):
         self.trace("[TaurusModel] cleanUp")
         #self._parentObj = None
+        if self._bufferedEventsTimer is not None:
+            self._bufferedEventsTimer.stop()
+            self._bufferedEventsTimer = None
         self._listeners = None
+        self._dispatchTable = None
         Logger.cleanUp(self)
 
     #-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-
@@ -209,10 +232,12 @@ class TaurusModel(Logger):
     def _listenerDied(self, weak_listener):
         if self._listeners is None:
             return
-        try:
-            self._listeners.remove(weak_listener)
-        except Exception, e:
-            pass
+        with self._listenersLock:
+            self._dispatchTable = None
+            try:
+                self._listeners.remove(weak_listener)
+            except Exception, e:
+                pass
 
     def _getCallableRef(self, listener, cb=None):
         # return weakref.ref(listener, self._listenerDied)
@@ -227,19 +252,23 @@ class TaurusModel(Logger):
             return False
 
         weak_listener = self._getCallableRef(listener, self._listenerDied)
-        if weak_listener in self._listeners:
-            return False
-        self._listeners.append(weak_listener)
+        with self._listenersLock:
+            if weak_listener in self._listeners:
+                return False
+            self._dispatchTable = None
+            self._listeners.append(weak_listener)
         return True
 
     def removeListener(self, listener):
         if self._listeners is None:
             return
         weak_listener = self._getCallableRef(listener)
-        try:
-            self._listeners.remove(weak_listener)
-        except Exception, e:
-            return False
+        with self._listenersLock:
+            self._dispatchTable = None
+            try:
+                self._listeners.remove(weak_listener)
+            except Exception, e:
+                return False
         return True
 
     def forceListening(self):
@@ -266,13 +295,91 @@ class TaurusModel(Logger):
             return False
         return len(self._listeners) > 0
 
+    def _buildDispatchTable(self):
+        """Returns a tuple of (weak_listener, func) items, where func is the
+        function to be called as `func(listener, src, type, value)` to notify
+        the listener (i.e. the function of its eventReceived method or a
+        function calling it directly). The table is cached until the
+        listeners change (including when a listener dies).
+
+        Note: only weak references to the listeners are kept, since caching
+        their bound methods would keep them alive"""
+        with self._listenersLock:
+            if self._listeners is None:
+                return ()
+            table = []
+            for weak_listener in self._listeners:
+                l = weak_listener()
+                if l is None:
+                    continue
+                meth = getattr(l, 'eventReceived', None)
+                if meth is not None and operator.isCallable(meth):
+                    func = getattr(meth, 'im_func', None)
+                    if func is None or getattr(meth, 'im_self', None) is not l:
+                        func = _notifyEventReceived
+                    table.append((weak_listener, func))
+                elif operator.isCallable(l):
+                    table.append((weak_listener, _notifyCall))
+            self._dispatchTable = table = tuple(table)
+        return table
+
+    def setEventBufferPeriod(self, period):
+        '''Set the period at which the buffered events are fired to the
+        listeners. While buffering, only the latest value of each regular
+        event type (see :attr:`RegularEvent`) received within a period is
+        delivered, so that listeners are not flooded with events faster than
+        they can process them. If period is 0, the event buffering is disabled
+        (i.e., events are fired as soon as they are received)
+
+        :param period: (float) period in seconds for the automatic event firing.
+                    period=0 will disable the event buffering.
+        '''
+        self._eventBufferPeriod = period
+        if self._bufferedEventsTimer is not None:
+            self._bufferedEventsTimer.stop()
+            self._bufferedEventsTimer = None
+        if period == 0:
+            self.fireBufferedEvents()  # flush the buffer
+        else:
+            self._bufferedEventsTimer = Timer(period, self.fireBufferedEvents,
+                                              self)
+            self._bufferedEventsTimer.start()
+
+    def getEventBufferPeriod(self):
+        '''Returns the event buffer period
+
+        :return: (float) period (in s). 0 means event buffering is disabled.
+        '''
+        return self._eventBufferPeriod
+
+    def fireBufferedEvents(self):
+        '''Fire all events currently buffered (and flush the buffer)
+
+        Note: this method is normally called from an event buffer timer thread
+              but it can also be called any time the buffer needs to be flushed
+        '''
+        # the listeners are called out of the lock, so that fireEvent is not
+        # blocked while they process the events
+        with self._eventsBufferLock:
+            events, self._bufferedEvents = self._bufferedEvents, OrderedDict()
+        # in the order in which the (latest) events were received
+        for event_type, event_value in events.iteritems():
+            self._dispatchEvent(event_type, event_value)
+
     def fireEvent(self, event_type, event_value, listeners=None):
         """sends an event to all listeners or a specific one"""
 
-        if listeners is None:
-            listeners = self._listeners
-
-        if listeners is None:
+        if listeners is None or listeners is self._listeners:
+            if self._eventBufferPeriod:
+                if event_type in self.RegularEvent:
+                    with self._eventsBufferLock:
+                        # store it: only the latest value will be fired
+                        self._bufferedEvents.pop(event_type, None)
+                        self._bufferedEvents[event_type] = event_value
+                    return
+                # keep the order of events
+                self.fireBufferedEvents()
+            self._dispatchEvent(event_type, event_value)
             return
 
         if not operator.isSequenceType(listeners):
@@ -291,6 +398,16 @@ class TaurusModel(Logger):
             elif operator.isCallable(l):
                 l(self, event_type, event_value)
 
+    def _dispatchEvent(self, event_type, event_value):
+        """sends an event to all listeners using the dispatch table"""
+        table = self._dispatchTable
+        if table is None:
+            table = self._buildDispatchTable()
+        for weak_listener, func in table:
+            l = weak_listener()
+            if l is not None:
+                func(l, self, event_type, event_value)
+
     def isWritable(self):
         return False
 
@@ -30,28 +30,123 @@ __all__ = ["TaurusPollingTimer"]
 __docformat__ = "restructuredtext"
 
 import time
+import random
 import threading
 
+from taurus import tauruscustomsettings
 from .util.log import Logger, DebugIt
 from .util.containers import CaselessDict
 from .util.timer import Timer
+from .taurusexception import TaurusException
+
+
+def _sameValue(v1, v2):
+    """Tells if two polled values are equal (also for array values)"""
+    try:
+        return bool(v1 == v2)
+    except ValueError:
+        import numpy
+        return numpy.array_equal(v1, v2)
+
+
+class _PollState(object):
+    """Adaptive scheduling state of an attribute registered for polling"""
+
+    __slots__ = ('backoff', 'countdown', 'quiet', 'last')
+
+    #: marker for "no value polled yet"
+    Undefined = object()
+
+    #: marker for a failed polling
+    Failed = object()
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.backoff = 1  # poll once every "backoff" cycles
+        self.countdown = 0  # cycles left until the next poll
+        self.quiet = 0  # consecutive failed or unchanged polls
+        self.last = self.Undefined
+
+
+class _PolledAttribute(object):
+    """Wraps an attribute passed to :meth:`TaurusDevice.poll` in order to feed
+    the outcome of the polling back to the scheduler"""
+
+    def __init__(self, attribute, timer):
+        self._attribute = attribute
+        self._timer = timer
+
+    def poll(self, **kwargs):
+        ret = self._attribute.poll(**kwargs)
+        # the polling rate bookkeeping must never prevent the value update
+        try:
+            self._timer._updateBackoff(self._attribute, kwargs)
+        except Exception:
+            self._timer.warning("Error updating the polling rate of %s",
+                                self._attribute)
+            self._timer.debug("Details:", exc_info=1)
+        return ret
+
+    def __getattr__(self, name):
+        return getattr(self._attribute, name)
 
 
 class TaurusPollingTimer(Logger):
     """ Polling timer manages a list of attributes that have to be polled in
-    the same period """
+    the same period.
+
+    The period is divided in a number of phases and each device is assigned
+    to the least busy phase, so that the poll requests are spread across the
+    period instead of being sent all at once. Attributes whose polling keeps
+    failing or whose value does not change are polled less often (their
+    period is doubled every `backoff_threshold` quiet polls, up to
+    `max_backoff` times the nominal period) and go back to the nominal period
+    as soon as their value changes."""
+
+    #: default reply timeout as a fraction of the polling period
+    DefaultReplyTimeoutRatio = 0.8
+
+    #: interval (in seconds) between checks for pending replies
+    ReplyCheckPeriod = 0.005
+
+    #: default number of phases in which the period is divided
+    DefaultPhases = getattr(tauruscustomsettings, 'POLLING_PHASES', 1)
+
+    #: default number of quiet polls after which the polling slows down
+    DefaultBackoffThreshold = getattr(tauruscustomsettings,
+                                      'POLLING_BACKOFF_THRESHOLD', 0)
 
-    def __init__(self, period, parent=None):
+    #: default maximum slow down factor of the polling
+    DefaultMaxBackoff = getattr(tauruscustomsettings, 'POLLING_MAX_BACKOFF', 1)
+
+    def __init__(self, period, parent=None, phases=None):
         """Constructor
 
            :param period: (int) polling period (miliseconds)
            :param parent: (Logger) parent object (default is None)
+           :param phases: (int) number of phases in which the period is
+                          divided (default is None, meaning
+                          :attr:`DefaultPhases`)
         """
         name = "TaurusPollingTimer[%d]" % period
         self.call__init__(Logger, name, parent)
+        if phases is None:
+            phases = self.DefaultPhases
         self.dev_dict = {}
+        self.dev_phase = {}
+        self.attr_state = {}
         self.attr_nb = 0
-        self.timer = Timer(period / 1000.0, self._pollAttributes, self)
+        self.period = period
+        self.phases = max(1, int(phases))
+        self.backoff_threshold = self.DefaultBackoffThreshold
+        self.max_backoff = self.DefaultMaxBackoff
+        self.setReplyTimeout(None)
+        self._phase = 0
+        self._pending = {}
+        self.timer = Timer(period / 1000.0 / self.phases,
+                           self._pollAttributes, self)
         self.lock = threading.RLock()
 
     def start(self):
@@ -100,8 +195,10 @@ class TaurusPollingTimer(Logger):
                 self.dev_dict[dev] = attr_dict = {}
             else:
                 self.dev_dict[dev] = attr_dict = CaselessDict()
+            self.dev_phase[dev] = self._choosePhase()
         if attr_name not in attr_dict:
             attr_dict[attr_name] = attribute
+            self.attr_state[attribute] = _PollState()
             self.attr_nb += 1
         if self.attr_nb == 1 and auto_start:
             self.start()
@@ -121,27 +218,185 @@ class TaurusPollingTimer(Logger):
         if attr_dict is None:
             return
         if attr_name in attr_dict:
+            self.attr_state.pop(attr_dict[attr_name], None)
             del attr_dict[attr_name]
             if not attr_dict:
                 del self.dev_dict[dev]
+                self.dev_phase.pop(dev, None)
             self.attr_nb -= 1
         if self.attr_nb < 1:
             self.stop()
 
+    def getReplyTimeout(self):
+        """Returns the maximum time to wait for the reply of each device in a
+        polling cycle
+
+           :return: (int) reply timeout (miliseconds)
+        """
+        return int(self.reply_timeout * 1000)
+
+    def setReplyTimeout(self, timeout):
+        """Sets the maximum time to wait for the reply of each device in a
+        polling cycle. Devices whose reply did not arrive in time are marked
+        as timed out (their attributes receive an error) without delaying
+        the rest of devices.
+
+           :param timeout: (int) reply timeout (miliseconds). If None is
+                           passed, the default (a fraction of the polling
+                           period) is used
+        """
+        if timeout is None:
+            timeout = self.period * self.DefaultReplyTimeoutRatio
+        self.reply_timeout = timeout / 1000.0
+
+    def getBackoff(self, attribute):
+        """Returns the current slow down factor of the polling of the given
+        attribute (i.e., it is being polled once every that many periods)
+
+           :param attribute: (taurus.core.taurusattribute.TaurusAttribute) the attribute
+
+           :return: (int) the slow down factor (1 means full rate)
+        """
+        state = self.attr_state.get(attribute)
+        if state is None:
+            return 1
+        return state.backoff
+
+    def resetBackoff(self, attribute=None):
+        """Makes the given attribute (or all attributes if None is passed) be
+        polled at full rate again.
+
+           :param attribute: (taurus.core.taurusattribute.TaurusAttribute) the attribute
+        """
+        if attribute is None:
+            states = self.attr_state.values()
+        else:
+            states = filter(None, [self.attr_state.get(attribute)])
+        for state in states:
+            state.reset()
+
+    def _choosePhase(self):
+        """Returns the phase with less devices (randomly chosen among the
+        least busy ones so that different timers do not poll in lockstep)"""
+        loads = [0] * self.phases
+        for phase in self.dev_phase.values():
+            loads[phase] += 1
+        min_load = min(loads)
+        return random.choice([phase for phase, load in enumerate(loads)
+                              if load == min_load])
+
+    def _dueAttributes(self, attr_dict):
+        """Returns a dict (of the same kind than attr_dict) with the
+        attributes of a device that must be polled in the current cycle"""
+        due = attr_dict.__class__()
+        for attr_name, attr in attr_dict.items():
+            state = self.attr_state.get(attr)
+            if state is None:
+                self.attr_state[attr] = state = _PollState()
+            state.countdown -= 1
+            if state.countdown <= 0:
+                state.countdown = state.backoff
+                due[attr_name] = _PolledAttribute(attr, self)
+        return due
+
+    def _updateBackoff(self, attribute, poll_kwargs):
+        """Updates the polling rate of an attribute according to the outcome
+        of its polling (given as the kwargs passed to its poll method)"""
+        state = self.attr_state.get(attribute)
+        if state is None or self.backoff_threshold <= 0:
+            return
+        if poll_kwargs.get('single', True):
+            # the attribute reads its own value: the outcome is unknown
+            state.reset()
+            return
+        if poll_kwargs.get('error') is not None:
+            value = _PollState.Failed
+            changed = False
+        else:
+            value = poll_kwargs.get('value')
+            value = getattr(value, 'value', value), \
+                getattr(value, 'quality', None)
+            last = state.last
+            if last is _PollState.Undefined or last is _PollState.Failed:
+                changed = True
+            else:
+                changed = value[1] != last[1] or \
+                    not _sameValue(value[0], last[0])
+        state.last = value
+        if changed:
+            if state.backoff > 1:
+                self.debug("%s changed: back to full polling rate",
+                           attribute)
+            state.backoff, state.countdown, state.quiet = 1, 1, 0
+            return
+        state.quiet += 1
+        if state.quiet >= self.backoff_threshold:
+            state.quiet = 0
+            backoff = min(state.backoff * 2, self.max_backoff)
+            if backoff != state.backoff:
+                self.debug("%s is quiet: polling it every %d periods",
+                           attribute, backoff)
+                state.backoff = state.countdown = backoff
+
     def _pollAttributes(self):
         """Polls the registered attributes. This method is called by the timer
            when it is time to poll. Do not call this method directly
         """
-        req_ids = {}
-        for dev, attrs in self.dev_dict.items():
+        start = time.time()
+        phase = self._phase
+        self._phase = (phase + 1) % self.phases
+
+        # dispatch the requests of all devices of this phase in one go
+        # (devices with a pending request from a previous cycle are skipped)
+        pending = self._pending
+        for dev, attr_dict in self.dev_dict.items():
+            if self.dev_phase.get(dev, 0) != phase or dev in pending:
+                continue
+            attrs = self._dueAttributes(attr_dict)
+            if not attrs:
+                continue
             try:
                 req_id = dev.poll(attrs, asynch=True)
-                req_ids[dev] = attrs, req_id
+                pending[dev] = attrs, req_id, start + self.reply_timeout
             except Exception as e:
                 self.error("poll_asynch error")
                 self.debug("Details:", exc_info=1)
-        for dev, (attrs, req_id) in req_ids.items():
+
+        # collect the replies as they arrive during this phase's share of the
+        # reply timeout. Late devices are discarded and the rest are left
+        # pending
+        end = start + self.reply_timeout / self.phases
+        while pending:
+            now = time.time()
+            for dev, (attrs, req_id, deadline) in pending.items():
+                try:
+                    done = dev.poll(attrs, req_id=req_id, timeout=0)
+                except Exception as e:
+                    self.error("poll_reply error on %s: %r", dev, e)
+                    self.debug("Details:", exc_info=1)
+                    done = True
+                if done is False and now >= deadline:
+                    self._pollTimedOut(dev, attrs, req_id)
+                    done = True
+                if done is not False:
+                    del pending[dev]
+            if not pending or now >= end:
+                break
+            time.sleep(self.ReplyCheckPeriod)
+
+    def _pollTimedOut(self, dev, attrs, req_id):
+        """Notifies the given attributes of a device that its polling reply
+           did not arrive in time"""
+        self.debug("poll reply from %s timed out", dev.getFullName())
+        try:
+            dev.cancelPoll(req_id)
+        except Exception:
+            self.debug("Details:", exc_info=1)
+        ts = time.time()
+        err = TaurusException("Poll reply timed out after %g ms"
+                              % self.getReplyTimeout())
+        for attr in attrs.values():
             try:
-                dev.poll(attrs, req_id=req_id)
-            except Exception as e:
-                self.error("poll_reply error")
+                attr.poll(single=False, value=None, error=err, time=ts)
+            except Exception:
+                self.debug("Details:", exc_info=1)
@@ -27,16 +27,68 @@
 
 
 __all__ = ["TaurusAuthorityNameValidator", "TaurusDeviceNameValidator",
-           "TaurusAttributeNameValidator"]
+           "TaurusAttributeNameValidator", "cachedGetNames",
+           "getValidatorCache", "clearValidatorCache"]
 
 
 __docformat__ = "restructuredtext"
 
 import re
+import functools
 from taurus import tauruscustomsettings
 from taurus.core.util.singleton import Singleton
+from taurus.core.util.containers import LRUCache
 from taurus.core.taurushelper import makeSchemeExplicit
 
+#: maximum number of results of getUriGroups and getNames cached by the
+#: validators
+NameCacheSize = 10000
+
+# results of the validators, keyed by (validator class, name, strict,...)
+_nameCache = LRUCache(NameCacheSize)
+
+_MISSING = object()
+
+
+def getValidatorCache():
+    """Returns the cache of the results of the validators
+
+    :return: (taurus.core.util.containers.LRUCache)
+    """
+    return _nameCache
+
+
+def clearValidatorCache():
+    """Discards the cached results of the validators. It must be called when
+    something that affects the names (e.g. the default TANGO_HOST) changes
+    """
+    _nameCache.clear()
+
+
+def _isStrictDefault():
+    return getattr(tauruscustomsettings, 'STRICT_MODEL_NAMES', False)
+
+
+def cachedGetNames(getNames):
+    """Decorator for the getNames methods of the validators which caches their
+    results (only those with the complete, normal and short names defined).
+    The results are cached per validator class, name and arguments.
+    """
+    @functools.wraps(getNames)
+    def wrapper(self, fullname, *args, **kwargs):
+        try:
+            key = (self.__class__, 'getNames', fullname, _isStrictDefault(),
+                   args, tuple(sorted(kwargs.iteritems())))
+            ret = _nameCache.get(key, _MISSING)
+        except TypeError:  # unhashable arguments
+            return getNames(self, fullname, *args, **kwargs)
+        if ret is _MISSING:
+            ret = getNames(self, fullname, *args, **kwargs)
+            if ret is not None and None not in ret[:3]:
+                _nameCache.put(key, ret)
+        return ret
+    return wrapper
+
 
 class _TaurusBaseValidator(Singleton):
     '''This is a private base class for taurus base validators. Do not derive
@@ -54,7 +106,9 @@ class _TaurusBaseValidator(Singleton):
             msg = ('This is  an abstract name validator class. ' +
                    'Only scheme-specific derived classes can be instantiated')
             raise NotImplementedError(msg)
-
+        # note: __init__ is called on each instantiation of the singleton
+        if 'name_re' in self.__dict__:
+            return
         self.name_re = re.compile(self.namePattern)
         if self.nonStrictNamePattern is not None:
             self.nonStrictName_re = re.compile(self.nonStrictNamePattern)
@@ -105,9 +159,24 @@ class _TaurusBaseValidator(Singleton):
         '''returns the named groups dictionary from the URI regexp matching.
         If strict is False, it also tries to match against the non-strict regexp
         (It logs a warning if it matched only the non-strict alternative)
+
+        The results are cached (see :func:`clearValidatorCache`), and a copy
+        of the cached dictionary is returned.
         '''
         if strict is None:
-            strict = getattr(tauruscustomsettings, 'STRICT_MODEL_NAMES', False)
+            strict = _isStrictDefault()
+        key = self.__class__, name, bool(strict)
+        groups = _nameCache.get(key, _MISSING)
+        if groups is _MISSING:
+            groups = self._matchUriGroups(name, strict)
+            _nameCache.put(key, groups)
+        if groups is None:
+            return None
+        return dict(groups)
+
+    def _matchUriGroups(self, name, strict):
+        '''matches the name against the URI regexps (see
+        :meth:`getUriGroups`)'''
         name = makeSchemeExplicit(name, default=self.scheme)
         m = self.name_re.match(name)
         # if it is strictly valid, return the groups
@@ -227,6 +296,7 @@ class TaurusAuthorityNameValidator(_TaurusBaseValidator):
               r'(\?(?P<query>%(query)s))?' + \
               r'(#(?P<fragment>%(fragment)s))?$'
 
+    @cachedGetNames
     def getNames(self, name, factory=None):
         '''basic implementation for getNames for authorities. You may
         reimplement it in your scheme if required'''
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Benchmark for the name validation of the taurus schemes
+
+It measures getUriGroups, isValid and getNames for some names of each
+scheme, both with the validator cache cleared before each call (uncached)
+and reusing it (cached). Schemes whose modules cannot be imported (e.g.
+because PyTango or pyepics is not installed) are skipped.
+
+Usage::
+
+    python bench_validators.py
+"""
+
+__docformat__ = 'restructuredtext'
+
+from taurus.core.taurusvalidator import clearValidatorCache
+from taurus.test import benchmark, printBenchmark
+
+#: (module, validator class, names, getNames kwargs)
+CASES = (
+    ('taurus.core.tango.tangovalidator',
+     'TangoAttributeNameValidator',
+     ('tango://foo:10000/a/b/c/d', 'tango:a/b/c/d#label', 'a/b/c/d'),
+     dict(queryAuth=False)),
+    ('taurus.core.tango.tangovalidator', 'TangoDeviceNameValidator',
+     ('tango://foo:10000/a/b/c', 'a/b/c'), dict(queryAuth=False)),
+    ('taurus.core.evaluation.evalvalidator',
+     'EvaluationAttributeNameValidator',
+     ('eval:1+2', 'eval:@foo/x=2;x*3', 'eval://localhost/@foo/rand(3)#label'),
+     {}),
+    ('taurus.core.epics.epicsvalidator', 'EpicsAttributeNameValidator',
+     ('ca:my:example.RBV', 'ca:my:example#label'), {}),
+)
+
+
+def _uncached(func, *args, **kwargs):
+    clearValidatorCache()
+    return func(*args, **kwargs)
+
+
+def _importValidator(modname, clsname):
+    try:
+        module = __import__(modname, fromlist=[clsname])
+    except ImportError:
+        return None
+    return getattr(module, clsname)()
+
+
+def main():
+    results = []
+    for modname, clsname, names, kwargs in CASES:
+        v = _importValidator(modname, clsname)
+        if v is None:
+            print 'Skipping %s (cannot import %s)' % (clsname, modname)
+            continue
+        for name in names:
+            label = '%s %s' % (clsname, name)
+            for method, kw in (('getUriGroups', {}), ('isValid', {}),
+                               ('getNames', kwargs)):
+                func = getattr(v, method)
+                try:
+                    func(name, **kw)
+                except Exception, e:
+                    print 'Skipping %s.%s(%r): %r' % (clsname, method, name,
+                                                      e)
+                    continue
+                results.append(('%s %s (uncached)' % (label, method),
+                                benchmark(_uncached, (func, name), kw)))
+                results.append(('%s %s (cached)' % (label, method),
+                                benchmark(func, (name,), kw)))
+    printBenchmark(results, title='Name validation')
+
+
+if __name__ == '__main__':
+    main()
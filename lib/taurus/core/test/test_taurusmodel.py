@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.core.taurusmodel"""
+
+#__all__ = []
+
+__docformat__ = 'restructuredtext'
+
+import threading
+from taurus.external import unittest
+from taurus.core.taurusmodel import TaurusModel
+from taurus.core.taurusbasetypes import (TaurusEventType,
+                                         TaurusSerializationMode)
+
+
+class _NameValidator(object):
+
+    def getNames(self, name, factory=None):
+        return name, name, name
+
+
+class _EventModel(TaurusModel):
+    '''A bare model (neither polled nor subscribed to any source), so that
+    it only receives the events fired by the tests'''
+
+    @classmethod
+    def factory(cls):
+        return None
+
+    @classmethod
+    def getNameValidator(cls):
+        return _NameValidator()
+
+
+class _Listener(object):
+    '''Records the events it receives'''
+
+    def __init__(self):
+        self.events = []
+
+    def eventReceived(self, src, evt_type, evt_value):
+        self.events.append((evt_type, evt_value))
+
+
+class TaurusModelEventDispatchTestCase(unittest.TestCase):
+    '''Test the listener dispatch of TaurusModel.fireEvent'''
+
+    def setUp(self):
+        self.model = _EventModel('test:dispatch', None,
+                                 TaurusSerializationMode.Serial)
+
+    def tearDown(self):
+        self.model.cleanUp()
+
+    def test_dispatchTable(self):
+        '''Check that the dispatch table follows the listener changes'''
+        l1, calls = _Listener(), []
+
+        def l2(src, evt_type, evt_value):
+            calls.append(evt_value)
+        self.model.addListener(l1)
+        self.model.addListener(l2)
+        n1 = len(l1.events)
+        self.model.fireEvent(TaurusEventType.Change, 1)
+        self.assertEqual(l1.events[n1:], [(TaurusEventType.Change, 1)])
+        self.assertIn(1, calls)
+        self.model.removeListener(l1)
+        self.model.fireEvent(TaurusEventType.Change, 2)
+        self.assertEqual(len(l1.events), n1 + 1)
+        self.assertIn(2, calls)
+        self.model.removeListener(l2)
+
+    def test_deadListener(self):
+        '''Check that dead listeners are dropped from the dispatch table'''
+        l1 = _Listener()
+        self.model.addListener(l1)
+        self.model.fireEvent(TaurusEventType.Change, 1)
+        del l1
+        self.model.fireEvent(TaurusEventType.Change, 2)
+        self.assertFalse(self.model.hasListeners())
+
+    def test_eventBuffering(self):
+        '''Check that only the latest buffered events are delivered and that
+        non-regular events preserve the order'''
+        l1 = _Listener()
+        self.model.addListener(l1)
+        self.model.setEventBufferPeriod(10)
+        n1 = len(l1.events)
+        for i in range(100):
+            self.model.fireEvent(TaurusEventType.Change, i)
+        self.assertEqual(len(l1.events), n1)
+        self.model.fireEvent(TaurusEventType.Error, None)
+        self.assertEqual(l1.events[n1:], [(TaurusEventType.Change, 99),
+                                          (TaurusEventType.Error, None)])
+        self.model.fireEvent(TaurusEventType.Change, 100)
+        self.model.setEventBufferPeriod(0)
+        self.assertEqual(l1.events[-1], (TaurusEventType.Change, 100))
+        self.model.removeListener(l1)
+
+    def test_bufferedEventsOrder(self):
+        '''Check that the buffered events are fired in the order in which
+        their latest values were received'''
+        l1 = _Listener()
+        self.model.addListener(l1)
+        self.model.setEventBufferPeriod(10)
+        n1 = len(l1.events)
+        self.model.fireEvent(TaurusEventType.Change, 1)
+        self.model.fireEvent(TaurusEventType.Periodic, 2)
+        self.model.fireEvent(TaurusEventType.Config, 3)
+        self.model.fireEvent(TaurusEventType.Change, 4)
+        self.model.fireBufferedEvents()
+        self.assertEqual(l1.events[n1:], [(TaurusEventType.Periodic, 2),
+                                          (TaurusEventType.Config, 3),
+                                          (TaurusEventType.Change, 4)])
+        self.model.removeListener(l1)
+
+    def test_bufferedDispatchOutOfLock(self):
+        '''Check that other threads can fire events while the buffered
+        events are being dispatched'''
+        fired = []
+
+        def fire():
+            self.model.fireEvent(TaurusEventType.Change, 'other')
+            fired.append(True)
+
+        def listener(src, evt_type, evt_value):
+            if evt_value == 0:
+                t = threading.Thread(target=fire)
+                t.start()
+                t.join(5)
+        self.model.addListener(listener)
+        self.model.setEventBufferPeriod(10)
+        self.model.fireEvent(TaurusEventType.Change, 0)
+        self.model.fireBufferedEvents()
+        self.assertEqual(fired, [True])
+        self.model.removeListener(listener)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.core.tauruspollingtimer"""
+
+#__all__ = []
+
+__docformat__ = 'restructuredtext'
+
+import time
+from taurus.external import unittest
+from taurus.core.taurusexception import TaurusException
+from taurus.core.tauruspollingtimer import TaurusPollingTimer
+
+
+class _FakeAttribute(object):
+    '''Records the polling notifications it receives'''
+
+    def __init__(self):
+        self.polls = []
+
+    def poll(self, **kwargs):
+        self.polls.append(kwargs)
+
+
+class _FakeDevice(object):
+    '''A device whose asynchronous poll replies arrive after a given delay'''
+
+    def __init__(self, name, delay, value=None):
+        self.name = name
+        self.delay = delay
+        self.value = value
+        self.cancelled = []
+        self.requests = 0
+
+    def getFullName(self):
+        return self.name
+
+    def poll(self, attrs, asynch=False, req_id=None, timeout=None):
+        if asynch:
+            self.requests += 1
+            return time.time()
+        if time.time() - req_id < self.delay:
+            return False
+        value = self.name if self.value is None else self.value
+        for attr in attrs.values():
+            attr.poll(single=False, value=value, error=None)
+        return True
+
+    def cancelPoll(self, req_id):
+        self.cancelled.append(req_id)
+
+
+class TaurusPollingTimerTestCase(unittest.TestCase):
+    '''Test the scheduling and the collection of asynchronous replies in
+    TaurusPollingTimer'''
+
+    def setUp(self):
+        self.timer = TaurusPollingTimer(1000, phases=1)
+        self.timer.setReplyTimeout(200)
+
+    def _addDevice(self, name, delay, value=None):
+        dev, attr = _FakeDevice(name, delay, value), _FakeAttribute()
+        self.timer.dev_dict[dev] = {'attr': attr}
+        return dev, attr
+
+    def test_slowDeviceDoesNotDelayOthers(self):
+        '''Check that a hung device does not stall the rest of devices'''
+        fast_devs = [self._addDevice('fast%d' % i, 0) for i in range(5)]
+        slow_dev, slow_attr = self._addDevice('slow', 10)
+        t0 = time.time()
+        self.timer._pollAttributes()
+        elapsed = time.time() - t0
+        msg = 'polling cycle took too long (%g s)' % elapsed
+        self.assertLess(elapsed, 0.5, msg)
+        for dev, attr in fast_devs:
+            self.assertEqual(len(attr.polls), 1)
+            self.assertEqual(attr.polls[0]['value'], dev.name)
+        # the late device is notified with an error and its request discarded
+        self.assertEqual(len(slow_attr.polls), 1)
+        self.assertIsInstance(slow_attr.polls[0]['error'], TaurusException)
+        self.assertEqual(len(slow_dev.cancelled), 1)
+
+    def test_lateReplyWithinDeadline(self):
+        '''Check that replies arriving before the deadline are collected'''
+        dev, attr = self._addDevice('dev', 0.05)
+        self.timer._pollAttributes()
+        self.assertEqual(len(attr.polls), 1)
+        self.assertIsNone(attr.polls[0]['error'])
+        self.assertEqual(dev.cancelled, [])
+
+    def test_defaultReplyTimeout(self):
+        '''Check the default reply timeout is a fraction of the period'''
+        self.timer.setReplyTimeout(None)
+        expected = 1000 * TaurusPollingTimer.DefaultReplyTimeoutRatio
+        self.assertEqual(self.timer.getReplyTimeout(), int(expected))
+
+    def test_phases(self):
+        '''Check that devices are spread among the phases of the period'''
+        timer = TaurusPollingTimer(1000, phases=4)
+        devs = []
+        for i in range(8):
+            dev = _FakeDevice('dev%d' % i, 0)
+            timer.dev_dict[dev] = {'attr': _FakeAttribute()}
+            timer.dev_phase[dev] = timer._choosePhase()
+            devs.append(dev)
+        phases = sorted(timer.dev_phase.values())
+        self.assertEqual(phases, [0, 0, 1, 1, 2, 2, 3, 3])
+        for phase in range(4):
+            timer._pollAttributes()
+            polled = [d for d in devs if d.requests]
+            self.assertEqual(len(polled), 2 * (phase + 1))
+
+    def test_backoff(self):
+        '''Check that unchanged attributes are polled less often and go back
+        to full rate when their value changes'''
+        self.timer.backoff_threshold = 2
+        self.timer.max_backoff = 4
+        dev, attr = self._addDevice('dev', 0, value=1)
+        for _ in range(20):
+            self.timer._pollAttributes()
+        self.assertEqual(self.timer.getBackoff(attr), 4)
+        self.assertLess(len(attr.polls), 12)
+        # a change makes it go back to full rate
+        dev.value = 2
+        for _ in range(4):
+            self.timer._pollAttributes()
+        self.assertEqual(self.timer.getBackoff(attr), 1)
+        self.timer.resetBackoff()
+        self.assertEqual(self.timer.getBackoff(attr), 1)
+
+    def test_backoffErrorDoesNotDropValue(self):
+        '''Check that an error in the polling rate bookkeeping does not
+        prevent the attribute from receiving the polled value'''
+        def fail(*args):
+            raise RuntimeError('backoff error')
+        self.timer._updateBackoff = fail
+        dev, attr = self._addDevice('dev', 0, value=1)
+        self.timer._pollAttributes()
+        self.assertEqual(len(attr.polls), 1)
+        self.assertEqual(attr.polls[0]['value'], 1)
+
+
+if __name__ == '__main__':
+    pass
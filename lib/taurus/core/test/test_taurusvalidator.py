@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for the caching of taurus.core.taurusvalidator"""
+
+__docformat__ = 'restructuredtext'
+
+from taurus.external import unittest
+from taurus.core.taurusvalidator import (getValidatorCache,
+                                         clearValidatorCache)
+from taurus.core.evaluation.evalvalidator import (
+    EvaluationAttributeNameValidator)
+
+
+class ValidatorCacheTestCase(unittest.TestCase):
+    '''Test case for the cache of results of the validators'''
+
+    name = 'eval:1+2'
+
+    def setUp(self):
+        clearValidatorCache()
+        self.validator = EvaluationAttributeNameValidator()
+
+    def test_getUriGroups(self):
+        '''check that the groups are cached and copied'''
+        g1 = self.validator.getUriGroups(self.name)
+        g1['attrname'] = 'foo'
+        g2 = self.validator.getUriGroups(self.name)
+        self.assertEqual(g2['attrname'], '1+2')
+        self.assertEqual(getValidatorCache().getStats()[0], 1)
+        self.assertTrue(self.validator.getUriGroups('eval:1+2#a#b') is None)
+        self.assertTrue(self.validator.getUriGroups('eval:1+2#a#b') is None)
+
+    def test_getNames(self):
+        '''check that getNames returns the cached names'''
+        names = self.validator.getNames(self.name)
+        hits = getValidatorCache().getStats()[0]
+        self.assertEqual(self.validator.getNames(self.name), names)
+        self.assertEqual(getValidatorCache().getStats()[0], hits + 1)
+        clearValidatorCache()
+        self.assertEqual(len(getValidatorCache()), 0)
+        self.assertEqual(self.validator.getNames(self.name), names)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,415 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""This module provides a service for retrieving (in background) the archived
+history of attributes, e.g. to backfill trends"""
+
+__all__ = ["IntervalIndex", "ArchivingBackend", "FakeArchivingBackend",
+           "PyTangoArchivingBackend", "ArchivingBackfill"]
+
+__docformat__ = "restructuredtext"
+
+import bisect
+import threading
+import time
+
+import numpy
+
+from .containers import LRUCache
+from .log import Logger
+from .singleton import Singleton
+from .threadpool import ThreadPool
+
+
+class IntervalIndex(object):
+    '''A set of disjoint, sorted, half-open [start, end) intervals. Added
+    intervals are merged with the overlapping (or adjacent) ones.'''
+
+    def __init__(self, intervals=()):
+        self._starts = []
+        self._ends = []
+        for start, end in intervals:
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __repr__(self):
+        return "IntervalIndex(%r)" % self.intervals()
+
+    def intervals(self):
+        '''returns the intervals
+
+        :return: (list<tuple<float,float>>) sorted list of (start, end)
+        '''
+        return zip(self._starts, self._ends)
+
+    def copy(self):
+        '''returns a copy of this index
+
+        :return: (IntervalIndex)
+        '''
+        other = IntervalIndex()
+        other._starts, other._ends = list(self._starts), list(self._ends)
+        return other
+
+    def add(self, start, end):
+        '''adds the [start, end) interval
+
+        :param start: (float)
+        :param end: (float)
+        '''
+        if end <= start:
+            return
+        # intervals overlapping or adjacent to the new one: [i, j)
+        i = bisect.bisect_left(self._ends, start)
+        j = bisect.bisect_right(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def remove(self, start, end):
+        '''removes the [start, end) interval (splitting the intervals that
+        contain it if needed)
+
+        :param start: (float)
+        :param end: (float)
+        '''
+        if end <= start:
+            return
+        i = bisect.bisect_right(self._ends, start)
+        j = bisect.bisect_left(self._starts, end)
+        if i >= j:
+            return
+        starts, ends = [], []
+        if self._starts[i] < start:
+            starts.append(self._starts[i])
+            ends.append(start)
+        if self._ends[j - 1] > end:
+            starts.append(end)
+            ends.append(self._ends[j - 1])
+        self._starts[i:j] = starts
+        self._ends[i:j] = ends
+
+    def covers(self, start, end):
+        '''whether the [start, end) interval is fully contained in the index
+
+        :return: (bool)
+        '''
+        return not self.missing(start, end)
+
+    def missing(self, start, end):
+        '''returns the parts of the [start, end) interval which are not
+        contained in the index
+
+        :param start: (float)
+        :param end: (float)
+
+        :return: (list<tuple<float,float>>) sorted list of (start, end)
+        '''
+        gaps = []
+        i = bisect.bisect_right(self._ends, start)
+        while start < end:
+            if i >= len(self._starts) or self._starts[i] >= end:
+                gaps.append((start, end))
+                break
+            if self._starts[i] > start:
+                gaps.append((start, self._starts[i]))
+            start = self._ends[i]
+            i += 1
+        return gaps
+
+
+class ArchivingBackend(object):
+    '''Interface of the archiving systems used by :class:`ArchivingBackfill`.
+    Reimplement :meth:`getValues`.'''
+
+    def getValues(self, name, start, end):
+        '''returns the archived values of an attribute in a time range. This
+        method is called from a worker thread.
+
+        :param name: (str) full name of the attribute
+        :param start: (float) start (epoch, inclusive) of the range
+        :param end: (float) end (epoch, exclusive) of the range
+
+        :return: (tuple<numpy.ndarray,numpy.ndarray>) timestamps (sorted) and
+                 values
+        '''
+        raise NotImplementedError('getValues must be implemented')
+
+
+class FakeArchivingBackend(ArchivingBackend):
+    '''An in-process archiving backend (e.g. for tests and demos) which
+    "archives" the values of a function of time with a fixed period. The
+    queries are recorded in the :attr:`queries` list.'''
+
+    def __init__(self, func=numpy.sin, period=1., delay=0.):
+        '''
+        :param func: (callable) function returning the values for an array
+                     of timestamps
+        :param period: (float) period (in s) of the archived values
+        :param delay: (float) time (in s) that each query takes
+        '''
+        self.func = func
+        self.period = period
+        self.delay = delay
+        self.queries = []
+
+    def getValues(self, name, start, end):
+        '''see :meth:`ArchivingBackend.getValues`'''
+        self.queries.append((name, start, end))
+        if self.delay:
+            time.sleep(self.delay)
+        first = numpy.ceil(start / self.period)
+        last = numpy.ceil(end / self.period)
+        t = numpy.arange(first, last) * self.period
+        return t, self.func(t)
+
+
+class PyTangoArchivingBackend(ArchivingBackend):
+    '''A backend reading the Tango archiving system with PyTangoArchiving'''
+
+    def __init__(self):
+        import PyTangoArchiving
+        self._reader = PyTangoArchiving.Reader()
+
+    def getValues(self, name, start, end):
+        '''see :meth:`ArchivingBackend.getValues`'''
+        # the archiving uses the device-relative attribute names
+        name = name.split('://')[-1]
+        if name.count('/') > 3:
+            name = name.split('/', 1)[1]  # remove the database part
+        values = self._reader.get_attribute_values(name, start, end) or []
+        values = [(t, v) for t, v in values if v is not None]
+        t = numpy.array([t for t, _ in values], dtype='d')
+        v = numpy.array([v for _, v in values])
+        return t, v
+
+
+class _BackfillEntry(object):
+
+    def __init__(self):
+        self.fetched = IntervalIndex()
+        self.pending = {}  # interval -> callbacks waiting for it
+        self.chunks = []  # sorted list of (start, t, v)
+
+
+class ArchivingBackfill(Singleton, Logger):
+    '''
+    Retrieves the archived history of attributes in background.
+
+    The queries to the archiving backend (see :meth:`setBackend`) are run by
+    a worker thread. The time ranges already retrieved (or being retrieved)
+    for each attribute are kept in an :class:`IntervalIndex`, so that only
+    the missing parts of a requested range are queried. The retrieved values
+    are cached (see :meth:`getValues`) for the :attr:`MaxCachedAttributes`
+    most recently used attributes.
+    '''
+
+    #: number of worker threads
+    Workers = 1
+
+    #: maximum number of attributes whose archived values are cached
+    MaxCachedAttributes = 64
+
+    def __init__(self):
+        """ Initialization. Nothing to be done here for now."""
+        pass
+
+    def init(self, *args, **kwargs):
+        """Singleton instance initialization."""
+        name = self.__class__.__name__
+        self.call__init__(Logger, name)
+        self._lock = threading.RLock()
+        self._entries = LRUCache(self.MaxCachedAttributes)
+        self._backend = None
+        self._pool = None
+
+    def getBackend(self):
+        '''returns the archiving backend. If none was set, a
+        :class:`PyTangoArchivingBackend` is created (if possible)
+
+        :return: (ArchivingBackend or None)
+        '''
+        if self._backend is None:
+            try:
+                self._backend = PyTangoArchivingBackend()
+            except Exception, e:
+                self.debug('Archiving not available: %r', e)
+        return self._backend
+
+    def setBackend(self, backend):
+        '''sets the archiving backend (and clears the cache)
+
+        :param backend: (ArchivingBackend)
+        '''
+        with self._lock:
+            self._backend = backend
+            self._entries.clear()
+
+    def getMaxCachedAttributes(self):
+        '''returns the maximum number of attributes whose archived values are
+        cached
+
+        :return: (int)
+        '''
+        return self._entries.getMaxSize()
+
+    def setMaxCachedAttributes(self, maxsize):
+        '''sets the maximum number of attributes whose archived values are
+        cached (discarding the cache of the least recently used attributes if
+        needed)
+
+        :param maxsize: (int)
+        '''
+        self._entries.setMaxSize(maxsize)
+
+    def clear(self, name=None):
+        '''clears the cached values
+
+        :param name: (str or None) full name of the attribute (None clears
+                     the cache of all attributes)
+        '''
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name.lower(), None)
+
+    def _getPool(self):
+        if self._pool is None:
+            self._pool = ThreadPool(name="ArchivingBackfillTP", parent=self,
+                                    Psize=self.Workers, Qsize=0)
+        return self._pool
+
+    def cleanUp(self):
+        '''stops the worker threads'''
+        if self._pool is not None:
+            self._pool.join()
+            self._pool = None
+
+    def request(self, name, start, end, callback=None):
+        '''requests the archived values of an attribute in a time range. The
+        parts of the range which have not been retrieved (or requested)
+        before are queried in background.
+
+        :param name: (str) full name of the attribute
+        :param start: (float) start (epoch) of the range
+        :param end: (float) end (epoch) of the range
+        :param callback: (callable) if given, it is called (from the worker
+                         thread) as `callback(name, t, v)` with the values
+                         retrieved by each query (including the queries
+                         already pending for the range) and with the cached
+                         values of the parts of the range already retrieved
+
+        :return: (int) number of queries issued (0 if the range was
+                 already retrieved or requested)
+        '''
+        if self.getBackend() is None:
+            return 0
+        with self._lock:
+            entry = self._entries.get(name.lower())
+            if entry is None:
+                entry = _BackfillEntry()
+                self._entries.put(name.lower(), entry)
+            requested = entry.fetched.copy()
+            for interval, callbacks in entry.pending.items():
+                requested.add(*interval)
+                # values being retrieved for the range are delivered as well
+                if (callback is not None and interval[0] < end and
+                        interval[1] > start and callback not in callbacks):
+                    callbacks.append(callback)
+            gaps = requested.missing(start, end)
+            for gap in gaps:
+                entry.pending[gap] = callback is not None and [callback] or []
+            cached = entry.fetched.missing(start, end) != [(start, end)]
+        pool = self._getPool()
+        if callback is not None and cached:
+            pool.add(self._deliver, None, name, start, end, callback)
+        for gap in gaps:
+            pool.add(self._fetch, None, name, entry, gap)
+        return len(gaps)
+
+    def _deliver(self, name, start, end, callback):
+        t, v = self.getValues(name, start, end)
+        if len(t):
+            callback(name, t, v)
+
+    def _fetch(self, name, entry, interval):
+        start, end = interval
+        try:
+            t, v = self._backend.getValues(name, start, end)
+        except Exception, e:
+            self.warning('Cannot read the archived values of %s: %r',
+                         name, e)
+            t = None
+        with self._lock:
+            callbacks = entry.pending.pop(interval)
+            if t is None:
+                return
+            entry.fetched.add(start, end)
+            if len(t):
+                bisect.insort(entry.chunks, (start, t, v))
+        if len(t):
+            for callback in callbacks:
+                callback(name, t, v)
+
+    def getFetchedRanges(self, name):
+        '''returns the time ranges already retrieved for an attribute
+
+        :param name: (str) full name of the attribute
+
+        :return: (list<tuple<float,float>>) sorted list of (start, end)
+        '''
+        with self._lock:
+            entry = self._entries.get(name.lower())
+            if entry is None:
+                return []
+            return entry.fetched.intervals()
+
+    def getValues(self, name, start=None, end=None):
+        '''returns the cached archived values of an attribute
+
+        :param name: (str) full name of the attribute
+        :param start: (float or None) start (inclusive) of the time range
+        :param end: (float or None) end (exclusive) of the time range
+
+        :return: (tuple<numpy.ndarray,numpy.ndarray>) timestamps and values
+        '''
+        with self._lock:
+            entry = self._entries.get(name.lower())
+            chunks = entry is not None and list(entry.chunks) or []
+        pieces = []
+        for _, t, v in chunks:
+            i0 = 0 if start is None else numpy.searchsorted(t, start)
+            i1 = len(t) if end is None else numpy.searchsorted(t, end)
+            if i1 > i0:
+                pieces.append((t[i0:i1], v[i0:i1]))
+        if not pieces:
+            return numpy.zeros(0), numpy.zeros(0)
+        return (numpy.concatenate([t for t, _ in pieces]),
+                numpy.concatenate([v for _, v in pieces]))
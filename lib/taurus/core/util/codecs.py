@@ -519,9 +519,32 @@ class VideoImageCodec(Codec):
         buffer = data[1].tostring()
         return fmt, header + buffer
 
+    #: layout of the YUV image modes: (bytes per chroma sample, offsets of the
+    #: luma bytes, offset of the U byte, offset of the V byte)
+    YUV_LAYOUTS = {15: (6, [1, 2, 4, 5], 0, 3),  # YUV411
+                   16: (4, [1, 3], 0, 2),  # YUV422
+                   17: (3, [0], 1, 2),  # YUV444
+                   }
+
     def decode(self, data, *args, **kwargs):
         """decodes the given data from a LImA's video_image.
 
+        The decoded image is returned as a new (writable) array. The RGB32
+        mode is returned as a contiguous RGB888 array and the YUV modes are
+        converted to RGB888 using integer arithmetic.
+
+        .. note:: the YUV modes are decoded to uint8 arrays (they used to be
+                  decoded to float64 arrays)
+
+        An `out` keyword argument can be passed with a preallocated array
+        (of the shape and dtype of the decoded image) in which the decoded
+        image is written. This allows reusing the same buffer for consecutive
+        frames.
+
+        For the grey scale modes, a `copy=False` keyword argument can be
+        passed to avoid copying the image: a read-only view of the encoded
+        data is returned instead (which keeps the whole encoded data alive).
+
         :param data: (sequence[str, obj]) a sequence of two elements where the first item is the encoding format of the second item object
 
         :return: (sequence[str, obj]) a sequence of two elements where the first item is the encoding format of the second item object"""
@@ -535,114 +558,66 @@ class VideoImageCodec(Codec):
             _, _, fmt = data[0].partition('_')
         else:
             return data
-        header = self.__unpackHeader(
-            data[1][:struct.calcsize(self.VIDEO_HEADER_FORMAT)])
-
-        imgBuffer = data[1][struct.calcsize(self.VIDEO_HEADER_FORMAT):]
-        dtype = self.__getDtypeId(header['imageMode'])
-        if header['imageMode'] == 7:
-            # RGBA 4 bytes per pixel
-            rgba = numpy.fromstring(imgBuffer, dtype)
-            bbuf = rgba[0::4]
-            gbuf = rgba[1::4]
-            rbuf = rgba[2::4]
-            #abuf = rgba[3::4]
-            r = rbuf.reshape(header['height'], header['width'])
-            g = gbuf.reshape(header['height'], header['width'])
-            b = bbuf.reshape(header['height'], header['width'])
-            #a = abuf.reshape(header['height'],header['width'])
-            img2D = numpy.dstack((r, g, b))
-
-        elif header['imageMode'] == 17:
-            # YUV444 3 bytes per pixel
-            yuv = numpy.fromstring(imgBuffer, dtype)
-            y = yuv[0::3]
-            u = yuv[1::3]
-            v = yuv[2::3]
-
-            rbuff, gbuff, bbuff = self.__yuv2rgb(y, u, v)
-
-            # Shape buffers to image size
-            r = rbuff.reshape(header['height'], header['width'])
-            g = gbuff.reshape(header['height'], header['width'])
-            b = bbuff.reshape(header['height'], header['width'])
-
-            # Build the RGB image
-            img2D = numpy.dstack((r, g, b))
-
-        elif header['imageMode'] == 16:
-            # YUV422 4 bytes per 2 pixels
-            yuv = numpy.fromstring(imgBuffer, dtype)
-            u = yuv[0::4]
-            y1 = yuv[1::4]
-            v = yuv[2::4]
-            y2 = yuv[3::4]
-
-            r1, g1, b1 = self.__yuv2rgb(y1, u, v)
-            r2, g2, b2 = self.__yuv2rgb(y2, u, v)
-
-            # Create RGB buffers
-            rbuff = numpy.dstack((r1, r2)).reshape(
-                header['height'] * header['width'])
-            gbuff = numpy.dstack((g1, g2)).reshape(
-                header['height'] * header['width'])
-            bbuff = numpy.dstack((b1, b2)).reshape(
-                header['height'] * header['width'])
-
-            # Shape buffers to image size
-            r = rbuff.reshape(header['height'], header['width'])
-            g = gbuff.reshape(header['height'], header['width'])
-            b = bbuff.reshape(header['height'], header['width'])
-
-            # Build the RGB image
-            img2D = numpy.dstack((r, g, b))
-
-        elif header['imageMode'] == 15:
-            # YUV411 6 bytes per 4 pixels
-            yuv = numpy.fromstring(imgBuffer, dtype)
-            u = yuv[0::6]
-            y1 = yuv[1::6]
-            y2 = yuv[2::6]
-            v = yuv[3::6]
-            y3 = yuv[4::6]
-            y4 = yuv[5::6]
-
-            r1, g1, b1 = self.__yuv2rgb(y1, u, v)
-            r2, g2, b2 = self.__yuv2rgb(y2, u, v)
-            r3, g3, b3 = self.__yuv2rgb(y3, u, v)
-            r4, g4, b4 = self.__yuv2rgb(y4, u, v)
-
-            # Create RGB buffers
-            rbuff = numpy.dstack((r1, r2, r3, r4)).reshape(
-                header['height'] * header['width'])
-            gbuff = numpy.dstack((g1, g2, g3, g4)).reshape(
-                header['height'] * header['width'])
-            bbuff = numpy.dstack((b1, b2, b3, b4)).reshape(
-                header['height'] * header['width'])
-
-            # Shape buffers to image size
-            r = rbuff.reshape(header['height'], header['width'])
-            g = gbuff.reshape(header['height'], header['width'])
-            b = bbuff.reshape(header['height'], header['width'])
-
-            img2D = numpy.dstack((r, g, b))
+        hsize = struct.calcsize(self.VIDEO_HEADER_FORMAT)
+        header = self.__unpackHeader(data[1][:hsize])
+        mode = header['imageMode']
+        height, width = header['height'], header['width']
+        dtype = self.__getDtypeId(mode)
+        out = kwargs.get('out')
+        copy = kwargs.get('copy', True)
+
+        # zero-copy view of the image buffer (skipping the header)
+        imgBuffer = numpy.frombuffer(data[1], dtype, offset=hsize)
+
+        if mode == 7:
+            # RGBA 4 bytes per pixel (stored as BGRA)
+            rgba = imgBuffer.reshape(height, width, 4)
+            img2D = rgba[:, :, 2::-1]
+            if out is None:
+                # consumers (e.g. Qt images) need a contiguous, writable array
+                img2D = numpy.ascontiguousarray(img2D)
+
+        elif mode in self.YUV_LAYOUTS:
+            size, y_idx, u_idx, v_idx = self.YUV_LAYOUTS[mode]
+            yuv = imgBuffer.reshape(-1, size)
+            if out is None:
+                out = numpy.empty((height, width, 3), dtype='uint8')
+            # one row per chroma sample: (samples, pixels per sample, RGB)
+            rgb = out.reshape(-1, len(y_idx), 3)
+            self.__yuv2rgb(yuv[:, y_idx], yuv[:, u_idx:u_idx + 1],
+                           yuv[:, v_idx:v_idx + 1], rgb)
+            return fmt, out
 
         else:
-            img1D = numpy.fromstring(imgBuffer, dtype)
-            img2D = img1D.reshape(header['height'], header['width'])
+            img2D = imgBuffer.reshape(height, width)
+            if out is None and copy:
+                img2D = img2D.copy()
 
+        if out is not None:
+            out[...] = img2D
+            img2D = out
         return fmt, img2D
 
-    def __yuv2rgb(self, y, u, v):
-        '''YUV444 to RGB888 conversion'''
-        Cr = v - 128.0
-        Cb = u - 128.0
-
-        R = y + 1.402 * Cr
-        G = y - 0.344 * Cb - 0.714 * Cr
-        B = y + 1.772 * Cb
-
-        return (numpy.clip(R, 0, 255), numpy.clip(G, 0, 255), numpy.clip(B, 0, 255))
+    def __yuv2rgb(self, y, u, v, out):
+        '''YUV to RGB888 conversion using fixed point (8 bits) arithmetic.
+
+        y must be a 2D array with one row per chroma sample, u and v must be
+        column vectors (one row per chroma sample) and out a uint8 array of
+        shape y.shape + (3,) where the RGB values are written'''
+        y = y.astype(numpy.int32)
+        cb = u.astype(numpy.int32) - 128
+        cr = v.astype(numpy.int32) - 128
+
+        # R = Y + 1.402 * Cr
+        tmp = y + ((359 * cr + 128) >> 8)
+        out[:, :, 0] = numpy.clip(tmp, 0, 255, out=tmp)
+        # G = Y - 0.344 * Cb - 0.714 * Cr
+        tmp = y - ((88 * cb + 183 * cr + 128) >> 8)
+        out[:, :, 1] = numpy.clip(tmp, 0, 255, out=tmp)
+        # B = Y + 1.772 * Cb
+        tmp = y + ((454 * cb + 128) >> 8)
+        out[:, :, 2] = numpy.clip(tmp, 0, 255, out=tmp)
+        return out
 
     def __unpackHeader(self, header):
         h = struct.unpack(self.VIDEO_HEADER_FORMAT, header)
@@ -739,9 +714,9 @@ class VideoImageCodec(Codec):
                 #'BAYER BG8'  : Core.BAYER_BG8,
                 #'BAYER BG16' : Core.BAYER_BG16,
                 #'I420'       : Core.I420,
-                #'YUV411'     : Core.YUV411,
+                15: 'uint8',  # Core.YUV411,
                 16: 'uint8',  # Core.YUV422,
-                #'YUV444'     : Core.YUV444
+                17: 'uint8',  # Core.YUV444
                 }[mode]
 
 
@@ -773,7 +748,7 @@ class CodecPipeline(Codec, list):
         f = CodecFactory()
         for i in format.split('_'):
             codec = f.getCodec(i)
-            self.debug("Appending %s => %s" % (i, codec))
+            self.debug("Appending %s => %s", i, codec)
             if codec is None:
                 raise TypeError(
                     'Unsupported codec %s (namely %s)' % (format, i))
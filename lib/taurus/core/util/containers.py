@@ -31,7 +31,7 @@ python distribution.
 __all__ = ["CaselessList", "CaselessDict", "CaselessWeakValueDict", "LoopList",
            "CircBuf", "LIFO", "TimedQueue", "self_locked", "ThreadDict",
            "defaultdict", "defaultdict_fromkey", "CaselessDefaultDict",
-           "DefaultThreadDict", "getDictAsTree", "ArrayBuffer", ]
+           "DefaultThreadDict", "getDictAsTree", "ArrayBuffer", "LRUCache"]
 
 __docformat__ = "restructuredtext"
 
@@ -39,6 +39,7 @@ import copy
 import time
 import weakref
 import operator
+import threading
 
 
 class CaselessList(list):
@@ -607,6 +608,135 @@ class LIFO(object):
         return "%s(%s)" % (self.__class__.__name__, str(self._data))
 
 
+class LRUCache(object):
+    """A thread-safe mapping with a maximum size which, when full, discards
+    the least recently used items.
+
+    Example::
+
+        >>> c = LRUCache(2)
+        >>> c.put('a', 1)
+        >>> c.put('b', 2)
+        >>> c.get('a')
+        1
+        >>> c.put('c', 3)
+        >>> c.get('b')
+        >>> c.getStats()
+        (1, 1)
+    """
+
+    # indexes of the links of the (circular) doubly linked list
+    _PREV, _NEXT, _KEY, _VALUE = 0, 1, 2, 3
+
+    def __init__(self, maxsize=1024):
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Removes all the items (and resets the statistics)"""
+        with self._lock:
+            self._map = {}
+            self._root = root = []
+            root[:] = [root, root, None, None]
+            self._hits = self._misses = 0
+
+    def _moveToEnd(self, link):
+        prev, next_ = link[self._PREV], link[self._NEXT]
+        prev[self._NEXT] = next_
+        next_[self._PREV] = prev
+        root = self._root
+        last = root[self._PREV]
+        last[self._NEXT] = root[self._PREV] = link
+        link[self._PREV] = last
+        link[self._NEXT] = root
+
+    def get(self, key, default=None):
+        """Returns the value for the given key (marking it as the most recently
+        used) or `default` if the key is not in the cache"""
+        with self._lock:
+            link = self._map.get(key)
+            if link is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+            self._moveToEnd(link)
+            return link[self._VALUE]
+
+    def put(self, key, value):
+        """Stores the value for the given key, discarding the least recently
+        used item if the cache is full"""
+        with self._lock:
+            link = self._map.get(key)
+            if link is not None:
+                link[self._VALUE] = value
+                self._moveToEnd(link)
+                return
+            if self._maxsize <= 0:
+                return
+            root = self._root
+            if len(self._map) >= self._maxsize:
+                oldest = root[self._NEXT]
+                root[self._NEXT] = oldest[self._NEXT]
+                oldest[self._NEXT][self._PREV] = root
+                del self._map[oldest[self._KEY]]
+            last = root[self._PREV]
+            link = [last, root, key, value]
+            last[self._NEXT] = root[self._PREV] = self._map[key] = link
+
+    def pop(self, key, default=None):
+        """Removes the given key and returns its value (or `default` if the
+        key is not in the cache)"""
+        with self._lock:
+            link = self._map.pop(key, None)
+            if link is None:
+                return default
+            prev, next_ = link[self._PREV], link[self._NEXT]
+            prev[self._NEXT] = next_
+            next_[self._PREV] = prev
+            return link[self._VALUE]
+
+    def getMaxSize(self):
+        """Returns the maximum number of items in the cache"""
+        return self._maxsize
+
+    def setMaxSize(self, maxsize):
+        """Sets the maximum number of items in the cache, discarding the least
+        recently used items if needed"""
+        with self._lock:
+            self._maxsize = maxsize
+            root = self._root
+            while len(self._map) > max(maxsize, 0):
+                oldest = root[self._NEXT]
+                root[self._NEXT] = oldest[self._NEXT]
+                oldest[self._NEXT][self._PREV] = root
+                del self._map[oldest[self._KEY]]
+
+    def getStats(self):
+        """Returns the number of hits and misses of :meth:`get` (since the
+        cache was created or cleared)
+
+        :return: (tuple<int,int>)
+        """
+        return self._hits, self._misses
+
+    def keys(self):
+        """Returns the keys, from the least to the most recently used"""
+        with self._lock:
+            ret, root = [], self._root
+            link = root[self._NEXT]
+            while link is not root:
+                ret.append(link[self._KEY])
+                link = link[self._NEXT]
+            return ret
+
+    def __contains__(self, key):
+        return key in self._map
+
+    def __len__(self):
+        return len(self._map)
+
+
 class TimedQueue(list):
     """ A FIFO that keeps all the values introduced at least for a given time.
     Applied to some device servers, to force States to be kept at least a minimum time.
@@ -223,8 +223,8 @@ class EventGenerator(Object):
             if (cb_ref, data) in self.cb_list:
                 self.cb_list.remove((cb_ref, data))
             else:
-                self.debug("Trying to unsubscribe: %s is not a listener of %s" % (
-                    str(cb_ref), self.event_name))
+                self.debug("Trying to unsubscribe: %s is not a listener of %s",
+                           cb_ref, self.event_name)
         finally:
             self.unlock()
 
@@ -0,0 +1,530 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""This module provides a process-wide store of attribute value histories
+(as used e.g. by the trend widgets)"""
+
+__all__ = ["HistoryBuffer", "HistoryView", "HistoryStore"]
+
+__docformat__ = "restructuredtext"
+
+import os
+import threading
+import urllib
+import weakref
+
+import numpy
+
+from .containers import CaselessDict
+from .log import Logger
+from .singleton import Singleton
+from .spool import HistorySpool
+
+
+class HistoryBuffer(object):
+    '''A fixed capacity circular buffer of (timestamp, value) records backed
+    by numpy arrays.
+
+    Each appended record gets an absolute index (0 for the first record ever
+    appended, 1 for the next one,...) which does not change when older
+    records are discarded. This allows readers to request only the records
+    appended since the last time they read (see :meth:`since`).
+
+    The records are kept contiguous in the internal arrays (which are up to
+    twice the capacity long and are compacted only when the end is reached),
+    so that the contents can always be returned as views of the internal
+    arrays, without copying. Note that the returned views are only guaranteed
+    to hold the requested records until the next append.
+    '''
+
+    def __init__(self, capacity, shape=(), dtype='d'):
+        '''
+        :param capacity: (int) maximum number of records kept
+        :param shape: (tuple<int>) shape of the value of each record
+        :param dtype: (numpy.dtype) dtype of the values
+        '''
+        self.__lock = threading.RLock()
+        self.__capacity = max(1, int(capacity))
+        self.__shape = tuple(shape)
+        self.__dtype = numpy.dtype(dtype)
+        self.__count = 0
+        self.__allocate(min(128, 2 * self.__capacity))
+
+    def __allocate(self, size):
+        '''(re)allocates the internal arrays, keeping the newest records'''
+        n = self.__count and min(len(self), size, self.__capacity)
+        t = numpy.empty(size, dtype='d')
+        v = numpy.empty((size,) + self.__shape, dtype=self.__dtype)
+        if n:
+            t[:n] = self.__t[self.__end - n:self.__end]
+            v[:n] = self.__v[self.__end - n:self.__end]
+        self.__t, self.__v = t, v
+        self.__start, self.__end = 0, n
+
+    def __len__(self):
+        return self.__end - self.__start
+
+    def __repr__(self):
+        return "HistoryBuffer(capacity=%i, shape=%r, len=%i)" % (
+            self.__capacity, self.__shape, len(self))
+
+    def getCapacity(self):
+        '''returns the maximum number of records kept
+
+        :return: (int)
+        '''
+        return self.__capacity
+
+    def setCapacity(self, capacity):
+        '''sets the maximum number of records kept. If it is smaller than the
+        current length, the oldest records are discarded
+
+        :param capacity: (int)
+        '''
+        capacity = max(1, int(capacity))
+        with self.__lock:
+            if capacity == self.__capacity:
+                return
+            self.__capacity = capacity
+            if len(self) > capacity:
+                self.__start = self.__end - capacity
+            if len(self.__t) > 2 * capacity:
+                self.__allocate(2 * capacity)
+
+    def getShape(self):
+        '''returns the shape of the value of each record
+
+        :return: (tuple<int>)
+        '''
+        return self.__shape
+
+    def firstIndex(self):
+        '''returns the absolute index of the oldest record kept
+
+        :return: (int)
+        '''
+        return self.__count - len(self)
+
+    def nextIndex(self):
+        '''returns the absolute index that the next appended record will get
+        (i.e., the total number of records ever appended)
+
+        :return: (int)
+        '''
+        return self.__count
+
+    def append(self, t, value):
+        '''appends a record, discarding the oldest one if the capacity is
+        exceeded. If the shape of the given value does not match the shape
+        of the buffer, the buffer is cleared and reshaped first.
+
+        :param t: (float) timestamp
+        :param value: (object) value (anything that can be converted to an
+                      array of the buffer dtype)
+
+        :return: (int) absolute index of the appended record
+        '''
+        value = numpy.asarray(value, dtype=self.__dtype)
+        with self.__lock:
+            if value.shape != self.__shape:
+                self.reset(value.shape)
+            end = self.__end
+            size = len(self.__t)
+            if end == size:
+                if size < 2 * self.__capacity:
+                    self.__allocate(min(2 * size, 2 * self.__capacity))
+                else:
+                    # compact: move the newest records to the beginning
+                    n = min(len(self), self.__capacity - 1)
+                    self.__t[:n] = self.__t[end - n:end]
+                    self.__v[:n] = self.__v[end - n:end]
+                    self.__start, self.__end = 0, n
+                end = self.__end
+            self.__t[end] = t
+            self.__v[end] = value
+            self.__end = end + 1
+            if self.__end - self.__start > self.__capacity:
+                self.__start = self.__end - self.__capacity
+            self.__count += 1
+            return self.__count - 1
+
+    def reset(self, shape=None):
+        '''discards all the records. The absolute indices of new records keep
+        on increasing from the current one.
+
+        :param shape: (tuple<int> or None) if given, the new shape of the
+                      value of each record
+        '''
+        with self.__lock:
+            if shape is not None and tuple(shape) != self.__shape:
+                self.__shape = tuple(shape)
+                self.__v = numpy.empty((len(self.__t),) + self.__shape,
+                                       dtype=self.__dtype)
+            self.__start = self.__end
+
+    def timestamps(self):
+        '''returns a view of the timestamps of all the records kept
+
+        :return: (numpy.ndarray)
+        '''
+        return self.__t[self.__start:self.__end]
+
+    def values(self):
+        '''returns a view of the values of all the records kept
+
+        :return: (numpy.ndarray) array of shape (len(self),)+self.getShape()
+        '''
+        return self.__v[self.__start:self.__end]
+
+    def contents(self, first=None, maxSize=None):
+        '''returns views of the timestamps and values of the records kept
+
+        :param first: (int or None) absolute index of the first record to
+                      return. If it is older than the oldest record kept,
+                      the returned data starts at the oldest record.
+        :param maxSize: (int or None) if given, return at most this number
+                        of records (the newest ones)
+
+        :return: (tuple<int,numpy.ndarray,numpy.ndarray>) absolute index of
+                 the first returned record, timestamps and values
+        '''
+        with self.__lock:
+            start = self.__start
+            if first is not None:
+                start = max(start, self.__end - (self.__count - first))
+            if maxSize is not None:
+                start = max(start, self.__end - maxSize)
+            start = min(start, self.__end)
+            idx = self.__count - (self.__end - start)
+            return (idx, self.__t[start:self.__end],
+                    self.__v[start:self.__end])
+
+    def since(self, index):
+        '''returns the records appended since the given absolute index.
+
+        Typical incremental reading::
+
+            idx = buf.nextIndex()
+            ...
+            first, t, v = buf.since(idx)
+            idx = first + len(t)
+
+        :param index: (int) absolute index of the first record wanted
+
+        :return: (tuple<int,numpy.ndarray,numpy.ndarray>) see
+                 :meth:`contents`. Note that the returned first index is
+                 larger than the requested one if the requested records are
+                 no longer available.
+        '''
+        return self.contents(first=index)
+
+
+class HistoryView(object):
+    '''A subscription to a :class:`HistoryBuffer` in the
+    :class:`HistoryStore`. It gives access to (a window of) the shared
+    history of an attribute. Views should not be created directly. Use
+    :meth:`HistoryStore.subscribe` instead'''
+
+    def __init__(self, store, name, buffer, maxSize):
+        self._store = store
+        self._name = name
+        self._buffer = buffer
+        self._maxSize = maxSize
+        self._start = buffer.firstIndex()
+
+    def getName(self):
+        '''returns the name of the attribute whose history is viewed'''
+        return self._name
+
+    def getBuffer(self):
+        '''returns the viewed :class:`HistoryBuffer`'''
+        return self._buffer
+
+    def getMaxSize(self):
+        '''returns the maximum number of records returned by this view'''
+        return self._maxSize
+
+    def setMaxSize(self, maxSize):
+        '''sets the maximum number of records returned by this view (the
+        capacity of the shared buffer is increased if needed)
+
+        :param maxSize: (int)
+        '''
+        self._maxSize = maxSize
+        self._store._updateCapacity(self._name)
+
+    def append(self, value):
+        '''appends a value to the shared history.
+        See :meth:`HistoryStore.append`
+
+        :param value: (TaurusAttrValue)
+        '''
+        self._store.append(self._name, value)
+
+    def clear(self):
+        '''Makes this view ignore all the records appended so far. The shared
+        history is not modified.'''
+        self._start = self._buffer.nextIndex()
+
+    def startIndex(self):
+        '''returns the absolute index of the first record visible by this
+        view (e.g. for computing event numbers relative to this view)'''
+        return max(self._start, self._buffer.firstIndex())
+
+    def contents(self):
+        '''returns views of the records visible by this view.
+        See :meth:`HistoryBuffer.contents`'''
+        return self._buffer.contents(first=self._start, maxSize=self._maxSize)
+
+    def since(self, index):
+        '''returns the records visible by this view and appended since the
+        given absolute index. See :meth:`HistoryBuffer.since`'''
+        return self._buffer.contents(first=max(index, self._start),
+                                     maxSize=self._maxSize)
+
+    def close(self):
+        '''unsubscribes this view from the store'''
+        self._store.unsubscribe(self)
+
+
+class _HistoryEntry(object):
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.views = weakref.WeakSet()
+        self.refs = set()  # weak references notifying the death of views
+        self.last = None
+        self.spool = None
+
+
+class HistoryStore(Singleton, Logger):
+    '''
+    A process-wide store of attribute histories.
+
+    A single :class:`HistoryBuffer` is kept per attribute name, regardless of
+    how many clients (e.g. trends) display it. The clients subscribe to it
+    with :meth:`subscribe` and get a :class:`HistoryView`. The capacity of
+    the buffer is the largest maximum size requested by its views and the
+    buffer is discarded when it has no more views (i.e., when they are all
+    closed or garbage collected).
+
+    A value received by several clients (e.g., an event dispatched to
+    several trends showing the same attribute) is only stored once.
+
+    Optionally (see :meth:`setSpooling`), the values are also written to a
+    :class:`HistorySpool` per attribute, which keeps a long term history on
+    disk.
+    '''
+
+    def __init__(self):
+        """ Initialization. Nothing to be done here for now."""
+        pass
+
+    def init(self, *args, **kwargs):
+        """Singleton instance initialization."""
+        name = self.__class__.__name__
+        self.call__init__(Logger, name)
+        self._lock = threading.RLock()
+        self._entries = CaselessDict()
+        from taurus import tauruscustomsettings
+        self._spoolDir = None
+        self._spoolOptions = {}
+        self.setSpooling(
+            getattr(tauruscustomsettings, 'TREND_SPOOL_DIR', None),
+            maxAge=getattr(tauruscustomsettings, 'TREND_SPOOL_MAX_AGE',
+                           86400.),
+            maxBytes=getattr(tauruscustomsettings, 'TREND_SPOOL_MAX_BYTES',
+                             None))
+
+    def setSpooling(self, directory, segmentDuration=3600., maxAge=86400.,
+                    maxBytes=None):
+        '''enables (or disables) writing the histories to disk. When enabled,
+        each attribute gets a :class:`HistorySpool` in a subdirectory of the
+        given directory.
+
+        :param directory: (str or None) the base directory of the spools.
+                          None disables the spooling
+        :param segmentDuration: (float) period (in s) covered by each file
+        :param maxAge: (float or None) maximum age (in s) of the records kept
+        :param maxBytes: (int or None) maximum size of the spool of each
+                         attribute
+        '''
+        with self._lock:
+            for entry in self._entries.values():
+                self._closeSpool(entry)
+            self._spoolDir = directory
+            self._spoolOptions = dict(segmentDuration=segmentDuration,
+                                      maxAge=maxAge, maxBytes=maxBytes)
+            if directory is not None:
+                for name, entry in self._entries.items():
+                    self._openSpool(name, entry)
+
+    def getSpoolDirectory(self):
+        '''returns the base directory of the spools (see :meth:`setSpooling`)
+
+        :return: (str or None) None if spooling is disabled
+        '''
+        return self._spoolDir
+
+    def getSpool(self, name):
+        '''returns the spool of the given attribute
+
+        :param name: (str) full name of the attribute
+
+        :return: (HistorySpool or None) None if spooling is disabled or no
+                 client is subscribed to the attribute
+        '''
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        return entry.spool
+
+    def _openSpool(self, name, entry):
+        dirname = urllib.quote(name.lower(), safe='')
+        try:
+            entry.spool = HistorySpool(os.path.join(self._spoolDir, dirname),
+                                       **self._spoolOptions)
+        except Exception, e:
+            self.warning('Cannot spool the history of %s: %r', name, e)
+            entry.spool = None
+
+    def _closeSpool(self, entry):
+        if entry.spool is not None:
+            entry.spool.close()
+            entry.spool = None
+
+    def subscribe(self, name, maxSize):
+        '''returns a new view on the history of the given attribute
+
+        :param name: (str) full name of the attribute
+        :param maxSize: (int) maximum number of records returned by the view
+
+        :return: (HistoryView)
+        '''
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = _HistoryEntry(HistoryBuffer(maxSize))
+                self._entries[name] = entry
+                if self._spoolDir is not None:
+                    self._openSpool(name, entry)
+            view = HistoryView(self, name, entry.buffer, maxSize)
+            entry.views.add(view)
+
+            def viewDied(ref, name=name):
+                self._viewDied(name, ref)
+            entry.refs.add(weakref.ref(view, viewDied))
+            self._updateCapacity(name)
+            return view
+
+    def _viewDied(self, name, ref):
+        '''called when a view which was not closed is garbage collected'''
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or ref not in entry.refs:
+                return
+            entry.refs.discard(ref)
+            self._release(name, entry)
+
+    def _release(self, name, entry):
+        '''discards the history of an attribute if it has no more views'''
+        if len(list(entry.views)) == 0:
+            self._closeSpool(entry)
+            del self._entries[name]
+        else:
+            self._updateCapacity(name)
+
+    def unsubscribe(self, view):
+        '''removes the given view. The history of the attribute is discarded
+        if it was its last view
+
+        :param view: (HistoryView)
+        '''
+        name = view.getName()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            entry.views.discard(view)
+            entry.refs.discard(weakref.ref(view))
+            self._release(name, entry)
+
+    def _updateCapacity(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            sizes = [v.getMaxSize() for v in entry.views]
+            if sizes:
+                entry.buffer.setCapacity(max(sizes))
+
+    def getBuffer(self, name):
+        '''returns the history buffer of the given attribute (or None if no
+        client is subscribed to it)
+
+        :param name: (str) full name of the attribute
+
+        :return: (HistoryBuffer or None)
+        '''
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        return entry.buffer
+
+    def getNames(self):
+        '''returns the names of the attributes whose history is stored
+
+        :return: (list<str>)
+        '''
+        return self._entries.keys()
+
+    def append(self, name, value):
+        '''stores the given value in the history of the given attribute. The
+        value is ignored if it is the same object than the last one appended
+        (so that all the clients receiving the same event can append it)
+
+        :param name: (str) full name of the attribute
+        :param value: (TaurusAttrValue) the value to store
+
+        :return: (bool) True if the value was appended
+        '''
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or value is entry.last:
+                return False
+            t, v = value.time.totime(), value.rvalue.magnitude
+            entry.buffer.append(t, v)
+            entry.last = value
+            spool = entry.spool
+        # the file is written out of the store lock (the spool has its own)
+        if spool is not None:
+            try:
+                spool.append(t, v)
+            except Exception, e:
+                self.warning('Cannot spool the history of %s: %r', name, e)
+                with self._lock:
+                    if entry.spool is spool:
+                        self._closeSpool(entry)
+        return True
@@ -28,7 +28,7 @@
 
 __all__ = ["LogIt", "TraceIt", "DebugIt", "InfoIt", "WarnIt", "ErrorIt",
            "CriticalIt", "MemoryLogHandler", "LogExceptHook", "Logger",
-           "LogFilter",
+           "LogFilter", "LogCallCounter",
            "_log", "trace", "debug", "info", "warning", "error", "fatal",
            "critical", "deprecated", "deprecation_decorator",
            "tep14_deprecation"]
@@ -75,6 +75,72 @@ class _DeprecationCounter(defaultdict):
 _DEPRECATION_COUNT = _DeprecationCounter()
 # ------------------------------------------------------------------------------
 
+
+class LogCallCounter(object):
+    """Counts the calls to the log methods of :class:`Logger` per call site
+    (see :meth:`Logger.enableLogCallCounting`)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def count(self, frame, level, emitted):
+        """counts a call
+
+        :param frame: (frame) the frame of the caller
+        :param level: (int) the log level of the call
+        :param emitted: (bool) whether the level was enabled
+        """
+        co = frame.f_code
+        key = co.co_filename, frame.f_lineno, co.co_name, level
+        with self._lock:
+            c = self._counts.get(key)
+            if c is None:
+                c = self._counts[key] = [0, 0]
+            c[0] += 1
+            if emitted:
+                c[1] += 1
+
+    def getCounts(self):
+        """returns the counts
+
+        :return: (dict) maps (filename, line number, function name, level)
+                 to (number of calls, number of emitted records)
+        """
+        with self._lock:
+            return dict((k, tuple(v)) for k, v in self._counts.iteritems())
+
+    def getTotal(self):
+        """returns the total number of calls and emitted records
+
+        :return: (tuple<int,int>)
+        """
+        calls = emitted = 0
+        for c, e in self.getCounts().itervalues():
+            calls += c
+            emitted += e
+        return calls, emitted
+
+    def reset(self):
+        """resets the counts"""
+        with self._lock:
+            self._counts = {}
+
+    def pretty(self, n=20):
+        """returns a report of the call sites with more calls
+
+        :param n: (int) maximum number of call sites reported
+
+        :return: (str)
+        """
+        items = sorted(self.getCounts().iteritems(), key=lambda i: i[1][0],
+                       reverse=True)
+        lines = ['\t%d (%d emitted) * %s:%d %s [%s]' % (
+            c, e, filename, lineno, func, logging.getLevelName(level))
+            for (filename, lineno, func, level), (c, e) in items[:n]]
+        return "< Log Calls (%d, %d emitted):\n%s >" % (
+            self.getTotal() + ('\n'.join(lines),))
+
 TRACE = 5
 logging.addLevelName(TRACE, "TRACE")
 
@@ -90,6 +156,13 @@ else:
     _srcfile = __file__
 _srcfile = os.path.normcase(_srcfile)
 
+#
+# the state of the logging module which the enabled levels cached by the
+# Logger objects depend on (besides the levels of the taurus loggers)
+#
+_root_logger = logging.root
+_log_manager = logging.Logger.manager
+
 # next bit filched from 1.5.2's inspect.py
 
 
@@ -410,6 +483,10 @@ class LogExceptHook(BaseExceptHook):
 
 class _Logger(logging.Logger):
 
+    def setLevel(self, level):
+        logging.Logger.setLevel(self, level)
+        Logger.invalidateLogLevelCache()
+
     def findCaller(self):
         """
         Find the stack frame of the caller so that we can note the source
@@ -482,6 +559,21 @@ class Logger(Object):
     #: the main stream handler
     stream_handler = None
 
+    #: the counter of log calls (None unless enabled with
+    #: :meth:`enableLogCallCounting`)
+    log_call_counter = None
+
+    #: Internal usage: generation of the cached enabled levels (it changes
+    #: when the levels of the loggers change)
+    _log_level_gen = 0
+
+    #: Internal usage: cached generation, root level, disabled level and
+    #: minimum enabled level of the logger of each instance
+    _log_cached_gen = -1
+    _log_cached_root = None
+    _log_cached_disable = None
+    _log_min_level = 0
+
     def __init__(self, name='', parent=None, format=None):
         """The Logger constructor
 
@@ -504,6 +596,7 @@ class Logger(Object):
             self.log_full_name = name
 
         self.log_obj = self._getLogger(self.log_full_name)
+        self._log_cached_gen = -1
         self.log_handlers = []
 
         self.log_parent = None
@@ -539,6 +632,9 @@ class Logger(Object):
                 if hasattr(cls, console_log_level):
                     cls.log_level = getattr(cls, console_log_level)
             root_logger.setLevel(cls.log_level)
+            if os.environ.get("TAURUSLOGCALLCOUNT", None):
+                Logger.log_call_counter = LogCallCounter()
+            Logger.invalidateLogLevelCache()
             Logger.root_inited = True
         finally:
             cls.root_init_lock.release()
@@ -583,6 +679,44 @@ class Logger(Object):
         """
         cls.log_level = level
         cls.initRoot().setLevel(level)
+        Logger.invalidateLogLevelCache()
+
+    @staticmethod
+    def invalidateLogLevelCache():
+        """Discards the enabled levels cached by the Logger objects. It is
+           called when the log level of a taurus logger changes (the changes
+           of the root logger level and of :func:`logging.disable` are
+           detected anyway). Call it after changing the level of other
+           loggers with the :mod:`logging` API directly
+        """
+        Logger._log_level_gen += 1
+
+    @staticmethod
+    def enableLogCallCounting():
+        """Starts counting the calls to the log methods (trace, debug, ...)
+           of the Logger objects per call site, whether the records are
+           emitted or not (see :meth:`getLogCallCounter`). Counting can also
+           be enabled by setting the TAURUSLOGCALLCOUNT environment variable.
+           Note that it slows down the calls for disabled levels
+        """
+        if Logger.log_call_counter is None:
+            Logger.log_call_counter = LogCallCounter()
+        Logger.invalidateLogLevelCache()
+
+    @staticmethod
+    def disableLogCallCounting():
+        """Stops counting the calls to the log methods"""
+        Logger.log_call_counter = None
+        Logger.invalidateLogLevelCache()
+
+    @staticmethod
+    def getLogCallCounter():
+        """Returns the counter of calls to the log methods
+
+           :return: (LogCallCounter or None) the counter, or None if counting
+                    is not enabled
+        """
+        return Logger.log_call_counter
 
     @classmethod
     def getLogLevel(cls):
@@ -716,7 +850,8 @@ class Logger(Object):
            :param args: list of arguments
            :param kw: list of keyword arguments
         """
-        self.log_obj.log(self.Trace, msg, *args, **kw)
+        if self._mayLog(self.Trace):
+            self._logCall(self.Trace, msg, args, kw)
 
     def traceback(self, level=Trace, extended=True):
         """Log the usual traceback information, followed by a listing of all the
@@ -802,6 +937,51 @@ class Logger(Object):
            :param args: list of arguments
            :param kw: list of keyword arguments
         """
+        if self._mayLog(level):
+            self._logCall(level, msg, args, kw)
+
+    def _mayLog(self, level):
+        """whether a message of the given level may be recorded, i.e. the
+           level is enabled or the minimum level cached by
+           :meth:`_updateLogLevelCache` may be stale. The log methods call
+           :meth:`_logCall` only in that case"""
+        return (level >= self._log_min_level or
+                self._log_cached_gen != Logger._log_level_gen or
+                self._log_cached_root != _root_logger.level or
+                self._log_cached_disable != _log_manager.disable)
+
+    def _updateLogLevelCache(self):
+        """caches the minimum level enabled for this object's logger. The
+           cache is valid while the generation (see
+           :meth:`invalidateLogLevelCache`), the level of the root logger and
+           the level disabled with :func:`logging.disable` do not change"""
+        gen = Logger._log_level_gen
+        root = _root_logger.level
+        disable = _log_manager.disable
+        if Logger.log_call_counter is not None:
+            level = 0  # all calls go through _logCall, to be counted
+        else:
+            level = max(self.log_obj.getEffectiveLevel(), disable + 1)
+        # the level is set before the state it is valid for, so that other
+        # threads never see the new state with the previous level
+        self._log_min_level = level
+        self._log_cached_gen = gen
+        self._log_cached_root = root
+        self._log_cached_disable = disable
+
+    def _logCall(self, level, msg, args, kw):
+        """Records a message if the level is enabled (called by the log
+           methods when the level may be enabled, see :meth:`_mayLog`)"""
+        self._updateLogLevelCache()
+        counter = Logger.log_call_counter
+        if counter is None:
+            if level < self._log_min_level:
+                return
+        else:
+            enabled = self.log_obj.isEnabledFor(level)
+            counter.count(sys._getframe(2), level, enabled)
+            if not enabled:
+                return
         self.log_obj.log(level, msg, *args, **kw)
 
     def debug(self, msg, *args, **kw):
@@ -812,7 +992,8 @@ class Logger(Object):
            :param args: list of arguments
            :param kw: list of keyword arguments
         """
-        self.log_obj.debug(msg, *args, **kw)
+        if self._mayLog(self.Debug):
+            self._logCall(self.Debug, msg, args, kw)
 
     def info(self, msg, *args, **kw):
         """Record an info message in this object's logger. Accepted *args* and
@@ -822,7 +1003,8 @@ class Logger(Object):
            :param args: list of arguments
            :param kw: list of keyword arguments
         """
-        self.log_obj.info(msg, *args, **kw)
+        if self._mayLog(self.Info):
+            self._logCall(self.Info, msg, args, kw)
 
     def warning(self, msg, *args, **kw):
         """Record a warning message in this object's logger. Accepted *args* and
@@ -832,7 +1014,8 @@ class Logger(Object):
            :param args: list of arguments
            :param kw: list of keyword arguments
         """
-        self.log_obj.warning(msg, *args, **kw)
+        if self._mayLog(self.Warning):
+            self._logCall(self.Warning, msg, args, kw)
 
     def deprecated(self, msg=None, dep=None, alt=None, rel=None, dbg_msg=None,
                    _callerinfo=None, **kw):
@@ -894,7 +1077,8 @@ class Logger(Object):
            :param args: list of arguments
            :param kw: list of keyword arguments
         """
-        self.log_obj.error(msg, *args, **kw)
+        if self._mayLog(self.Error):
+            self._logCall(self.Error, msg, args, kw)
 
     def fatal(self, msg, *args, **kw):
         """Record a fatal message in this object's logger. Accepted *args* and
@@ -904,7 +1088,8 @@ class Logger(Object):
            :param args: list of arguments
            :param kw: list of keyword arguments
         """
-        self.log_obj.fatal(msg, *args, **kw)
+        if self._mayLog(self.Fatal):
+            self._logCall(self.Fatal, msg, args, kw)
 
     def critical(self, msg, *args, **kw):
         """Record a critical message in this object's logger. Accepted *args* and
@@ -914,7 +1099,8 @@ class Logger(Object):
            :param args: list of arguments
            :param kw: list of keyword arguments
         """
-        self.log_obj.critical(msg, *args, **kw)
+        if self._mayLog(self.Critical):
+            self._logCall(self.Critical, msg, args, kw)
 
     def exception(self, msg, *args):
         """Log a message with severity 'ERROR' on the root logger, with
@@ -973,6 +1159,7 @@ class Logger(Object):
             self.log_full_name = name
 
         self.log_obj = logging.getLogger(self.log_full_name)
+        self._log_cached_gen = -1
         for handler in self.log_handlers:
             self.log_obj.addHandler(handler)
 
@@ -0,0 +1,396 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+"""This module provides a compact buffer of :class:`logging.LogRecord`"""
+
+__all__ = ["LogRecordBuffer"]
+
+__docformat__ = 'restructuredtext'
+
+import logging
+
+import numpy
+
+
+class _InternTable(object):
+    '''Maps (hashable) values to consecutive integer ids'''
+
+    def __init__(self):
+        self._ids = {}
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def getId(self, value):
+        try:
+            return self._ids[value]
+        except KeyError:
+            i = self._ids[value] = len(self.values)
+            self.values.append(value)
+            return i
+
+    def compact(self, ids):
+        '''keeps only the values with the given ids (renumbering them)
+
+        :param ids: (numpy.ndarray) ids of the values in use
+
+        :return: (numpy.ndarray) the new id of each (old) id
+        '''
+        used = numpy.unique(ids)
+        remap = numpy.zeros(len(self.values), dtype='int32')
+        remap[used] = numpy.arange(len(used), dtype='int32')
+        self.values = [self.values[i] for i in used.tolist()]
+        self._ids = dict((v, i) for i, v in enumerate(self.values))
+        return remap
+
+    def ranks(self):
+        '''returns an array with the position of each value when sorted'''
+        order = sorted(xrange(len(self.values)), key=self.values.__getitem__)
+        ranks = numpy.empty(len(order), dtype='int32')
+        ranks[order] = numpy.arange(len(order), dtype='int32')
+        return ranks
+
+
+class LogRecordBuffer(object):
+    '''
+    A ring buffer of log records which stores their fields in columns
+    (arrays) instead of keeping the :class:`logging.LogRecord` objects:
+
+        - the time stamps and levels are stored in numpy arrays
+        - the level names, logger names, origins (host, process and thread)
+          and code locations are interned (i.e., each distinct value is
+          stored once and the records keep its id)
+        - the message of each record is kept unformatted (message and
+          arguments), and it is only formatted when requested
+
+    The records are identified by a sequence number (which increases with
+    each appended record). When the buffer is full, the oldest records are
+    discarded (without moving the others). The interned values which are no
+    longer used by the records in the buffer are discarded when the tables
+    grow over :attr:`MinCompactSize` values (and over twice their size after
+    the previous compaction).
+    '''
+
+    #: fields which can be used to sort the records (see :meth:`argsort`)
+    SortFields = 'levelno', 'created', 'msg', 'name', 'origin'
+
+    #: minimum number of values of an interned table for it to be compacted
+    MinCompactSize = 1024
+
+    def __init__(self, capacity=500000):
+        '''
+        :param capacity: (int) maximum number of records
+        '''
+        self._capacity = capacity
+        self._levelnames = _InternTable()
+        self._names = _InternTable()
+        self._origins = _InternTable()
+        self._traces = _InternTable()
+        self._compactSize = self.MinCompactSize
+        self._allocate(min(capacity, 1024))
+        self._first = self._next = 0
+
+    def _allocate(self, size):
+        self._size = size
+        self._created = numpy.zeros(size, dtype='float64')
+        self._levelno = numpy.zeros(size, dtype='int32')
+        self._levelname = numpy.zeros(size, dtype='int32')
+        self._name = numpy.zeros(size, dtype='int32')
+        self._origin = numpy.zeros(size, dtype='int32')
+        self._trace = numpy.zeros(size, dtype='int32')
+        self._msg = numpy.empty(size, dtype=object)
+        self._args = numpy.empty(size, dtype=object)
+
+    def _tables(self):
+        return ((self._levelnames, self._levelname), (self._names, self._name),
+                (self._origins, self._origin), (self._traces, self._trace))
+
+    def _compact(self):
+        '''discards the interned values not used by the records in the
+        buffer'''
+        pos = self.seqs() % self._size
+        size = 0
+        for table, column in self._tables():
+            ids = column[pos]
+            column[pos] = table.compact(ids)[ids]
+            size = max(size, len(table))
+        self._compactSize = max(self.MinCompactSize, 2 * size)
+
+    def _columns(self):
+        return (self._created, self._levelno, self._levelname, self._name,
+                self._origin, self._trace, self._msg, self._args)
+
+    def _grow(self, size):
+        '''resizes the columns (keeping the stored records)'''
+        seqs = self.seqs()
+        old = self._columns()
+        self._allocate(size)
+        if len(seqs):
+            src, dst = seqs % len(old[0]), seqs % size
+            for a, b in zip(old, self._columns()):
+                b[dst] = a[src]
+
+    def __len__(self):
+        return self._next - self._first
+
+    def getCapacity(self):
+        '''returns the maximum number of records
+
+        :return: (int)
+        '''
+        return self._capacity
+
+    def firstSeq(self):
+        '''returns the sequence number of the oldest record in the buffer
+
+        :return: (int)
+        '''
+        return self._first
+
+    def nextSeq(self):
+        '''returns the sequence number of the next record to be appended
+
+        :return: (int)
+        '''
+        return self._next
+
+    def seqs(self):
+        '''returns the sequence numbers of the records in the buffer
+
+        :return: (numpy.ndarray)
+        '''
+        return numpy.arange(self._first, self._next, dtype='int64')
+
+    def clear(self):
+        '''discards all the records'''
+        self._first = self._next
+        self._msg[:] = None
+        self._args[:] = None
+        self._compact()
+
+    def append(self, record):
+        '''appends a record (see :meth:`extend`)
+
+        :param record: (logging.LogRecord) the record
+        '''
+        return self.extend((record,))
+
+    def extend(self, records):
+        '''appends records, discarding the oldest ones if the capacity is
+        exceeded
+
+        :param records: (sequence<logging.LogRecord>) the records
+
+        :return: (int) number of discarded records
+        '''
+        n = len(records)
+        if n == 0:
+            return 0
+        if n > self._capacity:
+            records = records[n - self._capacity:]
+        total = len(self) + n
+        if total > self._size and self._size < self._capacity:
+            size = self._size
+            while size < min(total, self._capacity):
+                size *= 2
+            self._grow(min(size, self._capacity))
+        m = len(records)
+        pos = numpy.arange(self._next + n - m, self._next + n) % self._size
+        getLevelName = self._levelnames.getId
+        getName = self._names.getId
+        getOrigin = self._origins.getId
+        getTrace = self._traces.getId
+        self._created[pos] = [r.created for r in records]
+        self._levelno[pos] = [r.levelno for r in records]
+        self._levelname[pos] = [getLevelName(r.levelname) for r in records]
+        self._name[pos] = [getName(r.name) for r in records]
+        self._origin[pos] = [getOrigin(self._getOrigin(r)) for r in records]
+        self._trace[pos] = [getTrace(self._getTrace(r)) for r in records]
+        # (the messages and arguments may be sequences: set them one by one)
+        msg, args = self._msg, self._args
+        for p, r in zip(pos.tolist(), records):
+            msg[p], args[p] = r.msg, r.args
+        self._next += n
+        discarded = max(0, self._next - self._first - self._capacity)
+        self._first += discarded
+        # (e.g. the origins include the thread ids, which keep changing)
+        if max(len(t) for t, _ in self._tables()) > self._compactSize:
+            self._compact()
+        return discarded
+
+    @staticmethod
+    def _getOrigin(r):
+        return (getattr(r, 'hostName', None),
+                getattr(r, 'processName', "?process?"),
+                getattr(r, 'process', "?PID?"),
+                getattr(r, 'threadName', "?thread?"),
+                getattr(r, 'thread', "?threadID?"))
+
+    @staticmethod
+    def _getTrace(r):
+        return (getattr(r, 'pathname', ''), getattr(r, 'filename', ''),
+                getattr(r, 'module', ''), getattr(r, 'funcName', ''),
+                getattr(r, 'lineno', ''))
+
+    def _pos(self, seq):
+        if not self._first <= seq < self._next:
+            raise IndexError('record %d is not in the buffer' % seq)
+        return seq % self._size
+
+    def getCreated(self, seq):
+        '''returns the time stamp of a record
+
+        :param seq: (int) sequence number of the record
+
+        :return: (float)
+        '''
+        return float(self._created[self._pos(seq)])
+
+    def getLevelNo(self, seq):
+        '''returns the level of a record
+
+        :param seq: (int) sequence number of the record
+
+        :return: (int)
+        '''
+        return int(self._levelno[self._pos(seq)])
+
+    def getLevelName(self, seq):
+        '''returns the level name of a record
+
+        :param seq: (int) sequence number of the record
+
+        :return: (str)
+        '''
+        return self._levelnames.values[self._levelname[self._pos(seq)]]
+
+    def getName(self, seq):
+        '''returns the logger name of a record
+
+        :param seq: (int) sequence number of the record
+
+        :return: (str)
+        '''
+        return self._names.values[self._name[self._pos(seq)]]
+
+    def getMessage(self, seq):
+        '''returns the (formatted) message of a record, as
+        :meth:`logging.LogRecord.getMessage` does
+
+        :param seq: (int) sequence number of the record
+
+        :return: (str)
+        '''
+        pos = self._pos(seq)
+        msg, args = self._msg[pos], self._args[pos]
+        if not isinstance(msg, basestring):
+            msg = str(msg)
+        if args:
+            msg = msg % args
+        return msg
+
+    def getOrigin(self, seq):
+        '''returns the origin of a record
+
+        :param seq: (int) sequence number of the record
+
+        :return: (tuple) host (None if unknown), process name, process id,
+                 thread name and thread id
+        '''
+        return self._origins.values[self._origin[self._pos(seq)]]
+
+    def getTrace(self, seq):
+        '''returns the code location of a record
+
+        :param seq: (int) sequence number of the record
+
+        :return: (tuple) path name, file name, module name, function name and
+                 line number
+        '''
+        return self._traces.values[self._trace[self._pos(seq)]]
+
+    def getRecord(self, seq):
+        '''returns a :class:`logging.LogRecord` rebuilt from the stored
+        fields of a record
+
+        :param seq: (int) sequence number of the record
+
+        :return: (logging.LogRecord)
+        '''
+        pos = self._pos(seq)
+        host, processName, process, threadName, thread = self.getOrigin(seq)
+        pathname, filename, module, funcName, lineno = self.getTrace(seq)
+        d = dict(name=self.getName(seq), msg=self._msg[pos],
+                 args=self._args[pos], levelname=self.getLevelName(seq),
+                 levelno=self.getLevelNo(seq), created=self.getCreated(seq),
+                 processName=processName, process=process,
+                 threadName=threadName, thread=thread, pathname=pathname,
+                 filename=filename, module=module, funcName=funcName,
+                 lineno=lineno)
+        if host is not None:
+            d['hostName'] = host
+        return logging.makeLogRecord(d)
+
+    def argsort(self, field, seqs=None):
+        '''returns the sequence numbers of the records sorted by the given
+        field (the sort is stable)
+
+        :param field: (str) one of :attr:`SortFields`. 'msg' sorts by the
+                      unformatted message and 'origin' sorts by process,
+                      thread and logger name
+        :param seqs: (numpy.ndarray) the sequence numbers of the records to
+                     be sorted (all the records in the buffer by default)
+
+        :return: (numpy.ndarray) the sorted sequence numbers
+        '''
+        if seqs is None:
+            seqs = self.seqs()
+        pos = seqs % self._size
+        if field == 'levelno':
+            keys = self._levelno[pos]
+        elif field == 'created':
+            keys = self._created[pos]
+        elif field == 'name':
+            keys = self._names.ranks()[self._name[pos]]
+        elif field == 'msg':
+            keys = self._msg[pos]
+        elif field == 'origin':
+            origins = self._origins.values
+            process = _InternTable()
+            thread = _InternTable()
+            pids = numpy.array([process.getId(o[2]) for o in origins] or [0],
+                               dtype='int32')
+            tids = numpy.array([thread.getId(o[4]) for o in origins] or [0],
+                               dtype='int32')
+            names = self._names.ranks()[self._name[pos]]
+            origin = self._origin[pos]
+            order = numpy.lexsort((names, thread.ranks()[tids[origin]],
+                                   process.ranks()[pids[origin]]))
+            return seqs[order]
+        else:
+            raise ValueError('Cannot sort by %r' % field)
+        return seqs[numpy.argsort(keys, kind='mergesort')]
@@ -28,7 +28,8 @@
 from __future__ import print_function
 from __future__ import with_statement
 
-__all__ = ["LogRecordStreamHandler", "LogRecordSocketReceiver", "log"]
+__all__ = ["LogRecordStreamHandler", "LogRecordBatchStreamHandler",
+           "LogRecordSocketReceiver", "log"]
 
 import time
 import socket
@@ -36,7 +37,11 @@ import pickle
 import logging
 import logging.handlers
 import struct
+import threading
 import weakref
+from collections import deque
+
+from .threadpool import ThreadPool
 
 try:
     import socketserver
@@ -90,9 +95,113 @@ class LogRecordStreamHandler(socketserver.StreamRequestHandler):
         self._stop = 1
 
 
+class LogRecordBatchStreamHandler(LogRecordStreamHandler):
+    """
+    A stream handler for high log throughputs. The data received from the
+    socket is read into a large reusable buffer, from which all the complete
+    (length-prefixed) frames are taken at once. Each batch of frames is
+    decoded by the decoder pool of the server (see
+    :class:`LogRecordSocketReceiver`), and the records are passed in batches
+    to :meth:`handleLogRecords` (in the order in which they were received).
+    """
+
+    #: size (in bytes) of the receive buffer. It grows if a larger frame is
+    #: received
+    BufferSize = 1 << 20
+
+    _Header = struct.Struct('>L')
+
+    def _handle(self):
+        self._stop = 0
+        self._lock = threading.Lock()
+        self._batches = deque()
+        self.hostName = self.server.hostName
+        self.server.registerHandler(self)
+        buf = bytearray(self.BufferSize)
+        view = memoryview(buf)
+        start = end = 0  # data not yet parsed: buf[start:end]
+        size = 0  # size of the next frame (0 if not known yet)
+        hsize = self._Header.size
+        while not self._stop:
+            if end == len(buf) or start + size > len(buf):
+                # move the incomplete frame to the start of a buffer (which
+                # is enlarged if the frame does not fit)
+                old = buf
+                if size > len(buf):
+                    buf = bytearray(size)
+                    view = memoryview(buf)
+                buf[:end - start] = old[start:end]
+                start, end = 0, end - start
+            n = self.connection.recv_into(view[end:])
+            if not n:
+                break
+            end += n
+            frames = []
+            while end - start >= hsize:
+                size = hsize + self._Header.unpack_from(buf, start)[0]
+                if end - start < size:
+                    break
+                frames.append(bytes(buf[start + hsize:start + size]))
+                start += size
+                size = 0
+            if start == end:
+                start = end = 0
+            if frames:
+                self._submit(frames)
+
+    def _submit(self, frames):
+        batch = [None]
+        with self._lock:
+            self._batches.append(batch)
+        pool = self.server.getDecoderPool()
+        if pool is None:
+            self._decode(frames, batch)
+        else:
+            pool.add(self._decode, None, frames, batch)
+
+    def _decode(self, frames, batch):
+        records = []
+        for frame in frames:
+            try:
+                records.append(self.makeLogRecord(self.unPickle(frame)))
+            except Exception:
+                pass  # corrupted frame
+        with self._lock:
+            batch[0] = records
+            # deliver the decoded batches in order
+            while self._batches and self._batches[0][0] is not None:
+                records = self._batches.popleft()[0]
+                try:
+                    self.handleLogRecords(records)
+                except Exception:
+                    pass
+
+    def makeLogRecord(self, obj):
+        if 'levelno' not in obj or 'created' not in obj:
+            return LogRecordStreamHandler.makeLogRecord(self, obj)
+        # the dictionary of a record sent by a SocketHandler has all the
+        # attributes: skip the (slow) initialization of a new LogRecord
+        record = logging.LogRecord.__new__(logging.LogRecord)
+        record.__dict__.update(obj)
+        if 'hostName' not in obj:
+            record.hostName = self.hostName
+        return record
+
+    def handleLogRecords(self, records):
+        """handles a batch of records. Default implementation calls
+        :meth:`handleLogRecord` for each of them"""
+        for record in records:
+            self.handleLogRecord(record)
+
+
 class LogRecordSocketReceiver(socketserver.ThreadingTCPServer):
     """
     Simple TCP socket-based logging receiver suitable for testing.
+
+    Each connection is read by its own thread. The records received with a
+    :class:`LogRecordBatchStreamHandler` (the default handler) are decoded
+    by a pool of `decoders` threads shared by all the connections (or by the
+    connection threads, if `decoders` is 0).
     """
 
     allow_reuse_address = 1
@@ -100,7 +209,7 @@ class LogRecordSocketReceiver(socketserver.ThreadingTCPServer):
 
     def __init__(self, host='localhost',
                  port=logging.handlers.DEFAULT_TCP_LOGGING_PORT,
-                 handler=LogRecordStreamHandler, **kwargs):
+                 handler=LogRecordBatchStreamHandler, decoders=1, **kwargs):
         socketserver.ThreadingTCPServer.__init__(self, (host, port), handler)
         self.hostName = socket.gethostbyaddr(host)[0]
         self.port = port
@@ -109,6 +218,17 @@ class LogRecordSocketReceiver(socketserver.ThreadingTCPServer):
         self.timeout = 1
         self.data = kwargs
         self.__handlers = []
+        self.__decoderPool = None
+        if decoders > 0:
+            # (the bounded queue stops reading the sockets when the
+            # decoders cannot keep up)
+            self.__decoderPool = ThreadPool(name="LogDecoderTP",
+                                            Psize=decoders, Qsize=64)
+
+    def getDecoderPool(self):
+        """returns the pool of threads which decode the received records
+        (None if they are decoded by the connection threads)"""
+        return self.__decoderPool
 
     def registerHandler(self, handler):
         if handler is not None:
@@ -143,6 +263,8 @@ class LogRecordSocketReceiver(socketserver.ThreadingTCPServer):
                 h.finish()
                 self.close_request(h.connection)
         self.socket.close()
+        if self.__decoderPool is not None:
+            self.__decoderPool.join()
 
 
 class LogNameFilter(logging.Filter):
@@ -80,9 +80,26 @@ class SafeEvaluator(object):
 
         self._originalSafeDict = self.safe_dict.copy()
 
+    #: cache of compiled expressions (shared by all evaluators)
+    _code_cache = {}
+
+    #: maximum number of compiled expressions kept in the cache
+    MaxCodeCacheSize = 4096
+
+    def compile(self, expr):
+        """Returns the code object for the given expression. Expressions are
+        compiled only once and the resulting code objects are cached"""
+        code = self._code_cache.get(expr)
+        if code is None:
+            code = compile(expr, '<SafeEvaluator>', 'eval')
+            if len(self._code_cache) >= self.MaxCodeCacheSize:
+                self._code_cache.clear()
+            self._code_cache[expr] = code
+        return code
+
     def eval(self, expr):
         """safe eval"""
-        return eval(expr, {"__builtins__": None}, self.safe_dict)
+        return eval(self.compile(expr), {"__builtins__": None}, self.safe_dict)
 
     def addSafe(self, safedict, permanent=False):
         """The values in safedict will be evaluable (whitelisted)
@@ -0,0 +1,505 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""This module provides disk-backed, memory-mapped time series files (used
+e.g. for keeping a long term history of the attributes shown by trends)"""
+
+__all__ = ["SpoolFile", "HistorySpool"]
+
+__docformat__ = "restructuredtext"
+
+import os
+import ast
+import bisect
+import threading
+import time
+
+import numpy
+
+try:
+    import fcntl
+except ImportError:  # (e.g. on Windows)
+    fcntl = None
+
+
+class SpoolFile(object):
+    '''An append-only file of (timestamp, value) records of fixed size.
+
+    The file consists of a text header describing the records followed by
+    the records themselves, which are read through a (read-only) memory map.
+    The records are kept in time order (records older than the last one are
+    rejected) and a sparse index (the timestamp of one of every
+    :attr:`IndexStep` records) is kept in memory, so that the records of a
+    given time range can be located by reading only a few pages of the file.
+
+    The appended records are written to the file in batches: they are
+    flushed when they are read, when the file is closed (see :meth:`flush`)
+    or, at the latest, :attr:`FlushPeriod` seconds after the last flush.
+    '''
+
+    #: first bytes of the spool files
+    Magic = 'TAURUSSP'
+
+    #: size (in bytes) of the header of the spool files
+    HeaderSize = 256
+
+    #: number of records between entries of the time index
+    IndexStep = 1024
+
+    #: maximum time (in s) that the appended records are kept unflushed
+    FlushPeriod = 1.
+
+    def __init__(self, fileName, shape=None, dtype='d', readOnly=False):
+        '''
+        :param fileName: (str) name of the file. If it exists, its records
+                         are kept (and shape and dtype are ignored)
+        :param shape: (tuple<int>) shape of the value of each record (needed
+                      only if the file is created)
+        :param dtype: (numpy.dtype) dtype of the values (used only if the
+                      file is created)
+        :param readOnly: (bool) if True, the file is not opened for appending
+        '''
+        self.__lock = threading.RLock()
+        self.__fileName = fileName
+        self.__map = None
+        self.__index = []
+        self.__file = None
+        self.__unflushed = 0
+        self.__flushTime = 0
+        if os.path.exists(fileName):
+            self.__readHeader()
+        elif readOnly:
+            raise IOError('Spool file "%s" does not exist' % fileName)
+        else:
+            if shape is None:
+                raise ValueError('The shape is needed for creating "%s"' %
+                                 fileName)
+            self.__setRecordType(shape, dtype)
+            self.__writeHeader()
+        itemsize = self.__rtype.itemsize
+        size = os.path.getsize(fileName) - self.HeaderSize
+        self.__count = max(size, 0) // itemsize
+        if not readOnly:
+            if size != self.__count * itemsize:
+                # discard an incomplete record (e.g. from a crash)
+                with open(fileName, 'r+b') as f:
+                    f.truncate(self.HeaderSize + self.__count * itemsize)
+            self.__file = open(fileName, 'ab')
+        self.__buildIndex()
+
+    def __setRecordType(self, shape, dtype):
+        self.__shape = tuple(shape)
+        self.__dtype = numpy.dtype(dtype)
+        self.__rtype = numpy.dtype([('t', '<f8'),
+                                    ('v', self.__dtype, self.__shape)])
+
+    def __writeHeader(self):
+        info = repr({'descr': self.__dtype.str, 'shape': self.__shape})
+        header = self.Magic + info
+        if len(header) >= self.HeaderSize:
+            raise ValueError('Record type too complex: %s' % info)
+        with open(self.__fileName, 'wb') as f:
+            f.write(header.ljust(self.HeaderSize - 1) + '\n')
+
+    def __readHeader(self):
+        with open(self.__fileName, 'rb') as f:
+            header = f.read(self.HeaderSize)
+        if len(header) != self.HeaderSize or not header.startswith(self.Magic):
+            raise ValueError('"%s" is not a spool file' % self.__fileName)
+        info = ast.literal_eval(header[len(self.Magic):].strip())
+        self.__setRecordType(info['shape'], info['descr'])
+
+    def __buildIndex(self):
+        records = self.__records()
+        self.__index = records['t'][::self.IndexStep].tolist()
+        self.__last = float(records['t'][-1]) if self.__count else None
+
+    def __records(self):
+        '''returns a memory map of all the records'''
+        with self.__lock:
+            if self.__count == 0:
+                return numpy.zeros(0, dtype=self.__rtype)
+            self.flush()
+            if self.__map is None or len(self.__map) < self.__count:
+                self.__map = numpy.memmap(self.__fileName, dtype=self.__rtype,
+                                          mode='r', offset=self.HeaderSize)
+            return self.__map[:self.__count]
+
+    def __len__(self):
+        return self.__count
+
+    def __repr__(self):
+        return "SpoolFile(%r, shape=%r, len=%i)" % (self.__fileName,
+                                                     self.__shape, len(self))
+
+    def getFileName(self):
+        '''returns the name of the file
+
+        :return: (str)
+        '''
+        return self.__fileName
+
+    def getShape(self):
+        '''returns the shape of the value of each record
+
+        :return: (tuple<int>)
+        '''
+        return self.__shape
+
+    def getSize(self):
+        '''returns the size of the file in bytes
+
+        :return: (int)
+        '''
+        return self.HeaderSize + self.__count * self.__rtype.itemsize
+
+    def timeRange(self):
+        '''returns the timestamps of the first and last records
+
+        :return: (tuple<float,float> or None) None if the file is empty
+        '''
+        if self.__count == 0:
+            return None
+        return float(self.__records()['t'][0]), self.__last
+
+    def append(self, t, value):
+        '''appends a record. The record is ignored if it is older than the
+        last one
+
+        :param t: (float) timestamp
+        :param value: (object) value (anything that can be converted to an
+                      array of the shape and dtype of the file)
+
+        :return: (bool) True if the record was appended
+        '''
+        value = numpy.asarray(value, dtype=self.__dtype)
+        if value.shape != self.__shape:
+            raise ValueError('Incompatible shape %r (expected %r)' %
+                             (value.shape, self.__shape))
+        with self.__lock:
+            if self.__file is None:
+                raise IOError('"%s" is read only' % self.__fileName)
+            if self.__last is not None and t < self.__last:
+                return False
+            record = numpy.empty(1, dtype=self.__rtype)
+            record['t'] = t
+            record['v'] = value
+            self.__file.write(record.tostring())
+            if self.__count % self.IndexStep == 0:
+                self.__index.append(t)
+            self.__count += 1
+            self.__last = t
+            self.__unflushed += 1
+            if time.time() >= self.__flushTime:
+                self.flush()
+            return True
+
+    def flush(self):
+        '''writes the pending records to the file'''
+        with self.__lock:
+            if self.__unflushed and self.__file is not None:
+                self.__file.flush()
+            self.__unflushed = 0
+            self.__flushTime = time.time() + self.FlushPeriod
+
+    def searchTime(self, t):
+        '''returns the position of the first record whose timestamp is not
+        older than the given one
+
+        :param t: (float) timestamp
+
+        :return: (int)
+        '''
+        with self.__lock:
+            # the record is in the block before the first index entry >= t
+            k = bisect.bisect_left(self.__index, t)
+            start = max(k - 1, 0) * self.IndexStep
+            end = min(k * self.IndexStep, self.__count)
+            times = self.__records()['t'][start:end]
+            return start + int(numpy.searchsorted(times, t))
+
+    def getRange(self, t0=None, t1=None):
+        '''returns (memory-mapped) views of the records in the given time
+        range
+
+        :param t0: (float or None) start of the range (inclusive). If None,
+                   the range starts at the first record
+        :param t1: (float or None) end of the range (exclusive). If None, the
+                   range ends at the last record
+
+        :return: (tuple<numpy.ndarray,numpy.ndarray>) timestamps and values
+        '''
+        with self.__lock:
+            records = self.__records()
+            start = 0 if t0 is None else self.searchTime(t0)
+            end = self.__count if t1 is None else self.searchTime(t1)
+            records = records[start:max(start, end)]
+            return records['t'], records['v']
+
+    def close(self):
+        '''closes the file (the records already read remain accessible)'''
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+                self.__unflushed = 0
+
+
+class HistorySpool(object):
+    '''The long term history of an attribute, kept on disk.
+
+    The history is stored in a directory, as a sequence of
+    :class:`SpoolFile` segments, each of them containing the records of a
+    period of time (see `segmentDuration`). The records can be read for any
+    time range (see :meth:`getRange`).
+
+    The segments older than `maxAge` are deleted, as well as the oldest
+    segments exceeding the total size given by `maxBytes`. This retention
+    policy is applied when a new segment is started.
+
+    The directory is locked (with an exclusive `flock`, where available) for
+    as long as the spool is open, so that it is not written by several
+    processes at once. An IOError is raised if it is locked by another
+    spool.
+    '''
+
+    #: extension of the segment files
+    Extension = '.spool'
+
+    def __init__(self, directory, segmentDuration=3600., maxAge=86400.,
+                 maxBytes=None):
+        '''
+        :param directory: (str) directory where the segments are stored
+                          (created if it does not exist)
+        :param segmentDuration: (float) period (in s) covered by each segment
+        :param maxAge: (float or None) maximum age (in s) of the records kept
+        :param maxBytes: (int or None) maximum total size of the segments
+        '''
+        self.__lock = threading.RLock()
+        self.__directory = directory
+        self.__segmentDuration = segmentDuration
+        self.__maxAge = maxAge
+        self.__maxBytes = maxBytes
+        self.__readers = {}
+        self.__current = None
+        self.__lockFd = None
+        self.__closed = False
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.__lockDirectory()
+        starts = []
+        for fileName in os.listdir(directory):
+            base, ext = os.path.splitext(fileName)
+            if ext != self.Extension:
+                continue
+            try:
+                starts.append((float(base), os.path.join(directory, fileName)))
+            except ValueError:
+                continue
+        self.__segments = sorted(starts)
+
+    def __lockDirectory(self):
+        if fcntl is None:
+            return
+        fd = os.open(self.__directory, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except IOError:
+            os.close(fd)
+            raise IOError('Spool "%s" is in use by another process' %
+                          self.__directory)
+        self.__lockFd = fd
+
+    def __unlockDirectory(self):
+        if self.__lockFd is not None:
+            os.close(self.__lockFd)  # (this releases the lock)
+            self.__lockFd = None
+
+    def isClosed(self):
+        '''whether the spool was closed (see :meth:`close`)
+
+        :return: (bool)
+        '''
+        return self.__closed
+
+    def getDirectory(self):
+        '''returns the directory of the segments
+
+        :return: (str)
+        '''
+        return self.__directory
+
+    def getSegments(self):
+        '''returns the segment files, sorted by time
+
+        :return: (list<str>)
+        '''
+        return [fileName for _, fileName in self.__segments]
+
+    def getSize(self):
+        '''returns the total size of the segments (in bytes)
+
+        :return: (int)
+        '''
+        return sum([os.path.getsize(f) for f in self.getSegments()])
+
+    def __getSegment(self, fileName):
+        '''returns a (read-only, cached) SpoolFile for the given segment'''
+        if self.__current is not None and \
+                self.__current.getFileName() == fileName:
+            return self.__current
+        segment = self.__readers.get(fileName)
+        if segment is None:
+            segment = self.__readers[fileName] = SpoolFile(fileName,
+                                                           readOnly=True)
+        return segment
+
+    def append(self, t, value):
+        '''appends a record to the history
+
+        :param t: (float) timestamp
+        :param value: (object) value
+
+        :return: (bool) True if the record was appended (i.e., if it is not
+                 older than the last one nor the spool is closed)
+        '''
+        value = numpy.asarray(value)
+        with self.__lock:
+            if self.__closed:
+                return False
+            current = self.__current
+            if current is None and self.__segments:
+                # continue the last segment of a previous session if possible
+                start, fileName = self.__segments[-1]
+                if t < start + self.__segmentDuration:
+                    self.__readers.pop(fileName, None)
+                    current = self.__current = SpoolFile(fileName)
+            if (current is None or value.shape != current.getShape() or
+                    t >= self.__segments[-1][0] + self.__segmentDuration):
+                current = self.__newSegment(t, value)
+            return current.append(t, value)
+
+    def __newSegment(self, t, value):
+        if self.__current is not None:
+            self.__current.close()
+        fileName = os.path.join(self.__directory,
+                                '%017.6f%s' % (t, self.Extension))
+        if self.__segments and self.__segments[-1][1] == fileName:
+            # (same start time, but the shape changed)
+            os.remove(fileName)
+            self.__segments.pop()
+        self.__current = SpoolFile(fileName, shape=value.shape,
+                                   dtype=value.dtype)
+        self.__segments.append((t, fileName))
+        self.applyRetention(t)
+        return self.__current
+
+    def applyRetention(self, now):
+        '''deletes the segments that are too old or that exceed the maximum
+        total size (the current segment is never deleted)
+
+        :param now: (float) the current time
+        '''
+        with self.__lock:
+            old = []
+            if self.__maxAge is not None:
+                # a segment ends when the next one starts
+                for i in xrange(len(self.__segments) - 1):
+                    if self.__segments[i + 1][0] < now - self.__maxAge:
+                        old.append(self.__segments[i])
+            if self.__maxBytes is not None:
+                sizes = [os.path.getsize(f) for _, f in self.__segments]
+                total = sum(sizes)
+                for i, segment in enumerate(self.__segments[:-1]):
+                    if total <= self.__maxBytes:
+                        break
+                    total -= sizes[i]
+                    if segment not in old:
+                        old.append(segment)
+            for segment in old:
+                self.__segments.remove(segment)
+                self.__readers.pop(segment[1], None)
+                try:
+                    os.remove(segment[1])
+                except OSError:
+                    pass
+
+    def timeRange(self):
+        '''returns the timestamps of the first and last records
+
+        :return: (tuple<float,float> or None) None if there are no records
+        '''
+        with self.__lock:
+            ranges = [self.__getSegment(f).timeRange()
+                      for f in self.getSegments()]
+            ranges = [r for r in ranges if r is not None]
+            if not ranges:
+                return None
+            return ranges[0][0], ranges[-1][1]
+
+    def getRange(self, t0=None, t1=None):
+        '''returns the records in the given time range. Only the records with
+        the same value shape as the newest ones in the range are returned
+
+        :param t0: (float or None) start of the range (inclusive). If None,
+                   the range starts at the first record
+        :param t1: (float or None) end of the range (exclusive). If None, the
+                   range ends at the last record
+
+        :return: (tuple<numpy.ndarray,numpy.ndarray>) timestamps and values.
+                 They are (memory-mapped) views of the records if the range
+                 is within a single segment
+        '''
+        with self.__lock:
+            pieces = []
+            segments = self.__segments
+            for i, (start, fileName) in enumerate(segments):
+                if t1 is not None and start >= t1:
+                    break
+                if (t0 is not None and i + 1 < len(segments) and
+                        segments[i + 1][0] <= t0):
+                    continue
+                t, v = self.__getSegment(fileName).getRange(t0, t1)
+                if len(t):
+                    pieces.append((t, v))
+            if not pieces:
+                return numpy.zeros(0), numpy.zeros(0)
+            shape = pieces[-1][1].shape[1:]
+            pieces = [(t, v) for t, v in pieces if v.shape[1:] == shape]
+            if len(pieces) == 1:
+                return pieces[0]
+            return (numpy.concatenate([t for t, _ in pieces]),
+                    numpy.concatenate([v for _, v in pieces]))
+
+    def close(self):
+        '''closes the segment being written and unlocks the directory. No
+        more records are appended after closing'''
+        with self.__lock:
+            if self.__current is not None:
+                self.__current.close()
+                self.__current = None
+            self.__readers = {}
+            self.__closed = True
+            self.__unlockDirectory()
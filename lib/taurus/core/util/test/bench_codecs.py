@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Benchmark for the decoding of taurus.core.util.codecs.VideoImageCodec
+
+Usage::
+
+    python bench_codecs.py [width [height]]
+"""
+
+__docformat__ = 'restructuredtext'
+
+import sys
+import struct
+import numpy
+from taurus.core.util.codecs import CodecFactory, VideoImageCodec
+from taurus.test import benchmark, printBenchmark
+
+#: image modes: (label, mode id, bytes per pixel)
+MODES = (('Y8', 0, 1),
+         ('Y16', 1, 2),
+         ('Y32', 2, 4),
+         ('Y64', 3, 8),
+         ('RGB32', 7, 4),
+         ('YUV411', 15, 1.5),
+         ('YUV422', 16, 2),
+         ('YUV444', 17, 3),
+         )
+
+
+def videoImage(mode, width, height, bpp):
+    '''Returns an encoded video_image of the given mode filled with random
+    bytes'''
+    header = struct.pack(VideoImageCodec.VIDEO_HEADER_FORMAT, 0x5644454f, 1,
+                         mode, 0, width, height, 0,
+                         struct.calcsize(VideoImageCodec.VIDEO_HEADER_FORMAT),
+                         0, 0)
+    size = int(width * height * bpp)
+    payload = numpy.random.randint(0, 256, size).astype('uint8').tostring()
+    return header + payload
+
+
+def main(width=2048, height=2048):
+    codec = CodecFactory().getCodec('videoimage')
+    results = []
+    for label, mode, bpp in MODES:
+        data = ('videoimage', videoImage(mode, width, height, bpp))
+        _, img = codec.decode(data)
+        out = numpy.empty_like(img)
+        results.append((label, benchmark(codec.decode, (data,))))
+        results.append((label + ' (out)',
+                        benchmark(codec.decode, (data,), dict(out=out))))
+    printBenchmark(results, title='VideoImageCodec.decode (%ix%i)'
+                   % (width, height))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Benchmark for the log receivers of taurus.core.util.remotelogmonitor.
+
+Several local senders stream (pre-encoded) log records to a
+:class:`LogRecordSocketReceiver` and the time per received record is
+measured for each stream handler.
+
+Usage::
+
+    python bench_remotelogmonitor.py [connections [records]]
+"""
+
+__docformat__ = 'restructuredtext'
+
+import sys
+import time
+import socket
+import logging
+import logging.handlers
+import threading
+from taurus.core.util.remotelogmonitor import LogRecordStreamHandler, \
+    LogRecordBatchStreamHandler, LogRecordSocketReceiver
+from taurus.test import printBenchmark
+
+
+class _Counter(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def add(self, n):
+        with self.lock:
+            self.count += n
+
+
+class _StreamHandler(LogRecordStreamHandler):
+
+    def handleLogRecord(self, record):
+        self.server.data['counter'].add(1)
+
+
+class _BatchStreamHandler(LogRecordBatchStreamHandler):
+
+    def handleLogRecords(self, records):
+        self.server.data['counter'].add(len(records))
+
+
+def encodeRecords(n):
+    '''returns n log records encoded as logging.handlers.SocketHandler does'''
+    handler = logging.handlers.SocketHandler('localhost', 0)
+    chunks = []
+    for i in xrange(n):
+        record = logging.LogRecord('bench.sender', logging.INFO, __file__, i,
+                                   'message %d: %s', (i, 'x' * 50), None)
+        chunks.append(handler.makePickle(record))
+    return ''.join(chunks)
+
+
+def measure(handler, connections, data, n, **kwargs):
+    '''returns the time per record received by the given handler'''
+    counter = _Counter()
+    server = LogRecordSocketReceiver(port=0, handler=handler,
+                                     counter=counter, **kwargs)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_until_stopped)
+    thread.daemon = True
+    thread.start()
+
+    def send():
+        s = socket.create_connection(('localhost', port))
+        s.sendall(data)
+        s.close()
+
+    total = connections * n
+    t0 = time.time()
+    senders = [threading.Thread(target=send) for _ in xrange(connections)]
+    for s in senders:
+        s.start()
+    while counter.count < total and time.time() - t0 < 60:
+        time.sleep(0.001)
+    dt = time.time() - t0
+    for s in senders:
+        s.join()
+    server.stop()
+    if counter.count < total:
+        print 'Warning: %d of %d records received' % (counter.count, total)
+    return dt / total
+
+
+def main(connections=20, n=20000):
+    data = encodeRecords(n)
+    results = [('LogRecordStreamHandler',
+                measure(_StreamHandler, connections, data, n, decoders=0)),
+               ('LogRecordBatchStreamHandler (connection threads)',
+                measure(_BatchStreamHandler, connections, data, n,
+                        decoders=0)),
+               ('LogRecordBatchStreamHandler (1 decoder)',
+                measure(_BatchStreamHandler, connections, data, n,
+                        decoders=1)),
+               ('LogRecordBatchStreamHandler (4 decoders)',
+                measure(_BatchStreamHandler, connections, data, n,
+                        decoders=4))]
+    printBenchmark(results, title='Time per received record (%i connections '
+                   'x %i records)' % (connections, n))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
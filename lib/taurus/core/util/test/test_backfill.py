@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+"""Test for taurus.core.util.backfill"""
+
+__docformat__ = 'restructuredtext'
+
+import time
+import threading
+import numpy
+from taurus.external import unittest
+from taurus.test import insertTest
+from taurus.core.util.backfill import (IntervalIndex, ArchivingBackfill,
+                                       FakeArchivingBackend)
+
+
+@insertTest(helper_name='checkMissing', start=0, end=5, expected=[])
+@insertTest(helper_name='checkMissing', start=-5, end=25,
+            expected=[(-5, 0), (10, 20)])
+@insertTest(helper_name='checkMissing', start=5, end=22, expected=[(10, 20)])
+@insertTest(helper_name='checkMissing', start=40, end=50,
+            expected=[(40, 50)])
+class IntervalIndexTestCase(unittest.TestCase):
+    '''Test case for the IntervalIndex class'''
+
+    def setUp(self):
+        self.index = IntervalIndex([(0, 10), (20, 30)])
+
+    def checkMissing(self, start=0, end=1, expected=None):
+        '''check the gaps of a range'''
+        self.assertEqual(self.index.missing(start, end), expected)
+
+    def test_merge(self):
+        '''check that overlapping and adjacent intervals are merged'''
+        self.index.add(10, 15)
+        self.index.add(14, 20)
+        self.assertEqual(self.index.intervals(), [(0, 30)])
+        self.assertTrue(self.index.covers(3, 27))
+
+    def test_remove(self):
+        '''check that removing a range splits the intervals'''
+        self.index.remove(5, 25)
+        self.assertEqual(self.index.intervals(), [(0, 5), (25, 30)])
+
+
+class ArchivingBackfillTestCase(unittest.TestCase):
+    '''Test case for the ArchivingBackfill class'''
+
+    name = 'test://backfill/attr'
+
+    def setUp(self):
+        self.backend = FakeArchivingBackend(period=1.)
+        self.backfill = ArchivingBackfill()
+        self.backfill.setBackend(self.backend)
+        self.received = []
+
+    def tearDown(self):
+        self.backfill.setBackend(None)
+
+    def _callback(self, name, t, v):
+        self.received.append((name, t, v))
+
+    def _request(self, start, end, expected):
+        n = self.backfill.request(self.name, start, end, self._callback)
+        self.assertEqual(n, expected)
+        # wait for the queries to finish
+        timeout = time.time() + 5
+        while time.time() < timeout:
+            fetched = self.backfill.getFetchedRanges(self.name)
+            if IntervalIndex(fetched).covers(start, end):
+                break
+            time.sleep(0.01)
+        else:
+            self.fail('range not retrieved')
+
+    def test_gaps(self):
+        '''check that only the missing parts of a range are queried'''
+        self._request(10, 20, 1)
+        self._request(0, 30, 2)
+        self._request(5, 25, 0)
+        self.assertEqual(self.backend.queries, [(self.name, 10, 20),
+                                                (self.name, 0, 10),
+                                                (self.name, 20, 30)])
+        self.assertEqual(self.backfill.getFetchedRanges(self.name),
+                         [(0, 30)])
+        t, v = self.backfill.getValues(self.name)
+        self.assertTrue(numpy.all(t == numpy.arange(30)))
+        self.assertTrue(numpy.allclose(v, numpy.sin(t)))
+        t, v = self.backfill.getValues(self.name, 5, 12)
+        self.assertEqual(list(t), range(5, 12))
+
+    def test_cachedRanges(self):
+        '''check that the cached parts of a range are delivered too'''
+        self._request(0, 10, 1)
+        received = []
+        done = threading.Event()
+
+        def callback(name, t, v):
+            received.append(t)
+            if len(received) == 2:
+                done.set()
+        n = self.backfill.request(self.name, 5, 15, callback)
+        self.assertEqual(n, 1)
+        done.wait(5)
+        self.assertTrue(done.is_set(), 'callbacks not received')
+        t = numpy.sort(numpy.concatenate(received))
+        self.assertEqual(list(t), range(5, 15))
+        self.assertEqual(len(self.backend.queries), 2)
+
+    def test_pendingRanges(self):
+        '''check that the values being retrieved for a range are delivered to
+        the later requests of the range'''
+        self.backend.delay = 0.2
+        received = []
+        done = threading.Event()
+
+        def callback(name, t, v):
+            received.append(t)
+            done.set()
+        self.assertEqual(self.backfill.request(self.name, 0, 10), 1)
+        self.assertEqual(self.backfill.request(self.name, 5, 10, callback), 0)
+        done.wait(5)
+        self.assertTrue(done.is_set(), 'callback not received')
+        self.assertEqual(len(received), 1)
+        self.assertEqual(list(received[0]), range(10))
+        self.assertEqual(len(self.backend.queries), 1)
+
+    def test_maxCachedAttributes(self):
+        '''check that only the most recently used attributes are cached'''
+        maxsize = self.backfill.getMaxCachedAttributes()
+        self.backfill.setMaxCachedAttributes(2)
+        try:
+            for name in ('a', 'b', self.name, 'c'):
+                self.name = name
+                self._request(0, 10, 1)
+            self.assertEqual(self.backfill.getFetchedRanges('a'), [])
+            self.assertEqual(self.backfill.getFetchedRanges('b'), [])
+            self.assertEqual(self.backfill.getFetchedRanges('c'), [(0, 10)])
+        finally:
+            self.backfill.setMaxCachedAttributes(maxsize)
+
+    def test_caseless(self):
+        '''check that the attribute names are case insensitive'''
+        self._request(0, 10, 1)
+        n = self.backfill.request(self.name.upper(), 0, 10)
+        self.assertEqual(n, 0)
+
+
+if __name__ == '__main__':
+    pass
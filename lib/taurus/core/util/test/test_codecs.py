@@ -30,6 +30,7 @@
 __docformat__ = 'restructuredtext'
 
 import copy
+import struct
 from taurus.external import unittest
 from taurus.test import insertTest
 from taurus.core.util.codecs import CodecFactory
@@ -49,6 +50,16 @@ import numpy
             '\x00\x00\x00\x00\x01\x01\x01\x01\x01\x01\x01\x01' +
             '\x01\x01\x01\x01\x01\x01\x01\x01',
             expected=numpy.ones((2, 2, 3), dtype='uint8'))
+@insertTest(helper_name='decVideoImage', mode=15, width=4, height=1,
+            payload='\x80\x01\x02\x80\x03\x04', luma=[[1, 2, 3, 4]])
+@insertTest(helper_name='decVideoImage', mode=16, width=2, height=2,
+            payload='\x80\x10\x80\x20' * 2, luma=[[16, 32], [16, 32]])
+@insertTest(helper_name='decVideoImage', mode=17, width=2, height=1,
+            payload='\x10\x80\x80\xff\x80\x80', luma=[[16, 255]])
+@insertTest(helper_name='decVideoImage', mode=17, width=1, height=1,
+            payload='\x80\x80\xff', expected=[[[255, 37, 128]]])
+@insertTest(helper_name='decVideoImage', mode=1, width=2, height=1,
+            payload='\x01\x00\x02\x00', expected=[[1, 2]], dtype='<u2')
 class CodecTest(unittest.TestCase):
     '''TestCase for checking codecs'''
 
@@ -89,5 +100,58 @@ class CodecTest(unittest.TestCase):
             self.assertTrue(equal, msg)
         return fmt, dec
 
+    def decVideoImage(self, mode=None, width=None, height=None, payload=None,
+                      luma=None, expected=None, dtype='uint8'):
+        '''Check the decoding of the given videoimage mode. For the colour
+        modes, either the expected RGB image or just its luma (for images with
+        neutral chroma) can be given'''
+        from taurus.core.util.codecs import VideoImageCodec
+        hfmt = VideoImageCodec.VIDEO_HEADER_FORMAT
+        header = struct.pack(hfmt, 0x5644454f, 1, mode, 0, width, height, 0,
+                             struct.calcsize(hfmt), 0, 0)
+        if luma is not None:
+            expected = numpy.dstack([luma] * 3)
+        expected = numpy.array(expected, dtype=dtype)
+        _, dec = self.dec(cname='videoimage', data=header + payload,
+                          expected=expected)
+        self.assertEqual(dec.shape, expected.shape)
+        # decode again into a preallocated buffer
+        out = numpy.zeros_like(expected)
+        codec = CodecFactory().getCodec('videoimage')
+        _, dec = codec.decode(('videoimage', header + payload), out=out)
+        self.assertIs(dec, out)
+        self.assertTrue(numpy.all(out == expected))
+
+    def test_rgbaContiguous(self):
+        '''Check that the RGB32 (BGRA) mode is decoded to a contiguous and
+        writable RGB array'''
+        from taurus.core.util.codecs import VideoImageCodec
+        hfmt = VideoImageCodec.VIDEO_HEADER_FORMAT
+        header = struct.pack(hfmt, 0x5644454f, 1, 7, 0, 2, 1, 0,
+                             struct.calcsize(hfmt), 0, 0)
+        payload = '\x01\x02\x03\xff\x04\x05\x06\xff'
+        _, dec = self.dec(cname='videoimage', data=header + payload,
+                          expected=[[[3, 2, 1], [6, 5, 4]]])
+        self.assertTrue(dec.flags.c_contiguous)
+        self.assertTrue(dec.flags.writeable)
+
+    def test_greyScaleCopy(self):
+        '''Check that the grey scale modes are decoded to a writable copy
+        unless a view is requested'''
+        from taurus.core.util.codecs import VideoImageCodec
+        hfmt = VideoImageCodec.VIDEO_HEADER_FORMAT
+        header = struct.pack(hfmt, 0x5644454f, 1, 0, 0, 2, 1, 0,
+                             struct.calcsize(hfmt), 0, 0)
+        data = ('videoimage', header + '\x01\x02')
+        codec = CodecFactory().getCodec('videoimage')
+        _, dec = codec.decode(data)
+        self.assertTrue(dec.flags.writeable)
+        self.assertTrue(dec.flags.owndata)
+        self.assertEqual(dec.tolist(), [[1, 2]])
+        _, dec = codec.decode(data, copy=False)
+        self.assertFalse(dec.flags.writeable)
+        self.assertEqual(dec.tolist(), [[1, 2]])
+
+
 if __name__ == '__main__':
     pass
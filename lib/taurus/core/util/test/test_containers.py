@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.core.util.containers"""
+
+__docformat__ = 'restructuredtext'
+
+from taurus.external import unittest
+from taurus.core.util.containers import LRUCache
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    '''Test case for the LRUCache class'''
+
+    def test_eviction(self):
+        '''check that the least recently used items are discarded'''
+        c = LRUCache(3)
+        for k in 'abc':
+            c.put(k, k.upper())
+        self.assertEqual(c.get('a'), 'A')
+        c.put('d', 'D')
+        self.assertFalse('b' in c)
+        self.assertEqual(c.keys(), ['c', 'a', 'd'])
+        c.put('c', 'C2')
+        c.put('e', 'E')
+        self.assertEqual(c.keys(), ['d', 'c', 'e'])
+        self.assertEqual(c.get('c'), 'C2')
+        self.assertEqual(len(c), 3)
+
+    def test_stats(self):
+        '''check the counters of hits and misses'''
+        c = LRUCache(2)
+        c.put('a', None)
+        missing = object()
+        self.assertTrue(c.get('a', missing) is None)
+        self.assertTrue(c.get('b', missing) is missing)
+        self.assertEqual(c.getStats(), (1, 1))
+        c.clear()
+        self.assertEqual(c.getStats(), (0, 0))
+        self.assertEqual(len(c), 0)
+
+    def test_maxsize(self):
+        '''check changing the maximum size and removing items'''
+        c = LRUCache(5)
+        for i in xrange(5):
+            c.put(i, i)
+        c.setMaxSize(2)
+        self.assertEqual(c.keys(), [3, 4])
+        self.assertEqual(c.pop(3), 3)
+        self.assertEqual(c.pop(3, 'x'), 'x')
+        self.assertEqual(c.keys(), [4])
+        c.setMaxSize(0)
+        c.put(1, 1)
+        self.assertEqual(len(c), 0)
+
+
+if __name__ == '__main__':
+    pass
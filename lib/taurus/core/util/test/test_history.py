@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.core.util.history"""
+
+__docformat__ = 'restructuredtext'
+
+import gc
+import numpy
+from taurus.external import unittest
+from taurus.test import insertTest
+from taurus.core.util.history import HistoryBuffer, HistoryStore
+
+
+class _FakeTime(object):
+
+    def __init__(self, t):
+        self._t = t
+
+    def totime(self):
+        return self._t
+
+
+class _FakeQuantity(object):
+
+    def __init__(self, magnitude):
+        self.magnitude = magnitude
+
+
+class _FakeValue(object):
+
+    def __init__(self, t, v):
+        self.time = _FakeTime(t)
+        self.rvalue = _FakeQuantity(v)
+
+
+@insertTest(helper_name='checkWindow', capacity=5, n=3)
+@insertTest(helper_name='checkWindow', capacity=5, n=23)
+@insertTest(helper_name='checkWindow', capacity=200, n=1000)
+class HistoryBufferTestCase(unittest.TestCase):
+    '''Test case for the HistoryBuffer class'''
+
+    def checkWindow(self, capacity=5, n=10):
+        '''check that the newest records are kept in order'''
+        b = HistoryBuffer(capacity)
+        for i in xrange(n):
+            b.append(i, 10 * i)
+        first, t, v = b.contents()
+        expected = numpy.arange(max(0, n - capacity), n)
+        self.assertEqual(first, expected[0])
+        self.assertEqual(len(b), len(expected))
+        self.assertTrue(numpy.all(t == expected))
+        self.assertTrue(numpy.all(v == 10 * expected))
+
+    def test_since(self):
+        '''check incremental reads'''
+        b = HistoryBuffer(10)
+        for i in xrange(7):
+            b.append(i, i)
+        idx = b.nextIndex()
+        b.append(7, 7)
+        b.append(8, 8)
+        first, t, v = b.since(idx)
+        self.assertEqual(first, idx)
+        self.assertEqual(list(v), [7, 8])
+        # records no longer available are skipped
+        for i in xrange(9, 30):
+            b.append(i, i)
+        first, t, v = b.since(idx)
+        self.assertEqual(first, b.firstIndex())
+        self.assertEqual(len(t), 10)
+
+    def test_views(self):
+        '''check that the contents are views of the internal arrays'''
+        b = HistoryBuffer(4)
+        for i in xrange(3):
+            b.append(i, i)
+        v1 = b.values()
+        v2 = b.values()
+        self.assertTrue(numpy.may_share_memory(v1, v2))
+
+    def test_reshape(self):
+        '''check that appending a value with a new shape resets the buffer'''
+        b = HistoryBuffer(4)
+        b.append(0, 1.)
+        b.append(1, [1., 2.])
+        self.assertEqual(b.getShape(), (2,))
+        self.assertEqual(len(b), 1)
+        self.assertEqual(b.firstIndex(), 1)
+
+    def test_capacity(self):
+        '''check that reducing the capacity discards the oldest records'''
+        b = HistoryBuffer(10)
+        for i in xrange(10):
+            b.append(i, i)
+        b.setCapacity(3)
+        self.assertEqual(list(b.values()), [7, 8, 9])
+        b.append(10, 10)
+        self.assertEqual(list(b.values()), [8, 9, 10])
+
+
+class HistoryStoreTestCase(unittest.TestCase):
+    '''Test case for the HistoryStore class'''
+
+    name = 'test://history/store/attr'
+
+    def setUp(self):
+        self.store = HistoryStore()
+        self.v1 = self.store.subscribe(self.name, 3)
+        self.v2 = self.store.subscribe(self.name, 5)
+
+    def tearDown(self):
+        self.v1.close()
+        self.v2.close()
+        self.assertTrue(self.store.getBuffer(self.name) is None)
+
+    def test_shared(self):
+        '''check that a value received by several views is stored once'''
+        self.assertTrue(self.v1.getBuffer() is self.v2.getBuffer())
+        self.assertEqual(self.v1.getBuffer().getCapacity(), 5)
+        for i in xrange(6):
+            value = _FakeValue(i, i)
+            self.v1.append(value)
+            self.v2.append(value)
+        self.assertEqual(list(self.v1.contents()[2]), [3, 4, 5])
+        self.assertEqual(list(self.v2.contents()[2]), [1, 2, 3, 4, 5])
+
+    def test_clear(self):
+        '''check that clearing a view does not affect the others'''
+        self.v1.append(_FakeValue(0, 0))
+        self.v1.clear()
+        self.v1.append(_FakeValue(1, 1))
+        self.assertEqual(list(self.v1.contents()[2]), [1])
+        self.assertEqual(list(self.v2.contents()[2]), [0, 1])
+        self.assertEqual(self.v1.startIndex(), 1)
+
+    def test_collectedView(self):
+        '''check that the history is discarded when its views are garbage
+        collected without being closed'''
+        name = self.name + '_collected'
+        view = self.store.subscribe(name, 3)
+        view.append(_FakeValue(0, 0))
+        self.assertTrue(self.store.getBuffer(name) is not None)
+        del view
+        gc.collect()
+        self.assertTrue(self.store.getBuffer(name) is None)
+
+
+if __name__ == '__main__':
+    pass
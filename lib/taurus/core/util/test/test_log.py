@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+"""Test for taurus.core.util.log"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+from taurus.external import unittest
+from taurus.core.util.log import Logger
+
+
+class _RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class LoggerTestCase(unittest.TestCase):
+    '''Test case for the enabled level cache and the call counting of the
+    Logger class'''
+
+    def setUp(self):
+        self.logger = Logger('LoggerTestCase')
+        self.handler = _RecordingHandler()
+        self.logger.addLogHandler(self.handler)
+        self._level = Logger.getLogLevel()
+
+    def tearDown(self):
+        Logger.disableLogCallCounting()
+        self.logger.getLogObj().removeHandler(self.handler)
+        self.logger.getLogObj().setLevel(logging.NOTSET)
+        Logger.setLogLevel(self._level)
+
+    def test_setLogLevel(self):
+        '''check that the cached levels follow the log level changes'''
+        Logger.setLogLevel(Logger.Info)
+        self.logger.debug('not recorded %s', 1)
+        self.assertEqual(len(self.handler.records), 0)
+        Logger.setLogLevel(Logger.Debug)
+        self.logger.debug('recorded %s', 2)
+        self.assertEqual(len(self.handler.records), 1)
+        self.assertEqual(self.handler.records[0].getMessage(), 'recorded 2')
+        self.logger.getLogObj().setLevel(Logger.Error)
+        self.logger.warning('not recorded')
+        self.assertEqual(len(self.handler.records), 1)
+
+    def test_loggingApi(self):
+        '''check that the cached levels follow the changes of the root level
+        and of logging.disable made with the logging API'''
+        Logger.setLogLevel(Logger.Info)
+        self.logger.debug('not recorded')
+        self.assertEqual(len(self.handler.records), 0)
+        Logger.getRootLog().setLevel(logging.DEBUG)
+        self.logger.debug('recorded %s', 1)
+        self.assertEqual(len(self.handler.records), 1)
+        logging.disable(logging.INFO)
+        try:
+            self.logger.info('not recorded')
+            self.assertEqual(len(self.handler.records), 1)
+        finally:
+            logging.disable(logging.NOTSET)
+        self.logger.info('recorded %s', 2)
+        self.assertEqual(len(self.handler.records), 2)
+
+    def test_counting(self):
+        '''check that the log calls are counted per call site'''
+        Logger.setLogLevel(Logger.Info)
+        Logger.enableLogCallCounting()
+        for i in xrange(3):
+            self.logger.debug('not recorded %s', i)
+            self.logger.info('recorded %s', i)
+        counter = Logger.getLogCallCounter()
+        counts = sorted(counter.getCounts().items())
+        self.assertEqual([v for k, v in counts], [(3, 0), (3, 3)])
+        self.assertEqual([k[3] for k, v in counts],
+                         [Logger.Debug, Logger.Info])
+        self.assertEqual(counter.getTotal(), (6, 3))
+        self.assertEqual(len(self.handler.records), 3)
+        Logger.disableLogCallCounting()
+        self.assertTrue(Logger.getLogCallCounter() is None)
+
+
+if __name__ == '__main__':
+    pass
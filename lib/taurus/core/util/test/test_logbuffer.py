@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+"""Test for taurus.core.util.logbuffer"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+from taurus.external import unittest
+from taurus.test import insertTest
+from taurus.core.util.logbuffer import LogRecordBuffer
+
+
+def _record(i, name='a', level=logging.INFO, created=None):
+    r = logging.LogRecord(name, level, __file__, i, 'message %d %s',
+                          (i, 'x'), None)
+    if created is not None:
+        r.created = created
+    return r
+
+
+@insertTest(helper_name='checkRing', capacity=10, n=5, batch=1)
+@insertTest(helper_name='checkRing', capacity=10, n=25, batch=3)
+@insertTest(helper_name='checkRing', capacity=3000, n=5000, batch=700)
+@insertTest(helper_name='checkRing', capacity=10, n=25, batch=25)
+class LogRecordBufferTestCase(unittest.TestCase):
+    '''Test case for the LogRecordBuffer class'''
+
+    def checkRing(self, capacity=10, n=25, batch=1):
+        '''check that the newest records are kept'''
+        b = LogRecordBuffer(capacity)
+        records = [_record(i) for i in xrange(n)]
+        discarded = 0
+        for i in xrange(0, n, batch):
+            discarded += b.extend(records[i:i + batch])
+        self.assertEqual(len(b), min(n, capacity))
+        self.assertEqual(discarded, max(0, n - capacity))
+        self.assertEqual(b.firstSeq(), n - len(b))
+        for seq in b.seqs():
+            self.assertEqual(b.getMessage(seq), records[seq].getMessage())
+        self.assertRaises(IndexError, b.getMessage, b.firstSeq() - 1)
+
+    def test_record(self):
+        '''check that the records are rebuilt from the stored fields'''
+        b = LogRecordBuffer()
+        r = _record(7, name='foo', level=logging.ERROR)
+        b.append(r)
+        r2 = b.getRecord(0)
+        for attr in ('name', 'levelno', 'levelname', 'created', 'lineno',
+                     'thread', 'process', 'funcName'):
+            self.assertEqual(getattr(r2, attr), getattr(r, attr))
+        self.assertEqual(r2.getMessage(), r.getMessage())
+
+    def test_argsort(self):
+        '''check the sorted views'''
+        b = LogRecordBuffer()
+        b.extend([_record(0, 'b', logging.INFO, 3.),
+                  _record(1, 'a', logging.ERROR, 1.),
+                  _record(2, 'c', logging.INFO, 2.),
+                  _record(3, 'a', logging.DEBUG, 4.)])
+        self.assertEqual(list(b.argsort('created')), [1, 2, 0, 3])
+        self.assertEqual(list(b.argsort('levelno')), [3, 0, 2, 1])
+        self.assertEqual(list(b.argsort('name')), [1, 3, 0, 2])
+        self.assertEqual(list(b.argsort('origin')), [1, 3, 0, 2])
+        self.assertEqual(list(b.argsort('name', b.seqs()[2:])), [3, 2])
+        self.assertRaises(ValueError, b.argsort, 'foo')
+
+    def test_compact(self):
+        '''check that the interned values of the discarded records are
+        discarded too'''
+        b = LogRecordBuffer(10)
+        n = 3 * LogRecordBuffer.MinCompactSize
+        for i in xrange(n):
+            b.append(_record(i, name='name%d' % i))
+        self.assertTrue(len(b._names) <= LogRecordBuffer.MinCompactSize + 1)
+        self.assertEqual([b.getName(seq) for seq in b.seqs()],
+                         ['name%d' % i for i in xrange(n - 10, n)])
+        self.assertEqual(list(b.argsort('name')), range(n - 10, n))
+        b.clear()
+        self.assertEqual(len(b._names), 0)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.core.util.spool"""
+
+__docformat__ = 'restructuredtext'
+
+import os
+import shutil
+import tempfile
+
+import numpy
+from taurus.external import unittest
+from taurus.core.util.spool import SpoolFile, HistorySpool
+
+
+class SpoolFileTestCase(unittest.TestCase):
+    '''Test case for the SpoolFile class'''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fileName = os.path.join(self.tmpdir, 'test.spool')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_range(self):
+        '''check the records of a time range (using the time index)'''
+        f = SpoolFile(self.fileName, shape=(2,))
+        for i in xrange(3 * SpoolFile.IndexStep + 5):
+            f.append(i, (i, -i))
+        t, v = f.getRange(1000.5, 2050)
+        self.assertEqual(t[0], 1001)
+        self.assertEqual(t[-1], 2049)
+        self.assertEqual(v.shape, (1049, 2))
+        self.assertTrue(numpy.all(v[:, 0] == t))
+        self.assertTrue(isinstance(t, numpy.memmap))
+
+    def test_order(self):
+        '''check that records older than the last one are rejected'''
+        f = SpoolFile(self.fileName, shape=())
+        self.assertTrue(f.append(1, 1))
+        self.assertFalse(f.append(0, 0))
+        self.assertEqual(len(f), 1)
+
+    def test_reopen(self):
+        '''check that the records are kept when reopening the file'''
+        f = SpoolFile(self.fileName, shape=(), dtype='int32')
+        for i in xrange(10):
+            f.append(i, i)
+        f.close()
+        with open(self.fileName, 'ab') as fd:
+            fd.write('x')  # an incomplete record
+        f = SpoolFile(self.fileName)
+        self.assertEqual(len(f), 10)
+        self.assertEqual(f.timeRange(), (0, 9))
+        f.append(10, 10)
+        t, v = f.getRange(9)
+        self.assertEqual(list(v), [9, 10])
+        self.assertEqual(v.dtype, numpy.dtype('int32'))
+
+    def test_flush(self):
+        '''check that the records are flushed in batches and before reading'''
+        f = SpoolFile(self.fileName, shape=())
+        f.FlushPeriod = 60
+        for i in xrange(3):
+            f.append(i, i)
+        recordSize = (f.getSize() - SpoolFile.HeaderSize) // 3
+        self.assertEqual(os.path.getsize(self.fileName),
+                         SpoolFile.HeaderSize + recordSize)
+        t, v = f.getRange()
+        self.assertEqual(list(t), [0, 1, 2])
+        self.assertEqual(os.path.getsize(self.fileName), f.getSize())
+        f.close()
+
+
+class HistorySpoolTestCase(unittest.TestCase):
+    '''Test case for the HistorySpool class'''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_segments(self):
+        '''check reading a time range spanning several segments'''
+        spool = HistorySpool(self.tmpdir, segmentDuration=10, maxAge=None)
+        for i in xrange(100):
+            spool.append(float(i), i)
+        self.assertEqual(len(spool.getSegments()), 10)
+        t, v = spool.getRange(15, 42)
+        self.assertEqual(list(t), range(15, 42))
+        spool.close()
+        # the segments are found when reopening the spool
+        spool = HistorySpool(self.tmpdir, segmentDuration=10, maxAge=None)
+        self.assertEqual(spool.timeRange(), (0, 99))
+        spool.append(100., 100)
+        self.assertEqual(len(spool.getSegments()), 11)
+
+    def test_retention(self):
+        '''check that old segments are deleted'''
+        spool = HistorySpool(self.tmpdir, segmentDuration=10, maxAge=30)
+        for i in xrange(100):
+            spool.append(float(i), i)
+        first, last = spool.timeRange()
+        self.assertEqual(last, 99)
+        # (segments are deleted when a new one starts, and only once all
+        # their records are older than maxAge)
+        self.assertTrue(40 < first <= 60)
+        self.assertEqual(len(os.listdir(self.tmpdir)),
+                         len(spool.getSegments()))
+
+    def test_shape(self):
+        '''check that a change in the value shape starts a new segment'''
+        spool = HistorySpool(self.tmpdir, segmentDuration=10, maxAge=None)
+        spool.append(0., 1.)
+        spool.append(1., [1., 2.])
+        self.assertEqual(len(spool.getSegments()), 2)
+        t, v = spool.getRange()
+        self.assertEqual(list(t), [1.])
+        self.assertEqual(v.shape, (1, 2))
+
+    def test_lock(self):
+        '''check that a spool directory cannot be opened twice'''
+        from taurus.core.util import spool as spoolModule
+        if spoolModule.fcntl is None:
+            return  # locking not supported in this platform
+        spool = HistorySpool(self.tmpdir, segmentDuration=10, maxAge=None)
+        spool.append(0., 0)
+        self.assertRaises(IOError, HistorySpool, self.tmpdir)
+        spool.close()
+        self.assertFalse(spool.append(1., 1))
+        spool = HistorySpool(self.tmpdir, segmentDuration=10, maxAge=None)
+        self.assertTrue(spool.append(1., 1))
+        spool.close()
+
+
+if __name__ == '__main__':
+    pass
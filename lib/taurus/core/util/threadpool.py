@@ -65,7 +65,7 @@ class ThreadPool(Logger):
                 name = "%s.W%03i" % (self.log_name, self.localThreadId)
                 new = Worker(self, name, self._daemons)
                 self.workers.append(new)
-                self.debug("Starting %s" % name)
+                self.debug("Starting %s", name)
                 new.start()
 
             # remove the old worker threads
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""
+eventcoalescer.py: This module provides the application-wide event coalescer
+used by the taurus widgets for buffering events
+"""
+
+__all__ = ["TaurusEventCoalescer"]
+
+__docformat__ = 'restructuredtext'
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from taurus.external.qt import Qt
+from taurus.core.util.log import Logger
+from taurus.core.util.singleton import Singleton
+from taurus.core.util.timer import Timer
+
+
+class _CoalescedEvents(object):
+    '''The events buffered for a component'''
+
+    def __init__(self, component, period):
+        self.ref = weakref.ref(component)
+        self.period = period
+        self.due = 0
+        self.events = OrderedDict()
+
+
+class _EventBatchDeliverer(Qt.QObject):
+    '''Lives in the Qt main thread and delivers the batches of events'''
+
+    def __init__(self):
+        Qt.QObject.__init__(self)
+        app = Qt.QCoreApplication.instance()
+        if app is not None:
+            self.moveToThread(app.thread())
+        self.connect(self, Qt.SIGNAL("eventBatch"), self.deliver)
+
+    def deliver(self, batch):
+        for component, events in batch:
+            try:
+                signaller = component.getSignaller()
+                for evt in events:
+                    signaller.emit(Qt.SIGNAL('taurusEvent'), *evt)
+            except:
+                pass  # the component may have been deleted
+
+
+class TaurusEventCoalescer(Singleton, Logger):
+    '''
+    Buffers the events of all the taurus components which use event buffering
+    (see :meth:`TaurusBaseComponent.setEventBufferPeriod`) with a single timer
+    thread.
+
+    Only the latest event of each (source, type) is kept for each component.
+    On every frame (see :meth:`setFramePeriod`), the events of all the
+    components whose buffer period has expired are sent to the Qt main thread
+    as a single batch (i.e., with a single queued signal), where they are
+    emitted as "taurusEvent" signals of each component.
+    '''
+
+    #: default period (in s) of the delivery of the batches of events
+    DefaultFramePeriod = 0.04
+
+    def __init__(self):
+        """ Initialization. Nothing to be done here for now."""
+        pass
+
+    def init(self, *args, **kwargs):
+        """Singleton instance initialization."""
+        name = self.__class__.__name__
+        self.call__init__(Logger, name)
+        self._lock = threading.Lock()
+        self._entries = weakref.WeakKeyDictionary()
+        self._dirty = set()
+        self._deliverer = _EventBatchDeliverer()
+        self._framePeriod = self.DefaultFramePeriod
+        self._timer = None
+
+    def getFramePeriod(self):
+        '''returns the period of the delivery of events
+
+        :return: (float) period in s
+        '''
+        return self._framePeriod
+
+    def setFramePeriod(self, period):
+        '''sets the period of the delivery of events. Note that it is the
+        minimum effective buffer period of the components
+
+        :param period: (float) period in s
+        '''
+        self._framePeriod = period
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+            self._startTimer()
+
+    def _startTimer(self):
+        if self._timer is None:
+            self._timer = Timer(self._framePeriod, self._tick, self,
+                                strict_timing=False)
+            self._timer.start()
+
+    def register(self, component, period):
+        '''starts buffering the events of the given component
+
+        :param component: (TaurusBaseComponent) the component
+        :param period: (float) the minimum period (in s) between
+                       deliveries of events to the component
+        '''
+        with self._lock:
+            entry = self._entries.get(component)
+            if entry is None:
+                self._entries[component] = _CoalescedEvents(component, period)
+            else:
+                entry.period = period
+        self._startTimer()
+
+    def unregister(self, component):
+        '''stops buffering the events of the given component
+
+        :param component: (TaurusBaseComponent) the component
+
+        :return: (list<tuple>) the events that were buffered (not delivered)
+        '''
+        with self._lock:
+            entry = self._entries.pop(component, None)
+            if entry is None:
+                return []
+            self._dirty.discard(entry)
+            return entry.events.values()
+
+    def post(self, component, evt_src, evt_type, evt_value):
+        '''buffers an event for the given component, replacing the previous
+        buffered event of the same source and type (if any)
+
+        :param component: (TaurusBaseComponent) the component
+        :param evt_src: (object) object that triggered the event
+        :param evt_type: (taurus.core.taurusbasetypes.TaurusEventType) type
+        :param evt_value: (object) event value
+
+        :return: (bool) False if the component is not registered
+        '''
+        with self._lock:
+            entry = self._entries.get(component)
+            if entry is None:
+                return False
+            entry.events[(evt_src, evt_type)] = evt_src, evt_type, evt_value
+            self._dirty.add(entry)
+        return True
+
+    def takeEvents(self, component):
+        '''returns (and removes from the buffer) the events buffered for the
+        given component
+
+        :param component: (TaurusBaseComponent) the component
+
+        :return: (list<tuple>) the buffered events
+        '''
+        with self._lock:
+            entry = self._entries.get(component)
+            if entry is None:
+                return []
+            events, entry.events = entry.events.values(), OrderedDict()
+            self._dirty.discard(entry)
+            return events
+
+    def _tick(self):
+        now = time.time()
+        batch = []
+        with self._lock:
+            for entry in list(self._dirty):
+                if entry.due > now:
+                    continue
+                self._dirty.discard(entry)
+                component = entry.ref()
+                if component is None:
+                    continue
+                batch.append((component, entry.events.values()))
+                entry.events = OrderedDict()
+                entry.due = now + entry.period
+        if batch:
+            self._deliverer.emit(Qt.SIGNAL("eventBatch"), batch)
@@ -33,14 +33,12 @@ __all__ = ["TaurusBaseComponent", "TaurusBaseWidget",
 __docformat__ = 'restructuredtext'
 
 import sys
-import threading
 
 from taurus.external.qt import Qt
 from taurus.external.enum import Enum
 
 import taurus
 from taurus.core.util import eventfilters
-from taurus.core.util.timer import Timer
 from taurus.core.taurusbasetypes import TaurusElementType, TaurusEventType
 from taurus.core.taurusattribute import TaurusAttribute
 from taurus.core.taurusdevice import TaurusDevice
@@ -51,6 +49,7 @@ from taurus.core.taurusoperation import WriteAttrOperation
 from taurus.core.util.eventfilters import filterEvent
 from taurus.qt.qtcore.configuration import BaseConfigurableClass
 from taurus.qt.qtcore.mimetypes import TAURUS_ATTR_MIME_TYPE, TAURUS_DEV_MIME_TYPE, TAURUS_MODEL_MIME_TYPE
+from taurus.qt.qtcore.util.eventcoalescer import TaurusEventCoalescer
 from taurus.qt.qtgui.util import ActionFactory
 
 DefaultNoneValue = "-----"
@@ -99,8 +98,7 @@ class TaurusBaseComponent(TaurusListener, BaseConfigurableClass):
         self._modelInConfig = False
         self._autoProtectOperation = True
 
-        self._bufferedEvents = {}
-        self._bufferedEventsTimer = None
+        self._eventCoalescer = None
         self.setEventBufferPeriod(self._eventBufferPeriod)
 
         if parent is not None and hasattr(parent, "_exception_listener"):
@@ -205,24 +203,28 @@ class TaurusBaseComponent(TaurusListener, BaseConfigurableClass):
     #-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-~-
 
     def setEventBufferPeriod(self, period):
-        '''Set the period at wich :meth:`fireBufferedEvents` will be called.
+        '''Set the minimum period between deliveries of the buffered events.
         If period is 0, the event buffering is disabled (i.e., events are fired
         as soon as they are received)
 
+        While buffering, only the latest event of each (source, type) is
+        kept. The events of all the buffering components are delivered by
+        the application-wide :class:`TaurusEventCoalescer`, which sends them
+        to the Qt main thread in batches (so the effective period is rounded
+        up to its frame period)
+
         :param period: (float) period in seconds for the automatic event firing.
                     period=0 will disable the event buffering.
         '''
         self._eventBufferPeriod = period
         if period == 0:
-            if self._bufferedEventsTimer is not None:
-                self._bufferedEventsTimer.stop()
-                self._bufferedEventsTimer = None
-                self.fireBufferedEvents()  # flush the buffer
+            if self._eventCoalescer is not None:
+                events = self._eventCoalescer.unregister(self)
+                self._eventCoalescer = None
+                self._emitEvents(events)  # flush the buffer
         else:
-            self._eventsBufferLock = threading.RLock()
-            self._bufferedEventsTimer = Timer(period, self.fireBufferedEvents,
-                                              self)
-            self._bufferedEventsTimer.start()
+            self._eventCoalescer = TaurusEventCoalescer()
+            self._eventCoalescer.register(self, period)
 
     def getEventBufferPeriod(self):
         '''Returns the event buffer period
@@ -269,11 +271,10 @@ class TaurusBaseComponent(TaurusListener, BaseConfigurableClass):
                          type of event
         :param evt_value: (object or None) event value
         """
-        if self._eventBufferPeriod:
+        coalescer = self._eventCoalescer
+        if coalescer is not None:
             # If we have an active event buffer delay, store the event...
-            with self._eventsBufferLock:
-                self._bufferedEvents[(evt_src, evt_type)] = (evt_src, evt_type,
-                                                             evt_value)
+            coalescer.post(self, evt_src, evt_type, evt_value)
         else:
             # if we are not buffering, directly emit the signal
             try:
@@ -285,14 +286,17 @@ class TaurusBaseComponent(TaurusListener, BaseConfigurableClass):
     def fireBufferedEvents(self):
         '''Fire all events currently buffered (and flush the buffer)
 
-        Note: this method is normally called from an event buffer timer thread
-              but it can also be called any time the buffer needs to be flushed
+        Note: the buffered events are normally delivered by the
+              :class:`TaurusEventCoalescer` but this method can be called any
+              time the buffer needs to be flushed
         '''
+        if self._eventCoalescer is not None:
+            self._emitEvents(self._eventCoalescer.takeEvents(self))
+
+    def _emitEvents(self, events):
         signaller = self.getSignaller()
-        with self._eventsBufferLock:
-            for evt in self._bufferedEvents.values():
-                signaller.emit(Qt.SIGNAL('taurusEvent'), *evt)
-            self._bufferedEvents = {}
+        for evt in events:
+            signaller.emit(Qt.SIGNAL('taurusEvent'), *evt)
 
     def filterEvent(self, evt_src=-1, evt_type=-1, evt_value=-1):
         """The event is processed by each and all filters in strict order
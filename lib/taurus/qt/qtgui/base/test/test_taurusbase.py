@@ -25,9 +25,11 @@
 
 """Unit tests for taurusbase"""
 
+import time
 
 from taurus.external import unittest
 from taurus.test import insertTest
+from taurus.core.taurusbasetypes import TaurusEventType
 from taurus.qt.qtgui.test import BaseWidgetTestCase
 from taurus.core.tango.test import TangoSchemeTestLauncher
 from taurus.qt.qtgui.container import TaurusWidget
@@ -99,3 +101,50 @@ class GetDisplayValueTestCase(TangoSchemeTestLauncher, BaseWidgetTestCase,
                (model, expected, got))
         self.assertEqual(expected, got, msg)
         self.assertMaxDeprecations(0)
+
+
+class EventBufferTestCase(BaseWidgetTestCase, unittest.TestCase):
+    """Check the event buffering of TaurusBaseComponent
+    """
+    _klass = TaurusWidget
+
+    def setUp(self):
+        BaseWidgetTestCase.setUp(self)
+        self._received = []
+        self._widget.handleEvent = self._handleEvent
+        self._widget.setModel('eval:"buffer_test"')
+
+    def tearDown(self):
+        self._widget.setEventBufferPeriod(0)
+        self._widget.setModel(None)
+
+    def _handleEvent(self, evt_src, evt_type, evt_value):
+        if evt_src == 'src':
+            self._received.append((evt_type, evt_value))
+
+    def _waitEvents(self, n, timeout=2):
+        t0 = time.time()
+        while len(self._received) < n and time.time() - t0 < timeout:
+            self._app.processEvents()
+            time.sleep(0.01)
+
+    def test_coalescing(self):
+        """Check that only the latest event of each type is delivered"""
+        self._widget.setEventBufferPeriod(0.05)
+        for i in range(10):
+            self._widget.fireEvent('src', TaurusEventType.Change, i)
+        self._widget.fireEvent('src', TaurusEventType.Config, 'cfg')
+        self._waitEvents(2)
+        self.assertEqual(self._received, [(TaurusEventType.Change, 9),
+                                          (TaurusEventType.Config, 'cfg')])
+
+    def test_flush(self):
+        """Check that disabling the buffering flushes the buffered events"""
+        self._widget.setEventBufferPeriod(10)
+        self._widget.fireEvent('src', TaurusEventType.Change, 1)
+        self._waitEvents(1)
+        self._widget.fireEvent('src', TaurusEventType.Change, 2)
+        self._widget.fireEvent('src', TaurusEventType.Change, 3)
+        self._widget.setEventBufferPeriod(0)
+        self.assertEqual(self._received, [(TaurusEventType.Change, 1),
+                                          (TaurusEventType.Change, 3)])
@@ -29,6 +29,7 @@ __all__ = ["TaurusCurveItem"]
 
 from taurus.external.qt import Qt
 from taurus.qt.qtgui.base import TaurusBaseComponent
+from taurus.qt.qtgui.util.replotscheduler import TaurusReplotScheduler
 import taurus
 from guiqwt.curve import CurveItem
 from taurus.qt.qtgui.extra_guiqwt.styles import TaurusCurveParam, TaurusTrendParam
@@ -117,7 +118,7 @@ class TaurusCurveItem(CurveItem, TaurusBaseComponent):
         self.set_data(xvalue, yvalue)
         p = self.plot()
         if p is not None:
-            p.replot()
+            TaurusReplotScheduler().requestReplot(p)
 
     def get_item_parameters(self, itemparams):
         CurveItem.get_item_parameters(self, itemparams)
@@ -247,7 +248,7 @@ class TaurusTrendItem(CurveItem, TaurusBaseComponent):
             xmin, xmax = plot.get_axis_limits(axis)
             if value > xmax or value < xmin:
                 self.getSignaller().emit(Qt.SIGNAL('scrollRequested'), plot, axis, value)
-            plot.replot()
+            TaurusReplotScheduler().requestReplot(plot)
 
     def get_item_parameters(self, itemparams):
         CurveItem.get_item_parameters(self, itemparams)
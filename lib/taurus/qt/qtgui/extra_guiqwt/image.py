@@ -33,8 +33,9 @@ __all__ = ["TaurusImageItem", "TaurusRGBImageItem", "TaurusTrend2DItem",
 from taurus.external.pint import Quantity
 from taurus.external.qt import Qt
 from taurus.qt.qtgui.base import TaurusBaseComponent
+from taurus.qt.qtgui.util.replotscheduler import TaurusReplotScheduler
 import taurus.core
-from taurus.core.util.containers import ArrayBuffer
+from taurus.core.util.history import HistoryBuffer
 
 from guiqwt.image import ImageItem, RGBImageItem, XYImageItem
 from guiqwt.image import INTERP_NEAREST, INTERP_LINEAR
@@ -89,7 +90,7 @@ class TaurusBaseImageItem(TaurusBaseComponent):
 
         if p is not None:
             p.update_colormap_axis(self)
-            p.replot()
+            TaurusReplotScheduler().requestReplot(p)
 
     def filterData(self, data):
         '''Reimplement this method if you want to pre-process
@@ -228,7 +229,13 @@ class TaurusEncodedRGBImageItem(RGBImageItem, TaurusEncodedBaseImageItem):
 
 
 class TaurusTrend2DItem(XYImageItem, TaurusBaseComponent):
-    '''A XYImageItem that is constructed by stacking 1D arrays from events from a Taurus 1D attribute'''
+    '''A XYImageItem that is constructed by stacking 1D arrays from events from a Taurus 1D attribute
+
+    The stacked arrays are kept in a :class:`HistoryBuffer` (the x values being
+    its timestamps), which stores each new array in place and provides its
+    contents without copying. The image data is a transposed view of it, so
+    the cost of an event does not depend on the size of the stack.
+    '''
 
     def __init__(self, param=None, buffersize=512, stackMode='datetime'):
         XYImageItem.__init__(self, numpy.arange(2), numpy.arange(
@@ -237,8 +244,7 @@ class TaurusTrend2DItem(XYImageItem, TaurusBaseComponent):
         self._signalGen = Qt.QObject()
         self.maxBufferSize = buffersize
         self._yValues = None
-        self._xBuffer = None
-        self._zBuffer = None
+        self._buffer = None
         self.stackMode = stackMode
         self.set_interpolation(INTERP_NEAREST)
         self.__timeOffset = None
@@ -254,16 +260,8 @@ class TaurusTrend2DItem(XYImageItem, TaurusBaseComponent):
         :param buffersize: (int) size of the stack
         '''
         self.maxBufferSize = buffersize
-        try:
-            if self._xBuffer is not None:
-                self._xBuffer.setMaxSize(buffersize)
-            if self._zBuffer is not None:
-                self._zBuffer.setMaxSize(buffersize)
-        except ValueError:
-            self.info(
-                'buffer downsizing  requested. Current contents will be discarded')
-            self._xBuffer = None
-            self._zBuffer = None
+        if self._buffer is not None:
+            self._buffer.setCapacity(buffersize)
 
     def setModel(self, model):
         # do the standard stuff
@@ -288,12 +286,8 @@ class TaurusTrend2DItem(XYImageItem, TaurusBaseComponent):
         ySize = len(evt_value.rvalue)
         if self._yValues is None:
             self._yValues = numpy.arange(ySize, dtype='d')
-        if self._xBuffer is None:
-            self._xBuffer = ArrayBuffer(numpy.zeros(
-                min(128, self.maxBufferSize), dtype='d'), maxSize=self.maxBufferSize)
-        if self._zBuffer is None:
-            self._zBuffer = ArrayBuffer(numpy.zeros(
-                (min(128, self.maxBufferSize), ySize), dtype='d'), maxSize=self.maxBufferSize)
+        if self._buffer is None:
+            self._buffer = HistoryBuffer(self.maxBufferSize, shape=(ySize,))
             return
 
         # check that new data is compatible with previous data
@@ -323,32 +317,31 @@ class TaurusTrend2DItem(XYImageItem, TaurusBaseComponent):
             try:
                 # +numpy.random.randint(0,4) #for debugging we can put a variable step
                 step = 1
-                x = self._xBuffer[-1] + step
+                x = self._buffer.timestamps()[-1] + step
             except IndexError:  # this will happen when the x buffer is empty
                 x = 0
                 plot.set_axis_title('bottom', 'Event #')
                 plot.set_axis_unit('bottom', '')
 
-        if len(self._xBuffer) and x <= self._xBuffer[-1]:
+        if len(self._buffer) and x <= self._buffer.timestamps()[-1]:
             self.info('Ignoring event (non-increasing x value)')
             return
-        self._xBuffer.append(x)
 
-        # update z
+        # update x and z
         rvalue = evt_value.rvalue
         if isinstance(evt_value.rvalue, Quantity):
             rvalue = evt_value.rvalue.magnitude
             # TODO: units should be checked for coherence with previous values
-        self._zBuffer.append(rvalue)
+        self._buffer.append(x, rvalue)
 
         # check if there is enough data to start plotting
-        if len(self._xBuffer) < 2:
+        if len(self._buffer) < 2:
             self.info('waiting for at least 2 values to start plotting')
             return
 
-        x = self._xBuffer.contents()
+        _, x, z = self._buffer.contents()
         y = self._yValues
-        z = self._zBuffer.contents().transpose()
+        z = z.transpose()  # a view of the buffer (no copy)
 
         if x.size == 2:
             plot.set_axis_limits('left', y.min(), y.max())
@@ -374,7 +367,7 @@ class TaurusTrend2DItem(XYImageItem, TaurusBaseComponent):
             if value > xmax or value < xmin:
                 self.getSignaller().emit(Qt.SIGNAL('scrollRequested'), plot, axis, value)
             plot.update_colormap_axis(self)
-            plot.replot()
+            TaurusReplotScheduler().requestReplot(plot)
 
 
 class TaurusTrend2DScanItem(TaurusTrend2DItem):
@@ -408,8 +401,7 @@ class TaurusTrend2DScanItem(TaurusTrend2DItem):
 
     def clearTrend(self):
         self._yValues = None
-        self._xBuffer = None
-        self._zBuffer = None
+        self._buffer = None
 
     def _dataDescReceived(self, datadesc):
         '''prepares the plot according to the info in the datadesc dictionary'''
@@ -467,26 +459,21 @@ class TaurusTrend2DScanItem(TaurusTrend2DItem):
         # initialization
         if self._yValues is None:
             self._yValues = numpy.arange(chval.size, dtype='d')
-        if self._xBuffer is None:
-            self._xBuffer = ArrayBuffer(numpy.zeros(
-                min(16, self.maxBufferSize), dtype='d'), maxSize=self.maxBufferSize)
-        if self._zBuffer is None:
-            self._zBuffer = ArrayBuffer(numpy.zeros(
-                (min(16, self.maxBufferSize), chval.size), dtype='d'), maxSize=self.maxBufferSize)
-
-        # update x
-        self._xBuffer.append(xval)
-        # update z
-        self._zBuffer.append(chval)
+        if self._buffer is None:
+            self._buffer = HistoryBuffer(self.maxBufferSize,
+                                         shape=(chval.size,))
+
+        # update x and z
+        self._buffer.append(xval, chval)
 
         # check if there is enough data to start plotting
-        if len(self._xBuffer) < 2:
+        if len(self._buffer) < 2:
             self.info('waiting for at least 2 values to start plotting')
             return
 
-        x = self._xBuffer.contents()
+        _, x, z = self._buffer.contents()
         y = self._yValues
-        z = self._zBuffer.contents().transpose()
+        z = z.transpose()  # a view of the buffer (no copy)
 
         # update the plot data
         lut_range = self.get_lut_range()  # this is the range of the z axis (color scale)
@@ -506,7 +493,7 @@ class TaurusTrend2DScanItem(TaurusTrend2DItem):
             if value > xmax or value < xmin:
                 self.getSignaller().emit(Qt.SIGNAL('scrollRequested'), plot, axis, value)
             plot.update_colormap_axis(self)
-            plot.replot()
+            TaurusReplotScheduler().requestReplot(plot)
 
     def connectWithQDoor(self, doorname):
         '''connects this TaurusTrend2DScanItem to a QDoor
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Benchmark for the stacking of spectra in
+taurus.qt.qtgui.extra_guiqwt.TaurusTrend2DItem
+
+The cost per event (once the stack is full) is measured for several stack
+depths. For reference, the cost of stacking the same spectra in an
+:class:`ArrayBuffer` (which shifts its whole contents on every append once
+it is full) is also measured.
+
+Usage::
+
+    python bench_trend2d.py [channels [depth1 [depth2 ...]]]
+"""
+
+__docformat__ = 'restructuredtext'
+
+import sys
+import numpy
+from taurus.external.qt import Qt
+from taurus.core.taurusbasetypes import TaurusEventType
+from taurus.core.util.containers import ArrayBuffer
+from taurus.test import benchmark, printBenchmark
+
+DEPTHS = (64, 512, 4096)
+
+
+class _FakeTime(object):
+
+    def __init__(self, t):
+        self._t = t
+
+    def totime(self):
+        return self._t
+
+
+class _FakeValue(object):
+    '''a minimal TaurusAttrValue-like object with a spectrum rvalue'''
+
+    def __init__(self, rvalue, t=0.):
+        self.rvalue = rvalue
+        self.time = _FakeTime(t)
+
+
+def benchItem(plot, channels, depth):
+    '''returns the time per event of a full TaurusTrend2DItem'''
+    from taurus.qt.qtgui.extra_guiqwt.image import TaurusTrend2DItem
+    item = TaurusTrend2DItem(buffersize=depth, stackMode='event')
+    plot.add_item(item)
+    value = _FakeValue(numpy.random.random(channels))
+    for _ in xrange(depth + 1):
+        item.handleEvent(None, TaurusEventType.Change, value)
+    t = benchmark(item.handleEvent, (None, TaurusEventType.Change, value))
+    plot.del_item(item)
+    return t
+
+
+def benchArrayBuffer(channels, depth):
+    '''returns the time per append of a spectrum to a full ArrayBuffer'''
+    buf = ArrayBuffer(numpy.zeros((depth, channels)), maxSize=depth)
+    spectrum = numpy.random.random(channels)
+    for _ in xrange(depth):
+        buf.append(spectrum)
+    return benchmark(buf.append, (spectrum,))
+
+
+def main(channels=2048, depths=DEPTHS):
+    from guiqwt.plot import ImageDialog
+    app = Qt.QApplication.instance() or Qt.QApplication([])
+    win = ImageDialog(edit=False, toolbar=False)
+    plot = win.get_plot()
+    results = []
+    for depth in depths:
+        results.append(('TaurusTrend2DItem (depth=%i)' % depth,
+                        benchItem(plot, channels, depth)))
+        results.append(('ArrayBuffer.append (depth=%i)' % depth,
+                        benchArrayBuffer(channels, depth)))
+    printBenchmark(results, title='Stacking of %i-channel spectra' % channels)
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    if len(args) > 1:
+        main(args[0], args[1:])
+    else:
+        main(*args)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Benchmark for the hit-testing and name lookups of the items of a
+synoptic (:class:`taurus.qt.qtgui.graphic.TaurusGraphicsScene`)
+
+A JDraw file with a grid of named rectangles is generated and parsed, and
+then getItemByPosition (at random positions) and getItemByName (with exact
+names and with patterns) are measured. For reference, the cost of testing
+every named item (i.e., hit-testing without the index of the scene) is also
+measured.
+
+Usage::
+
+    python bench_jdraw.py [nitems]
+"""
+
+__docformat__ = 'restructuredtext'
+
+import os
+import sys
+import random
+import tempfile
+from taurus.external.qt import Qt
+from taurus.test import benchmark, printBenchmark
+
+#: size (and spacing) of the rectangles
+CELL = 20
+
+
+def writeJDrawFile(fname, nitems):
+    '''writes a JDraw file with a grid of nitems named rectangles
+
+    :return: (int) number of columns of the grid
+    '''
+    ncols = int(nitems ** .5) or 1
+    f = open(fname, 'w')
+    f.write('JDFile v11 {\n  Global {\n  }\n')
+    for i in xrange(nitems):
+        x, y = (i % ncols) * CELL, (i // ncols) * CELL
+        f.write('  JDRectangle {\n'
+                '    summit:%i,%i,%i,%i\n'
+                '    origin:%i,%i\n'
+                '    background:204,204,204\n'
+                '    fillStyle:1\n'
+                '    name:"Rect%05i"\n'
+                '  }\n' % (x, y, x + CELL - 2, y + CELL - 2,
+                           x + CELL / 2, y + CELL / 2, i))
+    f.write('}\n')
+    f.close()
+    return ncols
+
+
+def linearScan(scene, pos):
+    '''hit-testing by testing every named item (for reference)'''
+    items = [i for v in scene._itemnames.values() for i in v
+             if i.contains(pos)]
+    return max(items, key=lambda i: i.zValue()) if items else None
+
+
+def main(nitems=10000):
+    from taurus.qt.qtgui.graphic.jdraw import jdraw_parser
+    from taurus.qt.qtgui.graphic.jdraw.jdraw import TaurusJDrawGraphicsFactory
+    app = Qt.QApplication.instance() or Qt.QApplication([])
+    fd, fname = tempfile.mkstemp(suffix='.jdw')
+    os.close(fd)
+    try:
+        ncols = writeJDrawFile(fname, nitems)
+        factory = TaurusJDrawGraphicsFactory(None, delayed=True)
+        scene = jdraw_parser.parse(fname, factory)
+    finally:
+        os.remove(fname)
+    nrows = (nitems + ncols - 1) // ncols
+    points = [(random.uniform(0, ncols * CELL), random.uniform(0, nrows * CELL))
+              for _ in xrange(100)]
+
+    def byPosition():
+        for x, y in points:
+            scene.getItemByPosition(x, y)
+
+    def byScan():
+        for x, y in points:
+            linearScan(scene, Qt.QPointF(x, y))
+
+    names = ['Rect%05i' % random.randrange(nitems) for _ in xrange(100)]
+
+    def byName():
+        for name in names:
+            scene.getItemByName(name)
+
+    def byPattern():
+        for name in names:
+            scene.getItemByName(name[:-1] + '.*')
+
+    n = len(points)
+    results = [('getItemByPosition', benchmark(byPosition) / n),
+               ('hit-testing every named item', benchmark(byScan) / n),
+               ('getItemByName (exact)', benchmark(byName) / n),
+               ('getItemByName (pattern)', benchmark(byPattern) / n),
+               ]
+    printBenchmark(results, title='Synoptic with %i items' % nitems)
+    # stop the update thread of the scene
+    scene.getQueue().put('exit')
+    scene.updateThread.wait()
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -32,10 +32,12 @@ __docformat__ = 'restructuredtext'
 
 import re
 import os
+import bisect
 import subprocess
 import traceback
 import operator
 import types
+from collections import defaultdict
 
 import Queue
 
@@ -155,6 +157,12 @@ class TaurusGraphicsScene(Qt.QGraphicsScene):
     ANY_ATTRIBUTE_SELECTS_DEVICE = True
     TRACE_ALL = False
 
+    # attribute names accepted by getItemByName when selecting a device
+    _ALNUM = '(?:[a-zA-Z0-9-_\*]|(?:\.\*))(?:[a-zA-Z0-9-_\*]|(?:\.\*))*'
+    _CHILD_NAME_RE = re.compile('^(.*)/%s$' % _ALNUM)
+    # characters which make getItemByName use the name as a regexp
+    _PATTERN_CHARS_RE = re.compile(r'[*?+\[\](){}|^$\\]')
+
     def __init__(self, parent=None, strt=True):
         name = self.__class__.__name__
         # self.call__init__(Logger, name, parent) #Inheriting from Logger
@@ -163,6 +171,11 @@ class TaurusGraphicsScene(Qt.QGraphicsScene):
         self.updateQueue = None
         self.updateThread = None
         self._itemnames = CaselessDefaultDict(lambda k: set())
+        # index of the item names for getItemByName: names of the children
+        # (e.g. attributes) of each name (e.g. device) and sorted names
+        self._itemchildren = defaultdict(set)
+        self._sortedItemNames = None
+        self._nameditems = set()
         self._selection = []
         self._selectedItems = []
         self._selectionStyle = SynopticSelectionStyle.OUTLINE
@@ -287,12 +300,22 @@ class TaurusGraphicsScene(Qt.QGraphicsScene):
         except:
             self.warning(traceback.format_exc())
 
+    def _addItemName(self, name, item):
+        """registers the item in the index of names used by getItemByName"""
+        if name not in self._itemnames:
+            self._sortedItemNames = None
+            m = self._CHILD_NAME_RE.match(name)
+            if m is not None:
+                self._itemchildren[m.group(1)].add(name)
+        self._itemnames[name].add(item)
+        self._nameditems.add(item)
+
     def addItem(self, item):
         # self.debug('addItem(%s)'%item)
         def expand(i):
             name = str(getattr(i, '_name', '')).lower()
             if name:
-                self._itemnames[name].add(i)
+                self._addItemName(name, i)
                 #self.debug('addItem(%s): %s'%(name,i))
             if isinstance(i, Qt.QGraphicsItemGroup):
                 for j in i.childItems():
@@ -304,7 +327,7 @@ class TaurusGraphicsScene(Qt.QGraphicsScene):
         self.debug('addWidget(%s)' % item)
         name = str(getattr(item, '_name', '')).lower()
         if name:
-            self._itemnames[name].add(item)
+            self._addItemName(name, item)
         if flags is None:
             Qt.QGraphicsScene.addWidget(self, item)
         else:
@@ -317,34 +340,85 @@ class TaurusGraphicsScene(Qt.QGraphicsScene):
         :param strict: (bool or None) controls whether full_name (strict=True) or only device name (False) must match
 
         :return: (list) items
+
+        .. note:: names without regexp special characters (other than ".") are
+                  looked up in an index. Otherwise they are used as a regexp
+                  to be matched against the names of the items
         """
         strict = (
             not self.ANY_ATTRIBUTE_SELECTS_DEVICE) if strict is None else strict
-        alnum = '(?:[a-zA-Z0-9-_\*]|(?:\.\*))(?:[a-zA-Z0-9-_\*]|(?:\.\*))*'
         target = str(item_name).strip().split()[0].lower().replace(
             '/state', '')  # If it has spaces only the first word is used
         # Device names should match also its attributes or only state?
         if not strict and TangoAttributeNameValidator().getUriGroups(target):
             target = target.rsplit('/', 1)[0]
-        if TangoDeviceNameValidator().getUriGroups(target):
+        isDevice = bool(TangoDeviceNameValidator().getUriGroups(target))
+
+        if not self._PATTERN_CHARS_RE.search(target):
+            names = [target]
+            if isDevice:
+                if strict:
+                    names.append(target + '/state')
+                else:
+                    names.extend(self._itemchildren.get(target, ()))
+            result = []
+            for k in names:
+                items = self._itemnames.get(k)
+                if items:
+                    result.extend(items)
+            return result
+
+        if isDevice:
             if strict:
                 target += '(/state)?'
             else:
-                target += '(/' + alnum + ')?'
+                target += '(/' + self._ALNUM + ')?'
         if not target.endswith('$'):
             target += '$'
+        regexp = re.compile(target)
         result = []
-        for k in self._itemnames.keys():
-            if re.match(target.lower(), k.lower()):
+        for k in self._getItemNamesWithPrefix(self._literalPrefix(target)):
+            if regexp.match(k):
                 #self.debug('getItemByName(%s): _itemnames[%s]: %s'%(target,k,self._itemnames[k]))
                 result.extend(self._itemnames[k])
         return result
 
+    def _literalPrefix(self, pattern):
+        """returns the literal prefix that all the strings matching the given
+        regexp must have"""
+        if '|' in pattern:
+            return ''
+        m = re.match(r'[^.*?+\[\](){}|^$\\]*', pattern)
+        prefix = m.group()
+        if pattern[len(prefix):len(prefix) + 1] in ('*', '?', '{'):
+            prefix = prefix[:-1]  # the last character is optional
+        return prefix
+
+    def _getItemNamesWithPrefix(self, prefix):
+        """returns the (sorted) item names starting with the given prefix"""
+        if self._sortedItemNames is None:
+            self._sortedItemNames = sorted(self._itemnames.keys())
+        names = self._sortedItemNames
+        i = bisect.bisect_left(names, prefix)
+        result = []
+        while i < len(names) and names[i].startswith(prefix):
+            result.append(names[i])
+            i += 1
+        return result
+
     def getItemByPosition(self, x, y):
-        """ This method will try first with named objects; if failed then with itemAt """
+        """ This method will try first with named objects; if failed then with itemAt
+
+        The items at the given position are obtained from the item index of
+        the scene (a BSP tree that Qt keeps updated when items move), so the
+        cost does not grow linearly with the number of items.
+        """
         pos = Qt.QPointF(x, y)
         itemsAtPos = []
-        for z, o in sorted((i.zValue(), i) for v in self._itemnames.values() for i in v if i.contains(pos) or i.isUnderMouse()):
+        # items() returns the items in descending stacking order
+        for o in reversed(self.items(pos)):
+            if o not in self._nameditems:
+                continue
             if not hasattr(o, 'getExtensions'):
                 self.debug(
                     'getItemByPosition(%d,%d): adding Qt primitive %s' % (x, y, o))
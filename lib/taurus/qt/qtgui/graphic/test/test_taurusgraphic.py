@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.qt.qtgui.graphic.taurusgraphic"""
+
+__docformat__ = 'restructuredtext'
+
+import re
+
+from taurus.external import unittest
+from taurus.external.qt import Qt
+from taurus.test import insertTest
+from taurus.core.tango.tangovalidator import (TangoDeviceNameValidator,
+                                              TangoAttributeNameValidator)
+from taurus.qt.qtgui.test import BaseWidgetTestCase
+from taurus.qt.qtgui.graphic.taurusgraphic import TaurusGraphicsScene
+
+
+_NAMES = ['sys/tg_test/1', 'sys/tg_test/1/state',
+          'sys/tg_test/1/double_scalar', 'sys/tg_test/1/ampli',
+          'sys/tg_test/10', 'sys/tg_test/10/state',
+          'sys/tg_test/10/long_scalar', 'sys/database/2',
+          'sys/database/2/state', 'tango://host:10000/sys/tg_test/1/ampli',
+          'label_1', 'label_10']
+
+
+def _getItemByName(scene, item_name, strict):
+    '''reference implementation of getItemByName: the item names are
+    scanned and matched against a regexp'''
+    alnum = '(?:[a-zA-Z0-9-_\*]|(?:\.\*))(?:[a-zA-Z0-9-_\*]|(?:\.\*))*'
+    target = str(item_name).strip().split()[0].lower().replace('/state', '')
+    if not strict and TangoAttributeNameValidator().getUriGroups(target):
+        target = target.rsplit('/', 1)[0]
+    if TangoDeviceNameValidator().getUriGroups(target):
+        if strict:
+            target += '(/state)?'
+        else:
+            target += '(/' + alnum + ')?'
+    if not target.endswith('$'):
+        target += '$'
+    result = []
+    for k in scene._itemnames.keys():
+        if re.match(target.lower(), k.lower()):
+            result.extend(scene._itemnames[k])
+    return result
+
+
+class _NamedItem(Qt.QGraphicsRectItem):
+
+    def __init__(self, name):
+        Qt.QGraphicsRectItem.__init__(self)
+        self._name = name
+
+
+@insertTest(helper_name='checkItemByName', name='sys/tg_test/1')
+@insertTest(helper_name='checkItemByName', name='SYS/TG_TEST/1')
+@insertTest(helper_name='checkItemByName', name='sys/tg_test/1/state')
+@insertTest(helper_name='checkItemByName', name='sys/tg_test/1/ampli')
+@insertTest(helper_name='checkItemByName', name='sys/tg_test/10 (label)')
+@insertTest(helper_name='checkItemByName', name='label_1')
+@insertTest(helper_name='checkItemByName', name='sys/unknown/1')
+@insertTest(helper_name='checkItemByName', name='sys/tg_test/.*')
+@insertTest(helper_name='checkItemByName', name='sys/tg_test/1.*')
+@insertTest(helper_name='checkItemByName', name='label_1?')
+@insertTest(helper_name='checkItemByName', name='.*/ampli')
+@insertTest(helper_name='checkItemByName', name='sys/(tg_test|database)/.*')
+@insertTest(helper_name='checkItemByName', name='label_1|sys/database/2')
+class TaurusGraphicsSceneTestCase(BaseWidgetTestCase, unittest.TestCase):
+    '''Test case for the item lookup of TaurusGraphicsScene'''
+    _klass = TaurusGraphicsScene
+    initkwargs = {'strt': False}
+
+    def setUp(self):
+        BaseWidgetTestCase.setUp(self)
+        for name in _NAMES:
+            self._widget.addItem(_NamedItem(name))
+        # an item group: the names of its children are registered too
+        group = Qt.QGraphicsItemGroup()
+        group._name = 'sys/database/2/state'
+        group.addToGroup(_NamedItem('label_10'))
+        self._widget.addItem(group)
+
+    def checkItemByName(self, name=None):
+        '''check that getItemByName finds the same items as the reference
+        (regexp scan) implementation'''
+        scene = self._widget
+        for strict in (True, False):
+            got = scene.getItemByName(name, strict=strict)
+            expected = _getItemByName(scene, name, strict)
+            self.assertEqual(len(got), len(set(got)))
+            self.assertEqual(set(got), set(expected),
+                             'getItemByName(%r, strict=%s): %s != %s' %
+                             (name, strict, sorted(i._name for i in got),
+                              sorted(i._name for i in expected)))
+
+
+if __name__ == '__main__':
+    pass
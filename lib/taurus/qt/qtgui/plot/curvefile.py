@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+"""
+curvefile.py: Binary files for exporting and importing the data of curves
+
+Two formats are supported:
+
+- HDF5 (``.h5``, ``.hdf5``), if h5py is installed. Each curve is stored in a
+  group (``curve0``, ``curve1``,...) with its name as an attribute and two
+  contiguous datasets: ``x`` and ``y``.
+- NumPy (``.npz``), an uncompressed zip of ``.npy`` files: ``names.npy`` and
+  ``x0.npy``, ``y0.npy``, ``x1.npy``,...
+
+In both cases the x values (typically, timestamps) are stored as float64 and
+the y values keep their dtype. The data is written in chunks, so that no
+full-size temporary copies of the curves are made. When importing, the data
+is memory-mapped from the file if possible (and read in chunks otherwise).
+"""
+__all__ = ["HDF5_SUPPORTED", "getFormats", "exportCurves", "importCurves"]
+
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+
+import numpy
+from numpy.lib import format as npformat
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+#: whether the HDF5 format is supported (i.e., whether h5py is installed)
+HDF5_SUPPORTED = h5py is not None
+
+#: number of points written (or read) at once
+CHUNK_SIZE = 1 << 20
+
+#: dtype used for storing the x values
+X_DTYPE = numpy.dtype('<f8')
+
+_HDF5_EXTENSIONS = ('.h5', '.hdf5')
+
+
+def getFormats():
+    '''returns the supported file formats (the preferred one first)
+
+    :return: (list<tuple<str,str>>) list of (file dialog filter, extension)
+    '''
+    formats = []
+    if HDF5_SUPPORTED:
+        formats.append(('HDF5 file (*.h5 *.hdf5)', '.h5'))
+    formats.append(('NumPy file (*.npz)', '.npz'))
+    return formats
+
+
+def _isHDF5(fileName):
+    return os.path.splitext(fileName)[1].lower() in _HDF5_EXTENSIONS
+
+
+def _dtypes(x, y):
+    '''returns the dtypes for storing the given x and y values'''
+    ydtype = getattr(y, 'dtype', None)
+    if ydtype is None:
+        ydtype = numpy.asarray(y[:1]).dtype
+    return X_DTYPE, ydtype
+
+
+def _chunks(a, dtype, chunkSize):
+    '''yields (start, chunk) for consecutive chunks of a converted to dtype'''
+    for start in xrange(0, len(a), chunkSize):
+        yield start, numpy.asarray(a[start:start + chunkSize], dtype=dtype)
+
+
+def exportCurves(fileName, curves, chunkSize=CHUNK_SIZE):
+    '''writes the data of the given curves to a binary file. The format is
+    chosen by the extension of the file name (HDF5 for ".h5" and ".hdf5",
+    NumPy's npz otherwise)
+
+    :param fileName: (str) name of the file (overwritten if it exists)
+    :param curves: (sequence<tuple>) sequence of (name, x, y) tuples, where x
+                   and y are sequences (typically, arrays) of the same length
+    :param chunkSize: (int) maximum number of points written at once
+    '''
+    for name, x, y in curves:
+        if len(x) != len(y):
+            raise ValueError('x and y of curve "%s" differ in length' % name)
+    if _isHDF5(fileName):
+        if not HDF5_SUPPORTED:
+            raise ValueError('HDF5 files are not supported (h5py not found)')
+        _exportHDF5(fileName, curves, chunkSize)
+    else:
+        _exportNpz(fileName, curves, chunkSize)
+
+
+def _exportHDF5(fileName, curves, chunkSize):
+    with h5py.File(fileName, 'w') as f:
+        for i, (name, x, y) in enumerate(curves):
+            group = f.create_group('curve%i' % i)
+            group.attrs['name'] = str(name)
+            for key, a, dtype in zip('xy', (x, y), _dtypes(x, y)):
+                # contiguous (not chunked) datasets can be memory-mapped
+                ds = group.create_dataset(key, shape=(len(a),), dtype=dtype)
+                for start, chunk in _chunks(a, dtype, chunkSize):
+                    ds[start:start + len(chunk)] = chunk
+
+
+def _writeNpy(f, a, dtype, chunkSize):
+    '''writes a as a 1D .npy file without converting it as a whole'''
+    header = {'descr': npformat.dtype_to_descr(dtype),
+              'fortran_order': False, 'shape': (len(a),)}
+    npformat.write_array_header_1_0(f, header)
+    for _, chunk in _chunks(a, dtype, chunkSize):
+        chunk.tofile(f)
+
+
+def _exportNpz(fileName, curves, chunkSize):
+    tmpdir = tempfile.mkdtemp(prefix='taurus-')
+    try:
+        zf = zipfile.ZipFile(fileName, 'w', zipfile.ZIP_STORED,
+                             allowZip64=True)
+        try:
+            names = numpy.array([str(name) for name, _, _ in curves])
+            arrays = [('names', names, names.dtype)]
+            for i, (name, x, y) in enumerate(curves):
+                xdtype, ydtype = _dtypes(x, y)
+                arrays += [('x%i' % i, x, xdtype), ('y%i' % i, y, ydtype)]
+            tmpname = os.path.join(tmpdir, 'array.npy')
+            for key, a, dtype in arrays:
+                # each array is streamed to a temporary file, which is then
+                # stored (uncompressed, so that it can be memory-mapped)
+                with open(tmpname, 'wb') as f:
+                    _writeNpy(f, a, dtype, chunkSize)
+                zf.write(tmpname, key + '.npy')
+        finally:
+            zf.close()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def importCurves(fileName, mmap=True, chunkSize=CHUNK_SIZE):
+    '''reads the curves stored in a file written by :func:`exportCurves`
+
+    :param fileName: (str) name of the file
+    :param mmap: (bool) if True (default), the data is memory-mapped (read
+                 only) from the file whenever possible instead of being read
+    :param chunkSize: (int) maximum number of points read at once (when not
+                      memory-mapped)
+
+    :return: (list<tuple>) list of (name, x, y) tuples, where x and y are
+             arrays (or read-only memory maps)
+    '''
+    if _isHDF5(fileName):
+        if not HDF5_SUPPORTED:
+            raise ValueError('HDF5 files are not supported (h5py not found)')
+        return _importHDF5(fileName, mmap, chunkSize)
+    return _importNpz(fileName, mmap)
+
+
+def _readDataset(fileName, ds, mmap, chunkSize):
+    if len(ds) == 0:
+        return numpy.zeros(ds.shape, dtype=ds.dtype)
+    offset = ds.id.get_offset() if mmap else None
+    if offset is not None:
+        return numpy.memmap(fileName, dtype=ds.dtype, mode='r',
+                            shape=ds.shape, offset=offset)
+    # chunked or compressed dataset (or mmap not wanted): read it in chunks
+    a = numpy.empty(ds.shape, dtype=ds.dtype)
+    for start in xrange(0, len(a), chunkSize):
+        a[start:start + chunkSize] = ds[start:start + chunkSize]
+    return a
+
+
+def _importHDF5(fileName, mmap, chunkSize):
+    curves = []
+    with h5py.File(fileName, 'r') as f:
+        i = 0
+        while 'curve%i' % i in f:
+            group = f['curve%i' % i]
+            name = group.attrs.get('name', 'curve%i' % i)
+            x = _readDataset(fileName, group['x'], mmap, chunkSize)
+            y = _readDataset(fileName, group['y'], mmap, chunkSize)
+            curves.append((name, x, y))
+            i += 1
+    return curves
+
+
+def _npzMemmap(fileName, zf, member):
+    '''returns a memory map of a .npy member of an npz file (or None if it
+    cannot be mapped, e.g. because it is compressed)'''
+    info = zf.getinfo(member)
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(fileName, 'rb') as f:
+        # the data starts after the local header of the member
+        f.seek(info.header_offset)
+        header = f.read(30)
+        nameLen, extraLen = struct.unpack('<HH', header[26:30])
+        f.seek(info.header_offset + 30 + nameLen + extraLen)
+        version = npformat.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = npformat.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = npformat.read_array_header_2_0(f)
+        offset = f.tell()
+    if dtype.hasobject:
+        return None
+    if numpy.prod(shape) == 0:
+        return numpy.zeros(shape, dtype=dtype)
+    return numpy.memmap(fileName, dtype=dtype, mode='r', shape=shape,
+                        order=fortran and 'F' or 'C', offset=offset)
+
+
+def _importNpz(fileName, mmap):
+    npz = numpy.load(fileName)
+    zf = zipfile.ZipFile(fileName)
+    try:
+        def read(key):
+            a = None
+            if mmap:
+                a = _npzMemmap(fileName, zf, key + '.npy')
+            if a is None:
+                a = npz[key]
+            return a
+        names = npz['names']
+        return [(str(name), read('x%i' % i), read('y%i' % i))
+                for i, name in enumerate(names)]
+    finally:
+        zf.close()
+        npz.close()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+"""
+curvestats.py: Incremental statistics and point search of curve data
+"""
+__all__ = ["CurveStats", "PointIndex"]
+
+import weakref
+
+import numpy
+
+from taurus.qt.qtgui.plot.decimation import isSorted
+
+
+def _base(a):
+    '''returns the array owning the memory of the given array'''
+    while isinstance(a.base, numpy.ndarray):
+        a = a.base
+    return a
+
+
+def _isIncreasing(x):
+    '''whether the given values are strictly increasing'''
+    return bool(numpy.all(x[1:] > x[:-1]))
+
+
+class CurveStats(object):
+    '''Descriptive statistics (min, max, mean, std, rms) of the y values of a
+    curve (NaN values are ignored), maintained incrementally.
+
+    The statistics are kept per block of :attr:`BlockSize` consecutive points.
+    When the data of the curve (with strictly increasing x values) is
+    updated with a view of the same buffer as before (as done by the trends,
+    which append points at the end and discard the oldest ones), only the new points (and the block of the
+    oldest ones, if partially discarded) are processed. Otherwise the
+    statistics are recomputed (in a vectorised way).
+    '''
+
+    #: number of points per block
+    BlockSize = 4096
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        '''discards the statistics'''
+        self._xref = self._yref = None
+        self._lastX = self._lastY = None
+        self._increasing = False
+        # per block: x of the first and last points, number of points,
+        # number of non-NaN values, mean, sum of squared deviations, and
+        # (x,y) of the min and max
+        self._blocks = []
+
+    def update(self, x, y):
+        '''updates the statistics for the given curve data.
+
+        :param x: (numpy.ndarray) x values
+        :param y: (numpy.ndarray) y values
+        '''
+        x, y = numpy.asarray(x), numpy.asarray(y)
+        if y.ndim != 1 or len(x) != len(y):
+            self.reset()
+            return
+        if not self._sync(x, y):
+            self.reset()
+            self._add(x, y)
+            self._increasing = _isIncreasing(x)
+        n = len(x)
+        if n:
+            self._xref = weakref.ref(_base(x))
+            self._yref = weakref.ref(_base(y))
+            self._lastX, self._lastY = x[-1], y[-1]
+
+    def _sync(self, x, y):
+        '''tries to update the blocks incrementally. Returns False if not
+        possible'''
+        if (not self._blocks or not self._increasing or self._xref is None or
+                self._xref() is not _base(x) or self._yref() is not _base(y)):
+            return False
+        n = len(x)
+        if n == 0 or not x[0] >= self._blocks[0][0] or not x[-1] >= self._lastX:
+            return False
+        # discard the blocks of the points no longer in the data
+        first = 0
+        while first < len(self._blocks) and self._blocks[first][1] < x[0]:
+            first += 1
+        del self._blocks[:first]
+        if self._blocks and self._blocks[0][0] < x[0]:
+            # the first block was partially discarded: recompute it
+            k = numpy.searchsorted(x, self._blocks[0][1], side='right')
+            self._blocks[0] = self._blockStats(x[:k], y[:k])
+        total = sum(b[2] for b in self._blocks)
+        if total > n:
+            return False
+        if total and (x[total - 1] != self._lastX or
+                      not (y[total - 1] == self._lastY or
+                           (y[total - 1] != y[total - 1] and
+                            self._lastY != self._lastY))):
+            return False
+        new = x[total:]
+        if len(new) and not (new[0] > self._lastX and _isIncreasing(new)):
+            return False
+        self._add(new, y[total:])
+        return True
+
+    def _blockStats(self, x, y):
+        x0, x1, size = x[0], x[-1], len(x)
+        valid = y == y
+        n = int(numpy.count_nonzero(valid))
+        if n == 0:
+            return [x0, x1, size, 0, 0., 0., None, None]
+        if n < size:
+            x, y = x[valid], y[valid]
+        imin, imax = y.argmin(), y.argmax()
+        mean = y.mean()
+        m2 = numpy.sum((y - mean) ** 2)
+        return [x0, x1, size, n, mean, m2, (x[imin], y[imin]),
+                (x[imax], y[imax])]
+
+    def _add(self, x, y):
+        '''adds points at the end (filling the last block first)'''
+        n = len(x)
+        if n == 0:
+            return
+        start = 0
+        if self._blocks and self._blocks[-1][2] < self.BlockSize:
+            # merge the new points with the (not full) last block
+            last = self._blocks.pop()
+            k = last[2]
+            start = min(self.BlockSize - k, n)
+            self._blocks.append(self._merge(last,
+                                            self._blockStats(x[:start],
+                                                             y[:start])))
+        for i in xrange(start, n, self.BlockSize):
+            j = i + self.BlockSize
+            self._blocks.append(self._blockStats(x[i:j], y[i:j]))
+
+    def _merge(self, a, b):
+        '''combines the statistics of two consecutive blocks'''
+        na, nb = a[3], b[3]
+        n = na + nb
+        if na == 0 or nb == 0:
+            mean, m2 = (a[4], a[5]) if nb == 0 else (b[4], b[5])
+        else:
+            delta = b[4] - a[4]
+            mean = a[4] + delta * nb / float(n)
+            m2 = a[5] + b[5] + delta * delta * na * nb / float(n)
+        pmin = a[6]
+        if pmin is None or (b[6] is not None and b[6][1] < pmin[1]):
+            pmin = b[6]
+        pmax = a[7]
+        if pmax is None or (b[7] is not None and b[7][1] > pmax[1]):
+            pmax = b[7]
+        return [a[0], b[1], a[2] + b[2], n, mean, m2, pmin, pmax]
+
+    def getCount(self):
+        '''returns the number of (non-NaN) values
+
+        :return: (int)
+        '''
+        return sum(b[3] for b in self._blocks)
+
+    def getMin(self):
+        '''returns the point with the minimum y value (the first one, if
+        repeated)
+
+        :return: (tuple<float,float> or None) (x, y)
+        '''
+        ret = None
+        for b in self._blocks:
+            if b[6] is not None and (ret is None or b[6][1] < ret[1]):
+                ret = b[6]
+        return ret
+
+    def getMax(self):
+        '''returns the point with the maximum y value (the first one, if
+        repeated)
+
+        :return: (tuple<float,float> or None) (x, y)
+        '''
+        ret = None
+        for b in self._blocks:
+            if b[7] is not None and (ret is None or b[7][1] > ret[1]):
+                ret = b[7]
+        return ret
+
+    def _moments(self):
+        counts = numpy.array([b[3] for b in self._blocks], dtype='d')
+        n = counts.sum()
+        if n == 0:
+            return 0, None, None
+        means = numpy.array([b[4] for b in self._blocks])
+        mean = numpy.dot(counts, means) / n
+        m2 = (sum(b[5] for b in self._blocks) +
+              numpy.dot(counts, (means - mean) ** 2))
+        return n, mean, m2
+
+    def getMean(self):
+        '''returns the arithmetic average of the y values
+
+        :return: (float or None)
+        '''
+        return self._moments()[1]
+
+    def getStd(self):
+        '''returns the (biased) standard deviation of the y values
+
+        :return: (float or None)
+        '''
+        n, mean, m2 = self._moments()
+        if not n:
+            return None
+        return numpy.sqrt(m2 / n)
+
+    def getRms(self):
+        '''returns the root mean square of the y values
+
+        :return: (float or None)
+        '''
+        n, mean, m2 = self._moments()
+        if not n:
+            return None
+        return numpy.sqrt(m2 / n + mean * mean)
+
+
+class PointIndex(object):
+    '''Index of the points of a curve for searching the points within a
+    rectangle in logarithmic time (plus the number of points found).
+
+    The points are searched by their x value with a binary search. If the
+    x values are not sorted (e.g., in XY curves), the search uses a sorted
+    copy of them (built once per index).
+    '''
+
+    def __init__(self, x, y):
+        '''
+        :param x: (sequence) x values
+        :param y: (sequence) y values
+        '''
+        self._x = numpy.asarray(x, dtype='d')
+        self._y = numpy.asarray(y, dtype='d')
+        if isSorted(self._x):
+            self._order = None
+            self._sortedX = self._x
+        else:
+            self._order = numpy.argsort(self._x, kind='mergesort')
+            self._sortedX = self._x[self._order]
+
+    def __len__(self):
+        return len(self._x)
+
+    def getData(self):
+        '''returns the indexed data
+
+        :return: (tuple<numpy.ndarray,numpy.ndarray>) x and y values
+        '''
+        return self._x, self._y
+
+    def find(self, xmin, xmax, ymin=None, ymax=None):
+        '''returns the indices of the points in the given (closed) rectangle
+
+        :param xmin: (float) lower x limit
+        :param xmax: (float) upper x limit
+        :param ymin: (float or None) lower y limit (None for no limit)
+        :param ymax: (float or None) upper y limit (None for no limit)
+
+        :return: (numpy.ndarray) indices of the points (sorted)
+        '''
+        i0 = numpy.searchsorted(self._sortedX, xmin, side='left')
+        i1 = numpy.searchsorted(self._sortedX, xmax, side='right')
+        if self._order is None:
+            idx = numpy.arange(i0, i1)
+        else:
+            idx = numpy.sort(self._order[i0:i1])
+        if ymin is not None or ymax is not None:
+            y = self._y[idx]
+            mask = numpy.ones(len(idx), dtype=bool)
+            if ymin is not None:
+                mask &= y >= ymin
+            if ymax is not None:
+                mask &= y <= ymax
+            idx = idx[mask]
+        return idx
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""
+decimation.py: Decimation of curve data for display
+"""
+__all__ = ["EnvelopeDecimator", "isSorted"]
+
+import numpy
+
+
+def isSorted(x, chunkSize=1 << 20):
+    '''checks whether the given values are sorted in ascending order (i.e.,
+    whether they can be decimated). Large arrays (e.g. memory-mapped ones)
+    are checked in chunks, to avoid full-size temporary arrays.
+
+    :param x: (numpy.ndarray) the values
+    :param chunkSize: (int) number of values checked at once
+
+    :return: (bool)
+    '''
+    for start in xrange(0, max(len(x) - 1, 0), chunkSize):
+        chunk = x[start:start + chunkSize + 1]
+        if numpy.any(chunk[1:] < chunk[:-1]):
+            return False
+    return True
+
+
+class EnvelopeDecimator(object):
+    '''Reduces the number of points of a curve (with sorted x values) to be
+    displayed in a given x range and number of pixel columns, without
+    changing its appearance: the points falling in each pixel column are
+    replaced by the two of them with the minimum and maximum y values (in the
+    order of their x values), so that the envelope of the curve is kept and
+    only actual points of the curve are displayed.
+
+    The decimated columns are cached, so that when new points are appended
+    to the curve (and the column width does not change, e.g. when the x
+    range is just translated) only the new points are processed.
+    '''
+
+    #: curves with up to this number of visible points per pixel column are
+    #: not decimated
+    MaxPointsPerColumn = 2
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        '''discards the cached decimation'''
+        self._width = None
+        self._lastX = None
+        self._lastCount = 0  # number of processed points with x == _lastX
+        self._ids = numpy.zeros(0, dtype='int64')
+        self._x0 = numpy.zeros(0)  # first x value of each column
+        self._xmin = numpy.zeros(0)
+        self._ymin = numpy.zeros(0)
+        self._xmax = numpy.zeros(0)
+        self._ymax = numpy.zeros(0)
+
+    def decimate(self, x, y, xmin, xmax, ncols):
+        '''returns the decimated version of the given curve data.
+
+        :param x: (numpy.ndarray) x values (sorted in ascending order)
+        :param y: (numpy.ndarray) y values
+        :param xmin: (float) lower limit of the displayed x range
+        :param xmax: (float) upper limit of the displayed x range
+        :param ncols: (int) number of pixel columns of the x range
+
+        :return: (tuple<numpy.ndarray,numpy.ndarray>) the x and y values to be
+                 displayed. If no decimation is needed, the visible part of
+                 the given data is returned (as views of the given arrays)
+        '''
+        n = len(x)
+        if n < 2 or ncols < 1 or xmax <= xmin or x[0] > x[-1]:
+            return x, y
+        # visible part of the data (including the points next to the limits)
+        i0 = max(numpy.searchsorted(x, xmin, side='left') - 1, 0)
+        i1 = min(numpy.searchsorted(x, xmax, side='right') + 1, n)
+        if i1 - i0 <= self.MaxPointsPerColumn * ncols:
+            return x[i0:i1], y[i0:i1]
+
+        width = (xmax - xmin) / float(ncols)
+        if self._lastX is not None:
+            # the first point not processed yet (the points with the same x
+            # as the last processed one may have been appended too)
+            start = (numpy.searchsorted(x, self._lastX, side='left') +
+                     self._lastCount)
+        if (width != self._width or self._lastX is None or start > n or
+                x[-1] < self._lastX or len(self._x0) == 0 or
+                x[i0] < self._x0[0]):
+            self.reset()
+            self._width = width
+            self._add(x[i0:], y[i0:])
+        else:
+            self._add(x[start:], y[start:])
+            # discard the columns that are no longer visible
+            first = numpy.searchsorted(self._ids, self._column(x[i0]))
+            if first:
+                self._ids, self._x0 = self._ids[first:], self._x0[first:]
+                self._xmin = self._xmin[first:]
+                self._ymin = self._ymin[first:]
+                self._xmax = self._xmax[first:]
+                self._ymax = self._ymax[first:]
+        self._lastX = x[-1]
+        self._lastCount = n - numpy.searchsorted(x, x[-1], side='left')
+
+        last = numpy.searchsorted(self._ids, self._column(x[i1 - 1]),
+                                  side='right')
+        xmin, ymin = self._xmin[:last], self._ymin[:last]
+        xmax, ymax = self._xmax[:last], self._ymax[:last]
+        # the minimum and the maximum of each column, ordered by x
+        minFirst = xmin <= xmax
+        xd = numpy.empty(2 * last)
+        yd = numpy.empty(2 * last)
+        xd[0::2] = numpy.where(minFirst, xmin, xmax)
+        yd[0::2] = numpy.where(minFirst, ymin, ymax)
+        xd[1::2] = numpy.where(minFirst, xmax, xmin)
+        yd[1::2] = numpy.where(minFirst, ymax, ymin)
+        return xd, yd
+
+    def _column(self, x):
+        return numpy.floor(numpy.asarray(x) / self._width).astype('int64')
+
+    def _add(self, x, y):
+        '''adds (sorted) points to the cached columns'''
+        if len(x) == 0:
+            return
+        ids = self._column(x)
+        starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(ids)) + 1))
+        new_ids = ids[starts]
+        x0 = x[starts]
+        # within each column (ids are sorted), the points sorted by y (the
+        # sort is stable and NaNs go last): the first one is the minimum
+        imin = numpy.lexsort((y, ids))[starts]
+        imax = numpy.lexsort((-y, ids))[starts]
+        xmin, ymin = x[imin], y[imin]
+        xmax, ymax = x[imax], y[imax]
+        if len(self._ids) and self._ids[-1] == new_ids[0]:
+            # merge with the last cached column (keeping the first point in
+            # case of equal values)
+            if not ymin[0] < self._ymin[-1] and not numpy.isnan(self._ymin[-1]):
+                xmin[0], ymin[0] = self._xmin[-1], self._ymin[-1]
+            if not ymax[0] > self._ymax[-1] and not numpy.isnan(self._ymax[-1]):
+                xmax[0], ymax[0] = self._xmax[-1], self._ymax[-1]
+            x0[0] = self._x0[-1]
+            self._ids, self._x0 = self._ids[:-1], self._x0[:-1]
+            self._xmin, self._ymin = self._xmin[:-1], self._ymin[:-1]
+            self._xmax, self._ymax = self._xmax[:-1], self._ymax[:-1]
+        self._ids = numpy.concatenate((self._ids, new_ids))
+        self._x0 = numpy.concatenate((self._x0, x0))
+        self._xmin = numpy.concatenate((self._xmin, xmin))
+        self._ymin = numpy.concatenate((self._ymin, ymin))
+        self._xmax = numpy.concatenate((self._xmax, xmax))
+        self._ymax = numpy.concatenate((self._ymax, ymax))
@@ -45,9 +45,13 @@ from taurus.core.util.containers import LoopList, CaselessDict, CaselessList
 from taurus.core.util.safeeval import SafeEvaluator
 from taurus.qt.qtcore.mimetypes import TAURUS_MODEL_LIST_MIME_TYPE, TAURUS_ATTR_MIME_TYPE
 from taurus.qt.qtgui.base import TaurusBaseComponent, TaurusBaseWidget
+from taurus.qt.qtgui.util.replotscheduler import TaurusReplotScheduler
 from taurus.qt.qtgui.plot import TaurusPlotConfigDialog, FancyScaleDraw,\
     DateTimeScaleEngine, FixedLabelsScaleEngine, FixedLabelsScaleDraw
 from curvesAppearanceChooserDlg import CurveAppearanceProperties
+from taurus.qt.qtgui.plot.curvefile import exportCurves, importCurves, getFormats
+from taurus.qt.qtgui.plot.curvestats import CurveStats, PointIndex
+from taurus.qt.qtgui.plot.decimation import isSorted
 from taurus.qt.qtgui.resource import getThemeIcon
 
 
@@ -274,6 +278,9 @@ class TaurusCurve(Qwt5.QwtPlotCurve, TaurusBaseComponent):
         self._yValues = None
         self._showMaxPeak = False
         self._showMinPeak = False
+        self._stats = CurveStats()
+        self._plottedData = None
+        self._pointIndex = None
         #self._markerFormatter = self.defaultMarkerFormatter
         self._filteredWhenLog = True
         self._history = []
@@ -646,12 +653,10 @@ class TaurusCurve(Qwt5.QwtPlotCurve, TaurusBaseComponent):
     def _updateMarkers(self):
         '''updates min & max markers if needed'''
         if self.isVisible():
+            if self._showMaxPeak or self._showMinPeak:
+                stats = self.getRunningStats()
             if self._showMaxPeak:
-                try:
-                    maxpoint = [self._xValues[
-                        self._yValues.argmax()], self._yValues.max()]
-                except:
-                    maxpoint = [0, 0]
+                maxpoint = stats.getMax() or [0, 0]
                 self._maxPeakMarker.setValue(*maxpoint)
                 label = self._maxPeakMarker.label()
                 if self.plot().getXIsTime():
@@ -663,11 +668,7 @@ class TaurusCurve(Qwt5.QwtPlotCurve, TaurusBaseComponent):
 
                 self._maxPeakMarker.setLabel(label)
             if self._showMinPeak:
-                try:
-                    minpoint = [self._xValues[
-                        self._yValues.argmin()], self._yValues.min()]
-                except:
-                    minpoint = [0, 0]
+                minpoint = stats.getMin() or [0, 0]
                 self._minPeakMarker.setValue(*minpoint)
                 label = self._minPeakMarker.label()
                 if self.plot().getXIsTime():
@@ -678,6 +679,22 @@ class TaurusCurve(Qwt5.QwtPlotCurve, TaurusBaseComponent):
                                   repr(minpoint[1]) + ' at x = ' + repr(minpoint[0]))
                 self._minPeakMarker.setLabel(label)
 
+    def getRunningStats(self):
+        '''returns the statistics of the y values of the curve (updated
+        incrementally when possible, see :class:`CurveStats`)
+
+        :return: (CurveStats)
+        '''
+        x, y = self._xValues, self._yValues
+        if x is None or y is None:
+            self._stats.reset()
+        else:
+            try:
+                self._stats.update(x, y)
+            except Exception:
+                self._stats.reset()
+        return self._stats
+
     def setXYFromModel(self, value):
         """ sets the X (self._xValues) and Y (self._yValues) values from the
         given model. This method can be reimplemented by subclasses of Taurusplot
@@ -851,6 +868,54 @@ class TaurusCurve(Qwt5.QwtPlotCurve, TaurusBaseComponent):
 
         # now proceed as usual
         Qwt5.QwtPlotCurve.setData(self, x, y)
+        self._plottedData = x, y
+        self._pointIndex = None
+
+    def boundingRect(self):
+        '''Reimplemented from :meth:`Qwt5.QwtPlotCurve.boundingRect` to
+        return the bounding rectangle of the curve values (`_xValues`,
+        `_yValues`) when the plotted data is a reduced version of them (e.g.
+        decimated), so that autoscaling is not affected by the reduction.
+
+        .. seealso:: :meth:`getRunningStats`
+        '''
+        x, y = self._xValues, self._yValues
+        if x is None or y is None or len(x) < 2 or \
+                self.dataSize() == len(x):
+            return Qwt5.QwtPlotCurve.boundingRect(self)
+        plot = self.plot()
+        if plot is not None and plot.getAxisTransformationType(
+                self.yAxis()) == Qwt5.QwtScaleTransformation.Log10:
+            # the plotted data excludes the non-positive values
+            return Qwt5.QwtPlotCurve.boundingRect(self)
+        stats = self.getRunningStats()
+        if stats.getCount() == 0:
+            return Qwt5.QwtPlotCurve.boundingRect(self)
+        xmin, xmax = numpy.nanmin(x), numpy.nanmax(x)
+        ymin, ymax = stats.getMin()[1], stats.getMax()[1]
+        return Qt.QRectF(xmin, ymin, xmax - xmin, ymax - ymin)
+
+    def getPointIndex(self):
+        '''returns an index of the plotted points of the curve (i.e., the
+        points of :meth:`data`) for searching points by position. The index
+        is built when first requested after each data change.
+
+        :return: (PointIndex)
+        '''
+        if self._pointIndex is None:
+            self._pointIndex = PointIndex(*self._getPlottedData())
+        return self._pointIndex
+
+    def _getPlottedData(self):
+        '''returns the plotted points of the curve as arrays'''
+        if self._plottedData is None:
+            data = self.data()
+            n = data.size()
+            x = numpy.fromiter((data.x(i) for i in xrange(n)), 'd', count=n)
+            y = numpy.fromiter((data.y(i) for i in xrange(n)), 'd', count=n)
+            self._plottedData = x, y
+        x, y = self._plottedData
+        return numpy.asarray(x, dtype='d'), numpy.asarray(y, dtype='d')
 
     def safeSetData(self):
         '''Calls setData with x= self._xValues and y=self._yValues
@@ -901,6 +966,30 @@ class TaurusCurve(Qwt5.QwtPlotCurve, TaurusBaseComponent):
         '''see :meth:`TaurusBaseComponent.isReadOnly`'''
         return True
 
+    def _mapPlottedIndexes(self, imin, imax, x, y):
+        '''maps the given (slice) indexes of the plotted points to indexes of
+        the given curve values. The plotted points are used instead of the
+        curve values if the indexes cannot be mapped (i.e. the x values are
+        not sorted)
+
+        :return: (tuple) imin, imax, x, y
+        '''
+        px, py = self._getPlottedData()
+        if len(px) == len(x):
+            return imin, imax, x, y  # the data is not decimated nor filtered
+        if not isSorted(x):
+            return imin, imax, px, py
+        start, stop, _ = slice(imin, imax).indices(len(px))
+        if start < len(px):
+            imin = numpy.searchsorted(x, px[start], side='left')
+        else:
+            imin = len(x)
+        if stop < len(px):
+            imax = numpy.searchsorted(x, px[stop], side='left')
+        else:
+            imax = len(x)
+        return imin, imax, x, y
+
     def getStats(self, limits=None, inclusive=(True, True), imin=None, imax=None, ignorenans=True):
         '''
         returns a dict containing several descriptive statistics of a region of
@@ -927,42 +1016,46 @@ class TaurusCurve(Qwt5.QwtPlotCurve, TaurusBaseComponent):
         :param inclusive: (tuple<bool,bool>). A tuple consisting of the (lower flag, upper flag).
                           These flags determine whether values exactly equal to the lower or
                           upper limits are included. The default value is (True, True).
-        :param imin: (int) lowest index to be considered. If None is given,
-                     the limit is not enforced
-        :param imax: (int) higest index to be considered. If None is given,
-                     the limit is not enforced
+        :param imin: (int) lowest index (of the plotted points) to be
+                     considered. If None is given, the limit is not enforced
+        :param imax: (int) higest index (of the plotted points) to be
+                     considered. If None is given, the limit is not enforced
         :param ignorenans: (bool) if True (defaul), the points with NaN values are stripped
                      before calculating the stats
 
         :return: (dict) A dict containing the stats.
         '''
 
-        data = self.data()
-        if imin is None:
-            imin = 0
-        if imax is None:
-            imax = data.size()
-
-        x = numpy.array([data.x(i) for i in xrange(imin, imax)])
-        y = numpy.array([data.y(i) for i in xrange(imin, imax)])
+        # the curve values are used (the plotted data may be decimated)
+        if self._xValues is None or self._yValues is None:
+            x, y = self._getPlottedData()
+        else:
+            x = numpy.asarray(self._xValues, dtype='d')
+            y = numpy.asarray(self._yValues, dtype='d')
+            if imin is not None or imax is not None:
+                imin, imax, x, y = self._mapPlottedIndexes(imin, imax, x, y)
+        x, y = x[imin:imax], y[imin:imax]
 
         if limits is not None:
             xmin, xmax = limits
             if xmax is None:
                 xmax = numpy.inf
             if inclusive:
-                mask = (x >= xmin) * (x <= xmax)
+                mask = (x >= xmin) & (x <= xmax)
             else:
-                mask = (x > xmin) * (x < xmax)
+                mask = (x > xmin) & (x < xmax)
             x = x[mask]
             y = y[mask]
 
         if ignorenans:
             # we remove points where either x or y are Nan
             mask = numpy.invert(numpy.isnan(x + y))
-            x = x[mask]
-            y = y[mask]
+            if not mask.all():
+                x = x[mask]
+                y = y[mask]
 
+        # the data is copied (the curve data may be a view of a buffer)
+        x, y = numpy.array(x), numpy.array(y)
         ret = {'x': x,
                'y': y,
                'points': x.size,
@@ -1289,6 +1382,11 @@ class TaurusPlot(Qwt5.QwtPlot, TaurusBaseWidget):
         self.connect(self._exportAsciiAction, Qt.SIGNAL(
             "triggered()"), self.exportAscii)
 
+        self._exportBinaryAction = Qt.QAction(
+            "Export data to &binary file...", None)
+        self.connect(self._exportBinaryAction, Qt.SIGNAL(
+            "triggered()"), self.exportBinary)
+
         self._setCurvesTitleAction = Qt.QAction(
             "Change Curves Titles...", None)
         self.connect(self._setCurvesTitleAction, Qt.SIGNAL(
@@ -1305,7 +1403,8 @@ class TaurusPlot(Qwt5.QwtPlot, TaurusBaseWidget):
                        self._toggleZoomAxisAction, self._configDialogAction, self._inputDataAction,
                        self._saveConfigAction, self._loadConfigAction, self._showLegendAction,
                        self._showMaxAction, self._showMinAction, self._printAction, self._exportPdfAction,
-                       self._exportAsciiAction, self._setCurvesTitleAction, self._curveStatsAction):
+                       self._exportAsciiAction, self._exportBinaryAction, self._setCurvesTitleAction,
+                       self._curveStatsAction):
             # this is needed to avoid ambiguity when more than one TaurusPlot
             # is used in the same window
             action.setShortcutContext(Qt.Qt.WidgetShortcut)
@@ -1813,7 +1912,30 @@ class TaurusPlot(Qwt5.QwtPlot, TaurusBaseWidget):
         finally:
             self.curves_lock.release()
         self.emit(Qt.SIGNAL("dataChanged(const QString &)"), str(name))
-        self.replot()
+        self.scheduleReplot()
+
+    def scheduleReplot(self):
+        '''requests a replot to the :class:`TaurusReplotScheduler` (which
+        limits the rate of replots and skips them while the plot is not
+        visible) instead of replotting immediately'''
+        TaurusReplotScheduler().requestReplot(self)
+
+    def isReplotNeeded(self, checkMinimized=True):
+        '''checks if it makes sense to replot. The following conditions must
+        be met:
+
+        - the area of the plot must be non-zero
+        - the plot should be visible
+        - the plot should not be minimized (unless checkMinimized=False)
+
+        :param checkMinimized: (bool) whether to include the check of
+                               minimized (True by default)
+
+        :return: (bool)
+        '''
+        return not self.size().isEmpty() and \
+            self.isVisible() and \
+            not (checkMinimized and self.window().isMinimized())
 
     def attachRawData(self, rawdata, properties=None, id=None):
         """attaches a curve to the plot formed from raw data that comes in a dict
@@ -1975,20 +2097,36 @@ class TaurusPlot(Qwt5.QwtPlot, TaurusBaseWidget):
 
         :return: (tuple<list,list>) tuple of two lists (x,y) containing the curve data
         """
+        x, y = self._getCurveArrays(curvename)
+        if not numpy:
+            x, y = x.tolist(), y.tolist()
+        return x, y
+
+    def _getCurveArrays(self, curvename):
+        '''returns the data of a curve as arrays (not copied, if possible).
+        The values kept by the curve (`_xValues` and `_yValues`) are used
+        when available, since the ones passed to Qwt may be a reduced version
+        of them (see :meth:`TaurusTrend.setUseDecimation`)
+
+        :param curvename: (str) the curve name
+
+        :return: (tuple<numpy.ndarray,numpy.ndarray>) the x and y values
+        '''
         self.curves_lock.acquire()
         try:
-            if self.curves.has_key(curvename):
-                data = self.curves[curvename].data()
-                x = [data.x(i) for i in xrange(data.size())]
-                y = [data.y(i) for i in xrange(data.size())]
-            else:
+            if not self.curves.has_key(curvename):
                 self.error("Curve '%s' not found" % curvename)
                 raise KeyError()
+            curve = self.curves[curvename]
+            x, y = curve._xValues, curve._yValues
+            if (x is None or y is None or numpy.ndim(y) != 1 or
+                    len(x) != len(y)):
+                data = curve.data()
+                x = numpy.array([data.x(i) for i in xrange(data.size())])
+                y = numpy.array([data.y(i) for i in xrange(data.size())])
         finally:
             self.curves_lock.release()
-        if numpy:
-            x, y = numpy.array(x), numpy.array(y)
-        return x, y
+        return numpy.asarray(x), numpy.asarray(y)
 
     def updateCurves(self, names):
         '''
@@ -2219,6 +2357,7 @@ class TaurusPlot(Qwt5.QwtPlot, TaurusBaseWidget):
         exportSubMenu.addAction(self._printAction)
         exportSubMenu.addAction(self._exportPdfAction)
         exportSubMenu.addAction(self._exportAsciiAction)
+        exportSubMenu.addAction(self._exportBinaryAction)
 
         menu.addSeparator()
         menu.addAction(self._pauseAction)
@@ -2773,6 +2912,89 @@ class TaurusPlot(Qwt5.QwtPlot, TaurusBaseWidget):
         dialog.setXIsTime(self.getXIsTime())
         return dialog.exec_()
 
+    def exportBinary(self, fileName=None, curves=None):
+        '''Exports the data of curves to a binary file: HDF5 (if h5py is
+        installed) or NumPy's npz format, depending on the file extension.
+        The data is streamed to the file in chunks (the x values are stored
+        as float64), without text conversions nor full copies.
+        See :mod:`taurus.qt.qtgui.plot.curvefile`
+
+        :param fileName: (str) The name of the file to which the data will be
+                         exported. If None given, the user will be prompted for
+                         a file name.
+        :param curves:  (sequence<str>) the names of the curves to export. If
+                        None given, all curves are exported.
+
+        :return: (bool) True if the data was exported
+        '''
+        formats = getFormats()
+        if fileName is None:
+            fileName = Qt.QFileDialog.getSaveFileName(
+                self, 'Export File Name', 'curves%s' % formats[0][1],
+                ';;'.join([f for f, ext in formats]))
+        fileName = str(fileName)
+        if not fileName:
+            return False
+        self.curves_lock.acquire()
+        try:
+            if curves is None:
+                curves = self.getCurveNamesSorted()
+            data = [(name,) + self._getCurveArrays(name) for name in curves]
+        finally:
+            self.curves_lock.release()
+        try:
+            exportCurves(fileName, data)
+        except Exception, e:
+            self.error("Can't write to '%s': %s" % (fileName, repr(e)))
+            Qt.QMessageBox.warning(self, "File Error",
+                                   "Can't write to\n'%s'" % fileName,
+                                   Qt.QMessageBox.Ok)
+            return False
+        return True
+
+    def importBinary(self, filenames=None):
+        '''imports the curves stored in binary files written by
+        :meth:`exportBinary`. The data is memory-mapped from the files when
+        possible. Each curve is attached as a RawData curve.
+
+        :param filenames: (sequence<str> or None) the names of the files to be
+                          read. If None passed, the user will be allowed to
+                          select them from a dialog. (default=None)
+
+        :return: (bool) True if the data was imported
+        '''
+        if filenames is None:
+            filenames = Qt.QFileDialog.getOpenFileNames(
+                self, 'Choose input files', '',
+                ';;'.join([f for f, ext in getFormats()]))
+        if not filenames:
+            return False
+        for fname in filenames:
+            fname = str(fname)
+            try:
+                curves = importCurves(fname)
+            except Exception, e:
+                self.error("Can't read '%s': %s" % (fname, repr(e)))
+                Qt.QMessageBox.warning(self, "File Error",
+                                       "Can't read\n'%s'" % fname,
+                                       Qt.QMessageBox.Ok)
+                return False
+            for name, x, y in curves:
+                self._attachImportedData(name, x, y)
+        return True
+
+    def _attachImportedData(self, name, x, y):
+        '''attaches the data of a curve imported by :meth:`importBinary`.
+        Reimplemented by :class:`TaurusTrend`
+
+        :param name: (str) name of the curve
+        :param x: (numpy.ndarray) x values (possibly, a read-only memory map)
+        :param y: (numpy.ndarray) y values (possibly, a read-only memory map)
+
+        :return: (QwtPlotCurve) the attached curve
+        '''
+        return self.attachRawData({"title": name, "x": x, "y": y}, id=name)
+
     def importAscii(self, filenames=None, xcol=None, **kwargs):
         '''imports curves from ASCII files. It uses :meth:numpy.loadtxt
         The data in the file(s) must be formatted in columns, with possibly a
@@ -2969,6 +3191,25 @@ class TaurusPlot(Qwt5.QwtPlot, TaurusBaseWidget):
         finally:
             self.curves_lock.release()
 
+    def _transformArray(self, axis, values):
+        '''vectorised version of :meth:`transform`
+
+        :param axis: (Qwt5.QwtPlot.Axis) the axis
+        :param values: (numpy.ndarray) values in plot coordinates
+
+        :return: (numpy.ndarray) values in pixel coordinates (rounded)
+        '''
+        m = self.canvasMap(axis)
+        s1, s2, values = m.s1(), m.s2(), numpy.asarray(values, dtype='d')
+        if self.getAxisTransformationType(axis) == Qwt5.QwtScaleTransformation.Log10:
+            s1, s2 = numpy.log10(s1), numpy.log10(s2)
+            with numpy.errstate(invalid='ignore', divide='ignore'):
+                values = numpy.log10(values)
+        if s2 == s1:
+            return numpy.zeros(values.shape) + m.p1()
+        p = m.p1() + (values - s1) * ((m.p2() - m.p1()) / (s2 - s1))
+        return numpy.floor(p + 0.5)
+
     def pickDataPoint(self, pos, scope=20, showMarker=True, targetCurveNames=None):
         '''Finds the pyxel-wise closest data point to the given position. The
         valid search space is constrained by the scope and targetCurveNames
@@ -3018,18 +3259,34 @@ class TaurusPlot(Qwt5.QwtPlot, TaurusBaseWidget):
                     self.error("Curve '%s' not found" % name)
                 if not curve.isVisible():
                     continue
-                data = curve.data()
-                for i in xrange(data.size()):
-                    point = Qt.QPoint(self.transform(curve.xAxis(), data.x(
-                        i)), self.transform(curve.yAxis(), data.y(i)))
-                    if scopeRect.contains(point):
-                        dist = (pos - point).manhattanLength()
-                        if dist < mindist:
-                            mindist = dist
-                            picked = Qt.QPointF(data.x(i), data.y(i))
-                            pickedCurveName = name
-                            pickedIndex = i
-                            pickedAxes = curve.xAxis(), curve.yAxis()
+                xAxis, yAxis = curve.xAxis(), curve.yAxis()
+                # candidates: points within the scope (plus a 1 pixel margin
+                # for the rounding) found with the index of the curve
+                xlims = [self.invTransform(xAxis, scopeRect.left() - 1),
+                         self.invTransform(xAxis, scopeRect.right() + 1)]
+                ylims = [self.invTransform(yAxis, scopeRect.top() - 1),
+                         self.invTransform(yAxis, scopeRect.bottom() + 1)]
+                index = curve.getPointIndex()
+                idx = index.find(min(xlims), max(xlims),
+                                 min(ylims), max(ylims))
+                if not len(idx):
+                    continue
+                x, y = index.getData()
+                px = self._transformArray(xAxis, x[idx])
+                py = self._transformArray(yAxis, y[idx])
+                inside = ((px >= scopeRect.left()) &
+                          (px <= scopeRect.right()) &
+                          (py >= scopeRect.top()) &
+                          (py <= scopeRect.bottom()))
+                dist = numpy.abs(px - pos.x()) + numpy.abs(py - pos.y())
+                dist[~inside] = numpy.inf
+                i = dist.argmin()
+                if dist[i] < mindist:
+                    mindist = dist[i]
+                    picked = Qt.QPointF(x[idx[i]], y[idx[i]])
+                    pickedCurveName = name
+                    pickedIndex = int(idx[i])
+                    pickedAxes = xAxis, yAxis
         finally:
             self.curves_lock.release()
 
@@ -29,24 +29,21 @@ taurustrend.py: Generic trend widget for Taurus
 __all__ = ["ScanTrendsSet", "TaurusTrend", "TaurusTrendsSet"]
 
 from datetime import datetime
+import sys
 import time
 import numpy
 import re
 import gc
+import weakref
 from taurus.external.qt import Qt, Qwt5
 
 import taurus.core
 from taurus.core.util.containers import CaselessDict, CaselessList, ArrayBuffer
+from taurus.core.util.history import HistoryStore
+from taurus.core.util.backfill import ArchivingBackfill, IntervalIndex
 from taurus.qt.qtgui.base import TaurusBaseComponent
 from taurus.qt.qtgui.plot import TaurusPlot
-
-
-def getArchivedTrendValues(*args, **kwargs):
-    try:
-        import PyTangoArchiving
-        return PyTangoArchiving.getArchivedTrendValues(*args, **kwargs)
-    except:
-        return []
+from taurus.qt.qtgui.plot.decimation import EnvelopeDecimator, isSorted
 
 
 def stripShape(s):
@@ -95,6 +92,13 @@ class TaurusTrendsSet(Qt.QObject, TaurusBaseComponent):
         self.call__init__(TaurusBaseComponent, self.__class__.__name__)
         self._xBuffer = None
         self._yBuffer = None
+        self._history = None
+        self._paged = None
+        self._pagedStart = self._pagedEnd = None
+        self._pagedNext = self._pagedLast = None
+        self._archivedRequested = IntervalIndex()
+        self.connect(self, Qt.SIGNAL("archivedValuesReceived"),
+                     self._mergeArchivedValues)
         self.forcedReadingTimer = None
         self.droppedEventsCount = 0
         self.consecutiveDroppedEventsCount = 0
@@ -316,6 +320,10 @@ class TaurusTrendsSet(Qt.QObject, TaurusBaseComponent):
         else:
             ntrends = len(self._curves)
 
+        if not self.parent().getUseArchiving():
+            return self._updateSharedHistory(model, value, ntrends)
+        self._releaseHistory()
+
         if self._xBuffer is None:
             self._xBuffer = ArrayBuffer(numpy.zeros(
                 min(128, self._maxBufferSize), dtype='d'), maxSize=self._maxBufferSize)
@@ -336,15 +344,14 @@ class TaurusTrendsSet(Qt.QObject, TaurusBaseComponent):
                 self._xBuffer.append(value.time.totime())
             # Adding archiving values
             if self.parent().getUseArchiving():
-                # open a mysql connection for online trends or any not
+                # request the archived values for online trends or any not
                 # autoscaled plots
                 if self.parent().getXDynScale() or not self.parent().axisAutoScale(Qwt5.QwtPlot.xBottom):
                     try:
-                        getArchivedTrendValues(self, model, insert=True)
+                        self._requestArchivedValues(model)
                     except Exception, e:
-                        import traceback
-                        self.warning('%s: reading from archiving failed: %s' % (
-                            datetime.now().isoformat('_'), traceback.format_exc()))
+                        self.warning('%s: reading from archiving failed: %r' % (
+                            datetime.now().isoformat('_'), e))
         elif value is not None:
             # add the event number to the x buffer
             try:
@@ -353,6 +360,241 @@ class TaurusTrendsSet(Qt.QObject, TaurusBaseComponent):
                 self._xBuffer.append(0)
         return self._xBuffer.contents(), self._yBuffer.contents()
 
+    def _requestArchivedValues(self, model):
+        '''requests (in background) the archived values for the part of the
+        x range older than the history buffers. The values are merged into
+        the buffers when received (see :meth:`_mergeArchivedValues`). Only
+        the parts of the range not requested before by this trend set are
+        requested, so that the values of each range are delivered once (the
+        values already cached by :class:`ArchivingBackfill` are delivered as
+        well)
+
+        :param model: (str) the source of the event
+        '''
+        if len(self._xBuffer) >= self._maxBufferSize - 1:
+            return  # no room for merging more values
+        xmin = self.parent().axisScaleDiv(Qwt5.QwtPlot.xBottom).lowerBound()
+        if len(self._xBuffer):
+            first = self._xBuffer[0]
+        else:
+            first = time.time()
+        name = self.getFullModelName() or str(model)
+        for start, end in self._archivedRequested.missing(xmin, first):
+            self._archivedRequested.add(start, end)
+            ArchivingBackfill().request(name, start, end,
+                                        self._onArchivedValues)
+
+    def _onArchivedValues(self, name, t, v):
+        '''called (from a worker thread) when archived values are received'''
+        self.emit(Qt.SIGNAL("archivedValuesReceived"), name, t, v)
+
+    def _mergeArchivedValues(self, name, t, v):
+        '''prepends the received archived values which are older than the
+        history buffers (up to the maximum size of the buffers)
+
+        :param name: (str) full name of the attribute
+        :param t: (numpy.ndarray) timestamps (sorted)
+        :param v: (numpy.ndarray) values
+        '''
+        if (self._xBuffer is None or self._yBuffer is None or
+                not self.parent().getUseArchiving()):
+            # the values must be requested again if the archiving is enabled
+            self._archivedRequested = IntervalIndex()
+            return
+        ntrends = len(self._curves)
+        v = numpy.asarray(v, dtype='d')
+        v = v.reshape((len(v), int(numpy.prod(v.shape[1:]))))
+        if v.shape[1] != ntrends:
+            self.debug('Ignoring archived values of %s (shape mismatch)', name)
+            return
+        if len(self._xBuffer):
+            n = numpy.searchsorted(t, self._xBuffer[0])
+            t, v = t[:n], v[:n]
+        n = min(len(t), self._maxBufferSize - len(self._xBuffer) - 1)
+        if n <= 0:
+            return
+        self._xBuffer.extendLeft(numpy.asarray(t[-n:], dtype='d'))
+        self._yBuffer.extendLeft(v[-n:])
+        self._xValues = self._xBuffer.contents()
+        self._yValues = self._yBuffer.contents()
+        for i, (cn, c) in enumerate(self.getCurves()):
+            c._xValues, c._yValues = self._xValues, self._yValues[:, i]
+            c._updateMarkers()
+        self.emit(Qt.SIGNAL("dataChanged(const QString &)"),
+                  Qt.QString(self.getModel()))
+
+    def _updateSharedHistory(self, model, value, ntrends):
+        '''Same as :meth:`_updateHistory` but using the history of the
+        attribute shared (through the :class:`HistoryStore`) by all the trends
+        showing it. The returned arrays are views of the shared history
+        buffer (i.e., no data is copied).
+
+        The event number used as x value when not in XisTime mode is counted
+        from the first value visible by this trend set.
+        '''
+        if self._history is None:
+            name = self.getFullModelName() or str(model)
+            self._history = HistoryStore().subscribe(name, self._maxBufferSize)
+        if value is not None:
+            try:
+                self._history.append(value)
+            except Exception, e:
+                self.warning('Problem updating history (%s=%s):%s',
+                             model, value.rvalue.magnitude, e)
+        first, t, y = self._history.contents()
+        y = y.reshape((len(y), int(numpy.prod(y.shape[1:]))))
+        if y.shape[1] != ntrends:
+            # the history does not match the current shape
+            t, y = t[:0], numpy.zeros((0, ntrends), dtype='d')
+        if self.parent().getXIsTime():
+            x = t
+            if self._paged is not None:
+                x, y = self._joinPaged(first, x, y)
+        else:
+            x = numpy.arange(len(t), dtype='d')
+            x += first - self._history.startIndex()
+        return x, y
+
+    def _readSpool(self, t0, t1, ntrends):
+        '''returns the records of the spooled history in [t0, t1) with the
+        shape of the curves (or None if they are not available)'''
+        spool = HistoryStore().getSpool(self._history.getName())
+        if spool is None:
+            return None
+        t, y = spool.getRange(t0, t1)
+        y = y.reshape((len(y), int(numpy.prod(y.shape[1:]))))
+        if y.shape[1] != ntrends:
+            return None
+        return t, y
+
+    def _joinPaged(self, first, t, y):
+        '''appends the records of the history data which were not joined yet
+        to the data paged in from the spool (see :meth:`pageSpool`) and
+        returns the joined data
+
+        :param first: (int) absolute index of the first record of the history
+        :param t: (numpy.ndarray) timestamps of the history
+        :param y: (numpy.ndarray) values of the history (2D)
+
+        :return: (tuple<numpy.ndarray,numpy.ndarray>) joined data
+        '''
+        xbuf, ybuf = self._paged
+        if ybuf.contents().shape[1] != y.shape[1]:
+            return t, y
+        n = self._pagedNext - first
+        if n < 0 and len(t):
+            # fill the gap left by the records discarded from memory
+            gap = self._readSpool(self._pagedLast, t[0], y.shape[1])
+            if gap is not None:
+                i = numpy.searchsorted(gap[0], self._pagedLast, side='right')
+                xbuf.extend(gap[0][i:])
+                ybuf.extend(gap[1][i:])
+        n = max(n, 0)
+        if n < len(t):
+            xbuf.extend(t[n:])
+            ybuf.extend(y[n:])
+            self._pagedLast = t[-1]
+        self._pagedNext = first + len(t)
+        return xbuf.contents(), ybuf.contents()
+
+    def pageSpool(self, xmin, xmax=None):
+        '''makes the curves include the data older than the history kept in
+        memory, down to the given time, by reading the visible part of it
+        from the spool of the attribute (see
+        :meth:`HistoryStore.setSpooling`). The paged data is released when
+        the given time is within the history kept in memory.
+
+        The paged data is joined with the history once, and only the new
+        records of the history are appended to it afterwards (see
+        :meth:`_joinPaged`).
+
+        :param xmin: (float) oldest time that should be displayed
+        :param xmax: (float or None) newest time that should be displayed
+                     (None for up to the history kept in memory)
+
+        :return: (bool) True if the data of the curves changed
+        '''
+        if self._history is None or not self.parent().getXIsTime():
+            return False
+        ntrends = len(self._curves)
+        first, t, y = self._history.contents()
+        tmem = t[0] if len(t) else float('inf')
+        if xmin >= tmem:
+            if self._paged is None:
+                return False
+            self._paged = None
+            self._pagedStart = self._pagedEnd = None
+        else:
+            end = tmem if xmax is None else min(xmax, tmem)
+            if (self._paged is not None and xmin >= self._pagedStart and
+                    end <= self._pagedEnd):
+                return self._trimPaged(xmin)  # already paged in
+            data = self._readSpool(xmin, end, ntrends)
+            if data is None:
+                return False
+            y = y.reshape((len(y), int(numpy.prod(y.shape[1:]))))
+            if y.shape[1] != ntrends:
+                t, y = t[:0], numpy.zeros((0, ntrends), dtype='d')
+            x = numpy.concatenate((data[0], t))
+            y = numpy.concatenate((data[1], y))
+            size = max(2 * len(x), 128)  # room for the next records
+            xbuf = ArrayBuffer(numpy.empty(size, dtype='d'),
+                               maxSize=sys.maxint)
+            ybuf = ArrayBuffer(numpy.empty((size, ntrends), dtype='d'),
+                               maxSize=sys.maxint)
+            xbuf.extend(x)
+            ybuf.extend(y)
+            self._paged = xbuf, ybuf
+            self._pagedStart = xmin
+            # the paged data is contiguous with the history if it reaches it
+            self._pagedEnd = float('inf') if end >= tmem else end
+            self._pagedNext = first + len(t)
+            self._pagedLast = x[-1] if len(x) else xmin
+        self._updateCurvesData()
+        return True
+
+    def _trimPaged(self, xmin):
+        '''discards the paged data older than the given time (but the last
+        record before it) if it is most of the paged data
+
+        :param xmin: (float) oldest time that should be displayed
+
+        :return: (bool) True if the data of the curves changed
+        '''
+        xbuf, ybuf = self._paged
+        n = int(numpy.searchsorted(xbuf.contents(), xmin)) - 1
+        if n <= len(xbuf) // 2:
+            return False
+        xbuf.moveLeft(n)
+        ybuf.moveLeft(n)
+        self._pagedStart = xmin
+        self._updateCurvesData()
+        return True
+
+    def _updateCurvesData(self):
+        '''updates the data of the curves from the history'''
+        ntrends = len(self._curves)
+        if not ntrends:
+            return
+        self._xValues, self._yValues = self._updateSharedHistory(
+            self.getModel(), None, ntrends)
+        for i, (n, c) in enumerate(self.getCurves()):
+            c._xValues, c._yValues = self._xValues, self._yValues[:, i]
+            c._updateMarkers()
+
+    def _releaseHistory(self):
+        '''unsubscribes from the shared history (if subscribed)'''
+        self._paged = None
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
+    def setModel(self, model):
+        '''reimplemented from :meth:`TaurusBaseComponent.setModel` to release
+        the shared history of the previous model'''
+        self._releaseHistory()
+        TaurusBaseComponent.setModel(self, model)
+
     def clearTrends(self, replot=True):
         '''clears all stored data (buffers and copies of the curves data)
 
@@ -366,6 +608,10 @@ class TaurusTrendsSet(Qt.QObject, TaurusBaseComponent):
         # clean history Buffers
         self._xBuffer = None
         self._yBuffer = None
+        if self._history is not None:
+            self._history.clear()
+        self._paged = None
+        self._archivedRequested = IntervalIndex()
         # clean x,ydata
         self._xValues = None
         self._yValues = None
@@ -510,6 +756,8 @@ class TaurusTrendsSet(Qt.QObject, TaurusBaseComponent):
             self._xBuffer.setMaxSize(maxSize)
         if self._yBuffer is not None:
             self._yBuffer.setMaxSize(maxSize)
+        if self._history is not None:
+            self._history.setMaxSize(maxSize)
         self._maxBufferSize = maxSize
 
     def maxDataBufferSize(self):
@@ -908,6 +1156,12 @@ class TaurusTrend(TaurusPlot):
         # use dynamic scale by default
         self.setXDynScale(True)
         self._scrollStep = 0.2
+        # decimate the curves when they have more points than pixels
+        self._useDecimation = True
+        self._decimators = weakref.WeakKeyDictionary()
+        self._importedCurves = weakref.WeakSet()
+        self.connect(self.axisWidget(self.xBottom), Qt.SIGNAL(
+            "scaleDivChanged ()"), self._onXScaleDivChanged)
 
     def __initActions(self):
         '''Create TaurusTrend actions'''
@@ -954,10 +1208,8 @@ class TaurusTrend(TaurusPlot):
         :return: (bool)
         '''
         return self._replotTimer is not None and \
-            not self.size().isEmpty() and \
             bool(len(self.trendSets)) and \
-            self.isVisible() and \
-            not (checkMinimized and self.isMinimized())
+            self.isReplotNeeded(checkMinimized=checkMinimized)
 
     def showEvent(self, event):
         '''reimplemented from :meth:`TaurusPlot.showEvent` so that
@@ -1358,9 +1610,8 @@ class TaurusTrend(TaurusPlot):
         name = str(name)
         self.curves_lock.acquire()
         try:
-            curve = None
-            for n, curve in self.trendSets[name].getCurves():
-                curve.setData(curve._xValues, curve._yValues)
+            curves = [c for n, c in self.trendSets[name].getCurves()]
+            curve = curves and curves[-1] or None
             # self._zoomer.setZoomBase()
             # keep the scale width constant, but translate it to get the last
             # value
@@ -1375,19 +1626,130 @@ class TaurusTrend(TaurusPlot):
                                    self._scrollStep, minstep), maxstep)
                     self.setAxisScale(
                         self.xBottom, currmin + step, currmax + step)
+            for curve in curves:
+                self._setCurveData(curve)
         finally:
             self.curves_lock.release()
         self.emit(Qt.SIGNAL("dataChanged(const QString &)"), Qt.QString(name))
         if not self.xIsTime:
-            self.replot()
+            self.scheduleReplot()
         else:
             self._dirtyPlot = True
 
+    def _setCurveData(self, curve):
+        '''sets the data of a trend curve (from its `_xValues` and `_yValues`
+        members), decimated if decimation is enabled. See
+        :meth:`setUseDecimation`
+
+        :param curve: (TaurusCurve) the curve
+        '''
+        x, y = curve._xValues, curve._yValues
+        if self._useDecimation and x is not None and len(x) > 1:
+            decimator = self._decimators.get(curve)
+            if decimator is None:
+                decimator = self._decimators[curve] = EnvelopeDecimator()
+            sdiv = self.axisScaleDiv(self.xBottom)
+            xmin, xmax = sdiv.lowerBound(), sdiv.upperBound()
+            x, y = decimator.decimate(x, y, xmin, xmax, self.canvas().width())
+        curve.setData(x, y)
+
+    def _getDecimatedCurves(self):
+        '''returns the curves whose data is set by :meth:`_setCurveData`
+        (the curves of the trend sets and the imported ones)
+
+        :return: (list<TaurusCurve>)
+        '''
+        curves = [c for tset in self.trendSets.values()
+                  for n, c in tset.getCurves()]
+        curves.extend(self._importedCurves)
+        return [c for c in curves if c._xValues is not None]
+
+    def _attachImportedData(self, name, x, y):
+        '''reimplemented from :meth:`TaurusPlot._attachImportedData` so that
+        the (possibly memory-mapped) data of a curve with sorted x values
+        (e.g. a history exported from a trend) is not copied: only its
+        decimated version is passed to the plot (see
+        :meth:`setUseDecimation`). Note that the data of such curves is not
+        stored in the configuration of the trend.
+        '''
+        if not isSorted(x):
+            return TaurusPlot._attachImportedData(self, name, x, y)
+        empty = numpy.zeros(0)
+        curve = self.attachRawData({'title': name, 'x': empty, 'y': empty},
+                                   id=name)
+        self.curves_lock.acquire()
+        try:
+            curve._xValues, curve._yValues = x, y
+            self._setCurveData(curve)
+            self._importedCurves.add(curve)
+        finally:
+            self.curves_lock.release()
+        self.replot()
+        return curve
+
+    def _onXScaleDivChanged(self):
+        '''updates the curves when the x scale changes (zoom/pan): the
+        history older than the one kept in memory is paged in from the spool
+        (if enabled, see :meth:`TaurusTrendsSet.pageSpool`) and the
+        decimated curves are updated'''
+        paged = False
+        if self.getXIsTime() and not self.getUseArchiving() and \
+                HistoryStore().getSpoolDirectory() is not None:
+            sdiv = self.axisScaleDiv(self.xBottom)
+            xmin, xmax = sdiv.lowerBound(), sdiv.upperBound()
+            self.curves_lock.acquire()
+            try:
+                for tset in self.trendSets.values():
+                    paged = tset.pageSpool(xmin, xmax) or paged
+            finally:
+                self.curves_lock.release()
+        if not (self._useDecimation or paged):
+            return
+        self.curves_lock.acquire()
+        try:
+            for curve in self._getDecimatedCurves():
+                self._setCurveData(curve)
+        finally:
+            self.curves_lock.release()
+        if paged:
+            self.scheduleReplot()
+
+    def setUseDecimation(self, enable):
+        '''enables/disables the decimation of the curves. When enabled, the
+        points of a curve that fall in the same pixel column are replaced
+        by its minimum and maximum (which does not change the appearance of
+        the curve but limits the number of plotted points to ~2 per pixel
+        column)
+
+        :param enable: (bool)
+        '''
+        self._useDecimation = enable
+        self._decimators = weakref.WeakKeyDictionary()
+        self.curves_lock.acquire()
+        try:
+            for curve in self._getDecimatedCurves():
+                self._setCurveData(curve)
+        finally:
+            self.curves_lock.release()
+        self.replot()
+
+    def getUseDecimation(self):
+        '''whether the curves are decimated (see :meth:`setUseDecimation`)
+
+        :return: (bool)
+        '''
+        return self._useDecimation
+
+    def resetUseDecimation(self):
+        '''Same as setUseDecimation(True)'''
+        self.setUseDecimation(True)
+
     def doReplot(self):
-        '''calls :meth:`replot` only if there is new data to be plotted'''
+        '''schedules a replot only if there is new data to be plotted.
+        See :meth:`scheduleReplot`'''
         #self.trace('Replotting? %s',self._dirtyPlot)
         if self._dirtyPlot:
-            self.replot()
+            self.scheduleReplot()
             self._dirtyPlot = False
 
     def rescheduleReplot(self, axis=Qwt5.QwtPlot.xBottom, width=1080):
@@ -1835,6 +2197,8 @@ class TaurusTrend(TaurusPlot):
         "bool", getUseArchiving, setUseArchiving, resetUseArchiving)
     usePollingBuffer = Qt.pyqtProperty(
         "bool", getUsePollingBuffer, setUsePollingBuffer, resetUsePollingBuffer)
+    useDecimation = Qt.pyqtProperty(
+        "bool", getUseDecimation, setUseDecimation, resetUseDecimation)
     maxDataBufferSize = Qt.pyqtProperty(
         "int", getMaxDataBufferSize, setMaxDataBufferSize, resetMaxDataBufferSize)
     scrollstep = Qt.pyqtProperty(
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.qt.qtgui.plot.curvefile"""
+
+__docformat__ = 'restructuredtext'
+
+import os
+import shutil
+import tempfile
+
+import numpy
+from taurus.external import unittest
+from taurus.test import insertTest
+from taurus.qt.qtgui.plot.curvefile import (exportCurves, importCurves,
+                                            HDF5_SUPPORTED)
+
+
+@insertTest(helper_name='roundTrip', ext='.npz', mmap=True)
+@insertTest(helper_name='roundTrip', ext='.npz', mmap=False)
+@insertTest(helper_name='roundTrip', ext='.h5', mmap=True)
+@insertTest(helper_name='roundTrip', ext='.h5', mmap=False)
+class CurveFileTestCase(unittest.TestCase):
+    '''Test case for the export and import of curves to binary files'''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        t = 1.4e9 + numpy.arange(1000) * 0.1
+        self.curves = [('sys/tg_test/1/double_scalar', t,
+                        numpy.random.random(len(t))),
+                       ('int', range(5), numpy.arange(5, dtype='int32')),
+                       ('empty', numpy.zeros(0), numpy.zeros(0))]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def roundTrip(self, ext='.npz', mmap=True):
+        '''check that the curves are imported as they were exported'''
+        if ext == '.h5' and not HDF5_SUPPORTED:
+            self.skipTest('h5py is not installed')
+        fileName = os.path.join(self.tmpdir, 'curves' + ext)
+        exportCurves(fileName, self.curves, chunkSize=64)
+        curves = importCurves(fileName, mmap=mmap, chunkSize=64)
+        self.assertEqual(len(curves), len(self.curves))
+        for (name, x, y), (name2, x2, y2) in zip(self.curves, curves):
+            self.assertEqual(name, name2)
+            self.assertEqual(x2.dtype, numpy.dtype('<f8'))
+            self.assertEqual(y2.dtype, numpy.asarray(y).dtype)
+            self.assertTrue(numpy.all(numpy.asarray(x) == x2))
+            self.assertTrue(numpy.all(numpy.asarray(y) == y2))
+        if mmap:
+            self.assertTrue(isinstance(curves[0][1], numpy.memmap))
+
+    def test_length(self):
+        '''check that curves with different x and y lengths are rejected'''
+        fileName = os.path.join(self.tmpdir, 'curves.npz')
+        self.assertRaises(ValueError, exportCurves, fileName,
+                          [('bad', numpy.zeros(3), numpy.zeros(4))])
+
+
+if __name__ == '__main__':
+    pass
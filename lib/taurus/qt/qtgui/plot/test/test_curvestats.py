@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+
+"""Test for taurus.qt.qtgui.plot.curvestats"""
+
+__docformat__ = 'restructuredtext'
+
+import numpy
+from taurus.external import unittest
+from taurus.test import insertTest
+from taurus.qt.qtgui.plot.curvestats import CurveStats, PointIndex
+
+
+class CurveStatsTestCase(unittest.TestCase):
+    '''Test case for the CurveStats class'''
+
+    def setUp(self):
+        self.stats = CurveStats()
+        self.stats.BlockSize = 10
+
+    def checkStats(self, y):
+        '''compares the stats with the ones computed from the whole data'''
+        y = y[~numpy.isnan(y)]
+        s = self.stats
+        self.assertEqual(s.getCount(), len(y))
+        self.assertEqual(s.getMin()[1], y.min())
+        self.assertEqual(s.getMax()[1], y.max())
+        self.assertAlmostEqual(s.getMean(), y.mean())
+        self.assertAlmostEqual(s.getStd(), y.std())
+        self.assertAlmostEqual(s.getRms(), numpy.sqrt(numpy.mean(y ** 2)))
+
+    def test_buffer(self):
+        '''check the stats of a buffer that appends and discards points'''
+        capacity = 37
+        buf = numpy.zeros((capacity, 2))
+        n, t = 0, 0
+        numpy.random.seed(0)
+        for step in xrange(50):
+            for i in xrange(numpy.random.randint(0, 15)):
+                if n == capacity:
+                    buf[:-1] = buf[1:].copy()
+                    n -= 1
+                t += 1
+                y = numpy.random.normal()
+                if numpy.random.random() < .1:
+                    y = numpy.nan
+                buf[n] = t, y
+                n += 1
+            self.stats.update(buf[:n, 0], buf[:n, 1])
+            if n:
+                self.checkStats(buf[:n, 1])
+
+    def test_replaced(self):
+        '''check that replacing the data recomputes the stats'''
+        x = numpy.arange(50.)
+        self.stats.update(x, numpy.sin(x))
+        y = numpy.cos(x)
+        self.stats.update(x, y)
+        self.checkStats(y)
+        self.assertEqual(self.stats.getMax(), (0., 1.))
+
+    def test_empty(self):
+        '''check the stats of curves without values'''
+        self.stats.update(numpy.arange(3.), numpy.zeros(3) * numpy.nan)
+        self.assertEqual(self.stats.getCount(), 0)
+        self.assertTrue(self.stats.getMin() is None)
+        self.assertTrue(self.stats.getMean() is None)
+
+
+@insertTest(helper_name='checkFind', sort=True)
+@insertTest(helper_name='checkFind', sort=False)
+class PointIndexTestCase(unittest.TestCase):
+    '''Test case for the PointIndex class'''
+
+    def checkFind(self, sort=True):
+        '''compares the points found with a linear search'''
+        numpy.random.seed(1)
+        x, y = numpy.random.normal(size=(2, 1000))
+        if sort:
+            x.sort()
+        index = PointIndex(x, y)
+        for i in xrange(20):
+            xmin, xmax = sorted(numpy.random.normal(size=2))
+            ymin, ymax = sorted(numpy.random.normal(size=2))
+            expected = numpy.flatnonzero((x >= xmin) & (x <= xmax) &
+                                         (y >= ymin) & (y <= ymax))
+            found = index.find(xmin, xmax, ymin, ymax)
+            self.assertEqual(list(found), list(expected))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.qt.qtgui.plot.decimation"""
+
+__docformat__ = 'restructuredtext'
+
+import numpy
+from taurus.external import unittest
+from taurus.qt.qtgui.plot.decimation import EnvelopeDecimator
+
+
+def _envelope(x, y, xmin, xmax, ncols):
+    '''reference (non incremental) implementation of the decimation'''
+    width = (xmax - xmin) / float(ncols)
+    i0 = max(numpy.searchsorted(x, xmin) - 1, 0)
+    i1 = min(numpy.searchsorted(x, xmax, side='right') + 1, len(x))
+    x, y = x[i0:i1], y[i0:i1]
+    ids = numpy.floor(x / width).astype('int64')
+    ret = []
+    for i in numpy.unique(ids):
+        xc, yc = x[ids == i], y[ids == i]
+        imin, imax = numpy.argmin(yc), numpy.argmax(yc)
+        if imin <= imax:
+            ret.append((xc[imin], yc[imin], xc[imax], yc[imax]))
+        else:
+            ret.append((xc[imax], yc[imax], xc[imin], yc[imin]))
+    return numpy.array(ret)
+
+
+class EnvelopeDecimatorTestCase(unittest.TestCase):
+    '''Test case for the EnvelopeDecimator class'''
+
+    def setUp(self):
+        numpy.random.seed(0)
+        self.x = numpy.cumsum(numpy.random.random(50000) * .01)
+        self.y = numpy.random.normal(size=50000)
+
+    def _check(self, decimator, n, xmin, xmax, ncols):
+        xd, yd = decimator.decimate(self.x[:n], self.y[:n], xmin, xmax,
+                                    ncols)
+        got = numpy.array([xd[0::2], yd[0::2], xd[1::2], yd[1::2]]).T
+        # only points of the curve are displayed
+        self.assertTrue(numpy.all(numpy.in1d(xd, self.x[:n])))
+        expected = _envelope(self.x[:n], self.y[:n], xmin, xmax, ncols)
+        self.assertEqual(got.shape, expected.shape)
+        # (the first and last columns may contain points out of the visible
+        # range)
+        self.assertTrue(numpy.allclose(got[1:-1], expected[1:-1]))
+
+    def test_small(self):
+        '''check that curves with few points are not decimated'''
+        d = EnvelopeDecimator()
+        xd, yd = d.decimate(self.x[:100], self.y[:100], 0, 1000, 500)
+        self.assertTrue(numpy.all(xd == self.x[:100]))
+
+    def test_decimation(self):
+        '''check the decimation of a zoomed curve'''
+        d = EnvelopeDecimator()
+        self._check(d, 50000, 50, 150, 300)
+        self._check(d, 50000, 0, 300, 300)
+
+    def test_actualPoints(self):
+        '''check that the minimum and maximum are kept at their positions'''
+        x = numpy.arange(100.)
+        y = numpy.zeros(100)
+        y[5], y[7] = 10, -3
+        d = EnvelopeDecimator()
+        xd, yd = d.decimate(x, y, 0, 100, 1)
+        self.assertEqual(list(xd), [5, 7])
+        self.assertEqual(list(yd), [10, -3])
+
+    def test_incremental(self):
+        '''check the decimation of a growing curve with a moving range'''
+        d = EnvelopeDecimator()
+        for n in xrange(10000, 50001, 3001):
+            xmax = self.x[n - 1] + 1
+            self._check(d, n, xmax - 50, xmax, 400)
+
+
+    def test_equalTimestamps(self):
+        '''check that the appended points with the same x as the last
+        processed one are not dropped'''
+        x = numpy.repeat(numpy.arange(1000.), 2)
+        y = numpy.zeros(2000)
+        d = EnvelopeDecimator()
+        d.decimate(x[:1999], y[:1999], 0, 1000, 10)
+        y[1999] = 5
+        xd, yd = d.decimate(x, y, 0, 1000, 10)
+        self.assertEqual(yd.max(), 5)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.qt.qtgui.plot.taurusplot"""
+
+__docformat__ = 'restructuredtext'
+
+import numpy
+from taurus.external import unittest
+from taurus.qt.qtgui.test import BaseWidgetTestCase
+from taurus.qt.qtgui.plot.taurusplot import TaurusCurve
+
+
+class TaurusCurveStatsTestCase(BaseWidgetTestCase, unittest.TestCase):
+    '''Test case for TaurusCurve.getStats'''
+
+    def setUp(self):
+        BaseWidgetTestCase.setUp(self)
+        self.curve = TaurusCurve('stats', rawData={})
+        self.x = numpy.arange(100.)
+        self.y = self.x % 7
+
+    def test_indexes(self):
+        '''check that the indexes refer to the plotted points'''
+        self.curve._xValues, self.curve._yValues = self.x, self.y
+        self.curve.setData(self.x, self.y)
+        stats = self.curve.getStats(imin=10, imax=20)
+        self.assertEqual(list(stats['x']), range(10, 20))
+
+    def test_decimatedIndexes(self):
+        '''check that the indexes of the plotted points of a decimated curve
+        are mapped to the curve values'''
+        self.curve._xValues, self.curve._yValues = self.x, self.y
+        self.curve.setData(self.x[::10], self.y[::10])
+        stats = self.curve.getStats(imin=2, imax=5)
+        self.assertEqual(list(stats['x']), range(20, 50))
+        self.assertEqual(stats['max'], (20., 6.))
+        stats = self.curve.getStats(imin=-2)
+        self.assertEqual(list(stats['x']), range(80, 100))
+
+
+if __name__ == '__main__':
+    pass
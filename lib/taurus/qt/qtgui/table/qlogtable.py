@@ -37,9 +37,12 @@ import datetime
 import threading
 import socket
 
+import numpy
+
 import taurus
 from taurus.core.util.log import Logger
-from taurus.core.util.remotelogmonitor import LogRecordStreamHandler, \
+from taurus.core.util.logbuffer import LogRecordBuffer
+from taurus.core.util.remotelogmonitor import LogRecordBatchStreamHandler, \
     LogRecordSocketReceiver
 from taurus.core.util.decorator.memoize import memoized
 
@@ -52,6 +55,7 @@ from qtable import QBaseTableWidget
 
 LEVEL, TIME, MSG, NAME, ORIGIN = range(5)
 HORIZ_HEADER = 'Level', 'Time', 'Message', 'By', 'Origin'
+SORT_FIELD = 'levelno', 'created', 'msg', 'name', 'origin'
 
 __LEVEL_BRUSH = {
     taurus.Trace: (Qt.Qt.lightGray, Qt.Qt.black),
@@ -81,15 +85,6 @@ def getBrushForLevel(level):
     return f, g
 
 
-def _origin_cmp(rec1, rec2):
-    c1 = cmp(rec1.process, rec2.process)
-    if c1 == 0:
-        c2 = cmp(rec1.thread, rec2.thread)
-        if c2 == 0:
-            return cmp(rec1.name, rec2.name)
-        return c2
-    return c1
-
 gethostname = memoized(socket.gethostname)
 
 
@@ -111,8 +106,11 @@ def _get_record_trace(rec):
     return pathname, filename, modulename, funcname, lineno
 
 
-def _get_record_origin_str(rec):
-    return "{0}.{1}.{3}".format(*_get_record_origin(rec))
+def _get_origin_str(origin):
+    host, procName, procID, threadName, threadID = origin
+    if host is None:
+        host = "?" + gethostname() + "?"
+    return "{0}.{1}.{2}".format(host, procName, threadName)
 
 
 def _get_record_origin_tooltip(rec):
@@ -155,7 +153,8 @@ class QLoggingTableModel(Qt.QAbstractTableModel, logging.Handler):
         super(Qt.QAbstractTableModel, self).__init__()
         logging.Handler.__init__(self)
         self._capacity = capacity
-        self._records = []
+        self._records = LogRecordBuffer(capacity)
+        self._order = None  # sequence numbers of the records, when sorted
         self._accumulated_records = []
         Logger.addRootLogHandler(self)
         self.startTimer(freq * 1000)
@@ -165,58 +164,68 @@ class QLoggingTableModel(Qt.QAbstractTableModel, logging.Handler):
     # ---------------------------------
 
     def sort(self, column, order=Qt.Qt.AscendingOrder):
-        if column == LEVEL:
-            f = lambda a, b: cmp(a.levelno, b.levelno)
-        elif column == TIME:
-            f = lambda a, b: cmp(a.created, b.created)
-        elif column == MSG:
-            f = lambda a, b: cmp(a.msg, b.msg)
-        elif column == NAME:
-            f = lambda a, b: cmp(a.name, b.name)
-        elif column == ORIGIN:
-            f = _origin_cmp
-        self._records = sorted(self._records, cmp=f,
-                               reverse=order == Qt.Qt.DescendingOrder)
+        # note: emit is overwritten by the logging.Handler API (see below)
+        Qt.QAbstractTableModel.emit(self, Qt.SIGNAL("layoutAboutToBeChanged()"))
+        seqs = self._records.seqs()
+        if order == Qt.Qt.DescendingOrder:
+            # (sort the reversed records to keep the order of equal ones)
+            seqs = self._records.argsort(SORT_FIELD[column], seqs[::-1])
+            seqs = seqs[::-1]
+        else:
+            seqs = self._records.argsort(SORT_FIELD[column], seqs)
+        self._order = seqs
+        Qt.QAbstractTableModel.emit(self, Qt.SIGNAL("layoutChanged()"))
 
     def rowCount(self, index=Qt.QModelIndex()):
-        return len(self._records)
+        if self._order is None:
+            return len(self._records)
+        return len(self._order)
 
     def columnCount(self, index=Qt.QModelIndex()):
         return len(HORIZ_HEADER)
 
+    def _getSeq(self, row):
+        if self._order is None:
+            return self._records.firstSeq() + row
+        return int(self._order[row])
+
     def getRecord(self, index):
-        return self._records[index.row()]
+        return self._records.getRecord(self._getSeq(index.row()))
+
+    def getRecordLevel(self, index):
+        return self._records.getLevelNo(self._getSeq(index.row()))
 
     def data(self, index, role=Qt.Qt.DisplayRole):
-        if not index.isValid() or not (0 <= index.row() < len(self._records)):
+        if not index.isValid() or not (0 <= index.row() < self.rowCount()):
             return Qt.QVariant()
-        record = self.getRecord(index)
+        records = self._records
+        seq = self._getSeq(index.row())
         column = index.column()
         if role == Qt.Qt.DisplayRole:
             if column == LEVEL:
-                return Qt.QVariant(record.levelname)
+                return Qt.QVariant(records.getLevelName(seq))
             elif column == TIME:
-                dt = datetime.datetime.fromtimestamp(record.created)
+                dt = datetime.datetime.fromtimestamp(records.getCreated(seq))
                 return Qt.QVariant(str(dt))
                 # return Qt.QVariant(dt.strftime("%Y-%m-%d %H:%m:%S.%f"))
             elif column == MSG:
-                return Qt.QVariant(record.getMessage())
+                return Qt.QVariant(records.getMessage(seq))
             elif column == NAME:
-                return Qt.QVariant(record.name)
+                return Qt.QVariant(records.getName(seq))
             elif column == ORIGIN:
-                return Qt.QVariant(_get_record_origin_str(record))
+                return Qt.QVariant(_get_origin_str(records.getOrigin(seq)))
         elif role == Qt.Qt.TextAlignmentRole:
             if column in (LEVEL, MSG):
                 return Qt.QVariant(Qt.Qt.AlignLeft | Qt.Qt.AlignVCenter)
             return Qt.QVariant(Qt.Qt.AlignRight | Qt.Qt.AlignVCenter)
         elif role == Qt.Qt.BackgroundRole:
             if column == LEVEL:
-                return Qt.QVariant(getBrushForLevel(record.levelno)[0])
+                return Qt.QVariant(getBrushForLevel(records.getLevelNo(seq))[0])
         elif role == Qt.Qt.ForegroundRole:
             if column == LEVEL:
-                return Qt.QVariant(getBrushForLevel(record.levelno)[1])
+                return Qt.QVariant(getBrushForLevel(records.getLevelNo(seq))[1])
         elif role == Qt.Qt.ToolTipRole:
-            return Qt.QVariant(_get_record_origin_tooltip(record))
+            return Qt.QVariant(_get_record_origin_tooltip(records.getRecord(seq)))
         elif role == Qt.Qt.SizeHintRole:
             return self._getSizeHint(column)
         # elif role == Qt.Qt.StatusTipRole:
@@ -291,30 +300,49 @@ class QLoggingTableModel(Qt.QAbstractTableModel, logging.Handler):
         row_nb = self.rowCount()
         records = self._accumulated_records
         self._accumulated_records = []
-        self._records.extend(records)
-        self.insertRows(row_nb, len(records))
-        if len(self._records) > self._capacity:
-            start = len(self._records) - self._capacity
-            self._records = self._records[start:]
-            self.removeRows(0, start)
+        first = self._records.nextSeq()
+        discarded = self._records.extend(records)
+        if self._order is None:
+            self.insertRows(row_nb, len(records))
+            if discarded:
+                self.removeRows(0, discarded)
+            return
+        # sorted: the new records are shown at the end
+        new = numpy.arange(max(first, self._records.firstSeq()),
+                           self._records.nextSeq())
+        if discarded:
+            self.beginResetModel()
+            order = self._order[self._order >= self._records.firstSeq()]
+            self._order = numpy.concatenate((order, new))
+            self.endResetModel()
+        else:
+            self._order = numpy.concatenate((self._order, new))
+            self.insertRows(row_nb, len(new))
 
     def emit(self, record):
         self._accumulated_records.append(record)
 
+    def emitRecords(self, records):
+        self._accumulated_records.extend(records)
+
     def flush(self):
         pass
 
     def close(self):
         self.flush()
-        del self._records[:]
+        self._records.clear()
+        self._order = None
         logging.Handler.close(self)
 
 
-class _LogRecordStreamHandler(LogRecordStreamHandler):
+class _LogRecordStreamHandler(LogRecordBatchStreamHandler):
 
     def handleLogRecord(self, record):
         self.server.data.get('model').emit(record)
 
+    def handleLogRecords(self, records):
+        self.server.data.get('model').emitRecords(records)
+
 
 class QRemoteLoggingTableModel(QLoggingTableModel):
     """A remote Qt table that displays the taurus logging messages"""
@@ -443,8 +471,7 @@ class QLoggingFilterProxyModel(Qt.QSortFilterProxyModel):
     def filterAcceptsRow(self, sourceRow, sourceParent):
         sourceModel = self.sourceModel()
         idx = sourceModel.index(sourceRow, NAME, sourceParent)
-        record = self.getRecord(idx)
-        if record.levelno < self._logLevel:
+        if sourceModel.getRecordLevel(idx) < self._logLevel:
             return False
         name = str(sourceModel.data(idx))
         regexp = self.filterRegExp()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.qt.qtgui.table.qlogtable"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+
+from taurus.external import unittest
+from taurus.external.qt import Qt
+from taurus.core.util.log import Logger
+from taurus.qt.qtgui.test import BaseWidgetTestCase
+from taurus.qt.qtgui.table.qlogtable import QLoggingTableModel
+
+
+class QLoggingTableModelTestCase(BaseWidgetTestCase, unittest.TestCase):
+    '''Test case for the QLoggingTableModel'''
+
+    def setUp(self):
+        BaseWidgetTestCase.setUp(self)
+        self.model = QLoggingTableModel(capacity=10)
+        Logger.removeRootLogHandler(self.model)
+        self.layoutChanges = 0
+        Qt.QObject.connect(self.model, Qt.SIGNAL("layoutChanged()"),
+                           self._onLayoutChanged)
+
+    def _onLayoutChanged(self):
+        self.layoutChanges += 1
+
+    def _record(self, i):
+        record = logging.LogRecord('test', logging.INFO, __file__, i,
+                                   'message %d', (i,), None)
+        record.created = float(i)
+        return record
+
+    def test_sortThenUpdate(self):
+        '''check that sorting emits layoutChanged and that the records
+        received afterwards are added'''
+        for i in xrange(3):
+            self.model.emit(self._record(i))
+        self.model.updatePendingRecords()
+        self.model.sort(1, Qt.Qt.DescendingOrder)
+        self.assertEqual(self.layoutChanges, 1)
+        self.assertEqual(self.model._accumulated_records, [])
+        for i in xrange(3, 5):
+            self.model.emit(self._record(i))
+        self.model.updatePendingRecords()
+        self.assertEqual(self.model.rowCount(), 5)
+        rows = [self.model.getRecord(self.model.index(r, 0)).lineno
+                for r in xrange(5)]
+        self.assertEqual(rows, [2, 1, 0, 3, 4])
+
+
+if __name__ == '__main__':
+    pass
@@ -36,3 +36,4 @@ from .taurusscreenshot import *
 from .qdraganddropdebug import *
 from .ui import *
 from .validator import *
+from .replotscheduler import *
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""This module provides the replot scheduler shared by the taurus plots"""
+
+__all__ = ["TaurusReplotScheduler"]
+
+__docformat__ = 'restructuredtext'
+
+import weakref
+
+from taurus.external.qt import Qt
+from taurus.core.util.log import Logger
+from taurus.core.util.singleton import Singleton
+
+
+class TaurusReplotScheduler(Singleton, Logger):
+    '''
+    Coalesces the replot requests of the plots of the application.
+
+    Instead of calling `replot()` on every data change, plots (or the items
+    they contain) call :meth:`requestReplot`, which marks the plot as dirty.
+    Each dirty plot is then replotted at most once per frame interval (see
+    :meth:`setFrameInterval`). Plots which are hidden, minimized or have an
+    empty size are kept dirty (but not replotted) until they become visible.
+
+    The plots can reimplement the check of visibility by providing an
+    `isReplotNeeded()` method.
+
+    Note: the scheduler must be used from the Qt main thread
+    '''
+
+    #: default period (in ms) between replots of a plot
+    DefaultFrameInterval = 40
+
+    #: period (in ms) for checking whether the dirty plots became visible
+    IdleInterval = 500
+
+    def __init__(self):
+        """ Initialization. Nothing to be done here for now."""
+        pass
+
+    def init(self, *args, **kwargs):
+        """Singleton instance initialization."""
+        name = self.__class__.__name__
+        self.call__init__(Logger, name)
+        self._frameInterval = self.DefaultFrameInterval
+        self._pending = weakref.WeakKeyDictionary()
+        self._counters = weakref.WeakKeyDictionary()
+        self._requested = 0
+        self._performed = 0
+        self._timer = Qt.QTimer()
+        Qt.QObject.connect(self._timer, Qt.SIGNAL('timeout()'),
+                           self._onTimeout)
+
+    def getFrameInterval(self):
+        '''returns the minimum period between replots of a plot
+
+        :return: (int) period in ms
+        '''
+        return self._frameInterval
+
+    def setFrameInterval(self, interval):
+        '''sets the minimum period between replots of a plot
+
+        :param interval: (int) period in ms
+        '''
+        self._frameInterval = interval
+        if self._timer.isActive():
+            self._timer.start(interval)
+
+    def requestReplot(self, plot):
+        '''marks the given plot as dirty. It will be replotted within the
+        next frame interval (or as soon as it becomes visible)
+
+        :param plot: (Qwt5.QwtPlot) the plot (any QWidget with a `replot`
+                     method)
+        '''
+        self._requested += 1
+        counters = self._counters.get(plot)
+        if counters is None:
+            counters = self._counters[plot] = [0, 0]
+        counters[0] += 1
+        self._pending[plot] = True
+        if (not self._timer.isActive() or
+                self._timer.interval() != self._frameInterval):
+            self._timer.start(self._frameInterval)
+
+    def cancelReplot(self, plot):
+        '''discards a pending replot request for the given plot
+
+        :param plot: (Qwt5.QwtPlot) the plot
+        '''
+        self._pending.pop(plot, None)
+
+    def isPending(self, plot):
+        '''whether the given plot has a pending replot
+
+        :return: (bool)
+        '''
+        return plot in self._pending
+
+    def getCounters(self, plot=None):
+        '''returns the number of replots requested and performed (since the
+        last call to :meth:`resetCounters`)
+
+        :param plot: (Qwt5.QwtPlot or None) if given, the counters of the
+                     given plot are returned. Otherwise, the global counters
+
+        :return: (tuple<int,int>) number of replots requested and performed
+        '''
+        if plot is None:
+            return self._requested, self._performed
+        return tuple(self._counters.get(plot, (0, 0)))
+
+    def resetCounters(self):
+        '''resets the counters of requested and performed replots'''
+        self._requested = self._performed = 0
+        self._counters = weakref.WeakKeyDictionary()
+
+    def _isReplotNeeded(self, plot):
+        check = getattr(plot, 'isReplotNeeded', None)
+        if check is not None:
+            return check()
+        return (plot.isVisible() and not plot.size().isEmpty() and
+                not plot.window().isMinimized())
+
+    def _onTimeout(self):
+        replotted = 0
+        for plot in self._pending.keys():
+            try:
+                if not self._isReplotNeeded(plot):
+                    continue
+                del self._pending[plot]
+                plot.replot()
+            except Exception:
+                # (e.g., the plot has been deleted)
+                self._pending.pop(plot, None)
+                self.debug('Cannot replot %r', plot, exc_info=1)
+                continue
+            replotted += 1
+            self._performed += 1
+            counters = self._counters.get(plot)
+            if counters is not None:
+                counters[1] += 1
+        if not self._pending:
+            self._timer.stop()
+        elif not replotted:
+            # only hidden plots are pending: check them less often
+            if self._timer.interval() != self.IdleInterval:
+                self._timer.start(self.IdleInterval)
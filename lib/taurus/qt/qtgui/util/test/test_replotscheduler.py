@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+"""Test for taurus.qt.qtgui.util.replotscheduler"""
+
+__docformat__ = 'restructuredtext'
+
+import time
+
+from taurus.external import unittest
+from taurus.external.qt import Qt
+from taurus.qt.qtgui.test import BaseWidgetTestCase
+from taurus.qt.qtgui.util.replotscheduler import TaurusReplotScheduler
+
+
+class _ReplotCounter(Qt.QWidget):
+    '''A widget that counts the calls to replot'''
+
+    def __init__(self, *args, **kwargs):
+        Qt.QWidget.__init__(self, *args, **kwargs)
+        self.replots = 0
+
+    def replot(self):
+        self.replots += 1
+
+
+class ReplotSchedulerTestCase(BaseWidgetTestCase, unittest.TestCase):
+    '''Test case for the TaurusReplotScheduler'''
+    _klass = _ReplotCounter
+
+    def setUp(self):
+        BaseWidgetTestCase.setUp(self)
+        self._scheduler = TaurusReplotScheduler()
+        self._scheduler.resetCounters()
+        self._widget.resize(100, 100)
+
+    def tearDown(self):
+        self._scheduler.cancelReplot(self._widget)
+
+    def _wait(self, period=0.2):
+        t0 = time.time()
+        while time.time() - t0 < period:
+            self._app.processEvents()
+            time.sleep(0.01)
+
+    def test_coalescing(self):
+        '''check that several requests result in a single replot'''
+        self._widget.show()
+        for i in xrange(10):
+            self._scheduler.requestReplot(self._widget)
+        self._wait()
+        self.assertEqual(self._widget.replots, 1)
+        self.assertEqual(self._scheduler.getCounters(self._widget), (10, 1))
+
+    def test_hidden(self):
+        '''check that hidden widgets are replotted only when shown'''
+        self._widget.hide()
+        self._scheduler.requestReplot(self._widget)
+        self._wait()
+        self.assertEqual(self._widget.replots, 0)
+        self.assertTrue(self._scheduler.isPending(self._widget))
+        self._widget.show()
+        self._wait(2 * TaurusReplotScheduler.IdleInterval / 1000.)
+        self.assertEqual(self._widget.replots, 1)
+        self.assertFalse(self._scheduler.isPending(self._widget))
+
+
+if __name__ == '__main__':
+    pass
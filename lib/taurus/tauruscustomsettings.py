@@ -123,6 +123,42 @@ QT_AUTO_INIT_RES = DEFAULT_QT_AUTO_INIT_RES
 QT_AUTO_REMOVE_INPUTHOOK = DEFAULT_QT_AUTO_REMOVE_INPUTHOOK
 
 
+# ----------------------------------------------------------------------------
+# Client-side polling
+# ----------------------------------------------------------------------------
+
+#: Number of phases in which each polling period is divided. The devices are
+#: distributed among the phases so that their poll requests are spread
+#: across the period (1 polls all devices at once)
+POLLING_PHASES = 4
+
+#: Number of consecutive failed or unchanged polls of an attribute after
+#: which its polling period is doubled. The adaptive polling is opt-in:
+#: 0 (default) disables it
+POLLING_BACKOFF_THRESHOLD = 0
+
+#: Maximum factor by which the adaptive polling can increase the polling
+#: period of an attribute (1 disables the adaptive polling). Only used if
+#: POLLING_BACKOFF_THRESHOLD is not 0 (e.g. set it to 4 together with a
+#: threshold of 10)
+POLLING_MAX_BACKOFF = 1
+
+# ----------------------------------------------------------------------------
+# Trend history spool
+# ----------------------------------------------------------------------------
+
+#: Directory where the trends keep a long term history of their attributes
+#: on disk (see :meth:`taurus.core.util.history.HistoryStore.setSpooling`).
+#: None disables it
+TREND_SPOOL_DIR = None
+
+#: Maximum age (in s) of the records kept in the trend spool
+TREND_SPOOL_MAX_AGE = 86400
+
+#: Maximum size (in bytes) of the trend spool of each attribute (None for
+#: no limit)
+TREND_SPOOL_MAX_BYTES = None
+
 # ----------------------------------------------------------------------------
 # Deprecation handling:
 # Note: this API is still experimental and may be subject to change
@@ -69,3 +69,4 @@ from .resource import getResourcePath
 from .skip import GUI_TESTS_ENABLED, skipUnlessGui
 from .base import insertTest
 from .fuzzytest import calculateTestFuzziness, loopSubprocess, loopTest
+from .benchmark import benchmark, printBenchmark
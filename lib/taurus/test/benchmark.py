@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+#############################################################################
+##
+# This file is part of Taurus
+##
+# http://taurus-scada.org
+##
+# Copyright 2011 CELLS / ALBA Synchrotron, Bellaterra, Spain
+##
+# Taurus is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+##
+# Taurus is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+##
+# You should have received a copy of the GNU Lesser General Public License
+# along with Taurus.  If not, see <http://www.gnu.org/licenses/>.
+##
+#############################################################################
+
+'''Utility functions for writing micro-benchmarks'''
+
+import time
+
+
+def benchmark(func, args=(), kwargs=None, repeat=3, mintime=0.2):
+    '''Measure the time it takes to call `func(*args, **kwargs)`.
+
+    The function is called in loops of increasing number of calls until a loop
+    lasts at least `mintime` seconds. The best of `repeat` such loops is used.
+
+    :param func: (callable) the function to be measured
+    :param args: (seq) arguments for calling the function
+    :param kwargs: (dict) keyword arguments for calling the function
+    :param repeat: (int) number of measured loops
+    :param mintime: (float) minimum duration of a loop (in s)
+
+    :return: (float) the best time per call (in s)
+    '''
+    if kwargs is None:
+        kwargs = {}
+    number = 1
+    while True:
+        t0 = time.time()
+        for _ in xrange(number):
+            func(*args, **kwargs)
+        dt = time.time() - t0
+        if dt >= mintime:
+            break
+        number *= 10
+    best = dt
+    for _ in xrange(repeat - 1):
+        t0 = time.time()
+        for _ in xrange(number):
+            func(*args, **kwargs)
+        best = min(best, time.time() - t0)
+    return best / number
+
+
+def printBenchmark(results, title=None):
+    '''Print a table with the results of several benchmarks
+
+    :param results: (seq) sequence of (label, time per call) tuples
+    :param title: (str) optional title for the table
+    '''
+    if title:
+        print title
+        print '=' * len(title)
+    width = max([len(label) for label, _ in results] + [5])
+    for label, t in results:
+        if t < 1e-3:
+            txt = '%10.2f us' % (t * 1e6)
+        elif t < 1:
+            txt = '%10.2f ms' % (t * 1e3)
+        else:
+            txt = '%10.2f s ' % t
+        print '%s  %s' % (label.ljust(width), txt)
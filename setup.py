@@ -147,6 +147,7 @@ packages = [
     'taurus.qt.qtgui.gauge.demo',
     'taurus.qt.qtgui.graphic',
     'taurus.qt.qtgui.graphic.jdraw',
+    'taurus.qt.qtgui.graphic.test',
     'taurus.qt.qtgui.graphic.jdraw.test.res',
     'taurus.qt.qtgui.help',
     'taurus.qt.qtgui.image',